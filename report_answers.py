@@ -0,0 +1,258 @@
+"""
+Canonical answers for the closed questions of both questionnaires.
+
+The two exports do not spell answers the same way ('Ano' / 'Áno', 'nie' / 'Nie',
+'Strednú odbornú školu' / 'Stredná odborná škola', ...). Every closed question is tied to a
+scale of canonical labels. Raw answers are matched on a folded key (lower-cased, diacritics
+removed, whitespace collapsed) through lookup tables compiled once at import, and a whole frame
+is turned into integer codes in one vectorized pass:
+
+    answers = canonicalize(pre_data)
+    answers.codes[col] == answers.code(col, 'Nie')
+
+Code -1 means no answer. Answers that match nothing on their scale also get -1 and are
+listed in `answers.unmapped` (and reported with a warning), instead of silently dropping out.
+"""
+
+import unicodedata
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from report_backend import backend_for
+
+MISSING = -1
+
+
+def _fold_table():
+    # Every Latin-1 / Latin Extended-A letter mapped to its base letter: 'ľ' -> 'l', 'ô' -> 'o'
+    table = {}
+    for code in range(0x00C0, 0x0180):
+        ch = chr(code)
+        base = unicodedata.normalize('NFD', ch)[0]
+        if base != ch and base.isascii():
+            table[code] = base
+    return str.maketrans(table)
+
+
+FOLD_TABLE = _fold_table()
+
+# ─── Scales: canonical labels, in code order ───
+SCALES = {
+    'yes_no': ['Áno', 'Nie', 'Niekedy', 'Nechcem odpovedať'],
+    'school': ['Základná škola', 'Stredná odborná škola s maturitou', 'Stredná odborná škola bez maturity'],
+    'info_prep': ['Áno, mala som všetky potrebné informácie', 'Mala som len čiastočné informácie',
+                  'Nemala som žiadne informácie'],
+    'supplies': ['Áno, vždy', 'Niekedy áno, niekedy nie', 'Väčšinou nie'],
+    'cycle_record': ['Aplikácia', 'Denník', 'Nezaznamenávam'],
+    'carry': ['Áno, počas celého mesiaca', 'Len tesne pred očakávanou menštruáciou', 'Nemám žiadnu pomôcku so sebou'],
+    'days': ['Menej ako 1 deň', '1 deň', '2 dni', '3 dni', 'Viac ako 3 dni'],
+    'reason': ['Bolesť', 'Nemala som možnosť sa hygienicky upraviť v škole', 'Nemala som hygienické pomôcky',
+               'Hanbila som sa', 'Iný dôvod'],
+    'usage': ['Áno, viackrát', 'Áno, raz', 'Nie', 'Vedela som o nich, ale nepotrebovala som ich',
+              'Nevedela som, že sú dostupné'],
+    'attendance': ['Áno, chodila som do školy častejšie', 'Nie, nezmenilo sa to', 'Neviem posúdiť'],
+    'feelings': ['Lepšie ako predtým', 'Rovnako', 'Horšie'],
+    'yes_no_unsure': ['Áno', 'Nie', 'Neviem'],
+    'yes_no_cannot_judge': ['Áno', 'Nie', 'Neviem posúdiť'],
+    'continue': ['Áno', 'Je mi to jedno'],
+    'future': ['Áno, určite', 'Možno'],
+    'agreement': ['Určite áno', 'Skôr áno', 'Neviem posúdiť', 'Skôr nie', 'Určite nie'],
+    'psych': ['Áno', 'Čiastočne', 'Neviem', 'Nie'],
+    'help': ['Cítila som sa pokojnejšie a bezpečnejšie', 'Pomohlo mi vyhnúť sa pretečeniu/nepríjemnostiam',
+             'Nemala som pri sebe pomôcku, pomohlo mi to prekonať stres',
+             'Pomohlo mi to s infekciami alebo zdravotným diskomfortom', 'Nepomohlo / nič z toho sa ma netýka', 'Iné'],
+    'source': ['Od učiteľky/učiteľa', 'Od spolužiačok', 'Cez plagát alebo oznámenie', 'Inak'],
+    'easy_access': ['Áno, úplne bez problémov', 'Áno, ale najprv som sa hanbila', 'Vôbec som si ich nezobrala'],
+    # Age as asked in the after-installation form; the pre form asks for the exact age
+    'age_band': ['Do 15 rokov', '16 - 18 rokov', 'Viac ako 18 rokov'],
+}
+
+# Raw wordings that differ from the canonical label by more than spelling
+ALIASES = {
+    'yes_no': {'Yes': 'Áno', 'No': 'Nie', 'Sometimes': 'Niekedy', "Don't want to answer": 'Nechcem odpovedať'},
+    'school': {
+        'Základnú školu': 'Základná škola',
+        'Strednú odbornú školu s maturitou': 'Stredná odborná škola s maturitou',
+        'Strednú odbornú školu bez maturity': 'Stredná odborná škola bez maturity',
+    },
+    'reason': {'Mala som bolesti': 'Bolesť', 'Iné': 'Iný dôvod'},
+    'help': {
+        'Pomohlo mi to vyhnúť sa pretečeniu/nepríjemnosťam': 'Pomohlo mi vyhnúť sa pretečeniu/nepríjemnostiam',
+        'Nemala som pri sebe pomôcku a pomohlo mi to prekonať stres': 'Nemala som pri sebe pomôcku, pomohlo mi to prekonať stres',
+    },
+    'source': {
+        'Od učiteľky/ učiteľa': 'Od učiteľky/učiteľa',
+        'Od spolužiakoch': 'Od spolužiačok',
+        'Cez plagát alebo oznám': 'Cez plagát alebo oznámenie',
+    },
+}
+
+# ─── Question column -> scale ───
+QUESTIONS = {
+    # pre-installation
+    'Škola': 'school',
+    'Prístup k teplej vode': 'yes_no',
+    'Prístup k sprche alebo vani': 'yes_no',
+    'Prístup k splachovaciemu WC': 'yes_no',
+    'Prístup ku teplu alebo kúreniu': 'yes_no',
+    'Mávate aktuálne menštruáciu': 'yes_no',
+    'Mali ste pred prvou menštruáciou dostatok informácií o tom, čo menštruácia znamená a ako sa na ňu pripraviť?': 'info_prep',
+    'Dostatok pomôcok na celé trvanie menštruácie': 'supplies',
+    'Sledujete svoj menštruačný cyklus?': 'yes_no',
+    'Akým spôsobom si zaznamenávate svoj cyklus?': 'cycle_record',
+    'Vnímate menštruáciu ako zásah do svojich každodenných plánov?': 'yes_no',
+    'Je pre vás ťažké komunikovať o intímnych témach so svojím lekárom?': 'yes_no',
+    'Nosievate so sebou zásobu menštruačných pomôcok ako prvú pomoc?': 'carry',
+    'Je pre vás výmena vložky alebo tampónu stresujúca, ak ste mimo domova?': 'yes_no',
+    'Cítili ste sa niekedy trápne pri nákupe menštruačných pomôcok?': 'yes_no',
+    'Stalo sa vám, že ste si kvôli finančným dôvodom nemohli dovoliť kúpiť menštruačné pomôcky?': 'yes_no',
+    'Vynechali ste niekedy školu kvôli menštruácii?': 'yes_no',
+    # after-installation
+    'Chýbala si niekedy v škole kvôli menštruácii?': 'yes_no',
+    'Koľko dní si vymeškala počas menštruácii?': 'days',
+    'Dôvod tvojej absencie počas menštruácii?': 'reason',
+    'Používala si bezplatné vložky poskytované v škole?': 'yes_no',
+    'Ovplyvnilo to tvoju dochádzku do školy počas menštruácie?': 'attendance',
+    'Ako sa cítiš počas menštruácie v škole teraz (počas projektu)?': 'feelings',
+    'Cítiš sa istejšie, keď vieš, že máš v škole k dispozícii hygienické pomôcky?': 'yes_no_unsure',
+    'Chcela by si, aby sa poskytovanie vložiek na škole zachovalo aj naďalej?': 'continue',
+    'Chcela by si, aby boli vložky zadarmo poskytované aj v ďalších školských rokoch?': 'future',
+    'Využili ste niekedy menštruačné pomôcky, ktoré boli v rámci projektu zdarma k dispozícii na škole?': 'usage',
+    'Ak áno, pomohlo ti to vyriešiť niektorý konkrétny problém?': 'help',
+    'Ako si sa o menštruačných pomôckach na škole dozvedela?': 'source',
+    'Bolo podľa teba jednoduché si tieto vložky, zobrať v škole?': 'easy_access',
+    'Mala si pocit, že projekt bol pre dievčatá užitočný?': 'yes_no_cannot_judge',
+    'Myslíš si, že projekt prispel k tomu, aby sa o menštruácii v škole hovorilo otvorenejšie a prirodzenejšie?': 'agreement',
+    'Cítila si sa vďaka projektu psychicky lepšie?': 'psych',
+    'V mesiaci december 2025, sa prebehla vo Vašej škola séria prednášok, na tému: Dospievanie, menštruácia a menštruačná chudoba. Prednášali ti: My mami n.o., Zdravé regióny, DM Drogerie a ČLOVEK v ohrození n.o. Pomohli ti tieto aktivity získať nové informácie alebo iný pohľad na túto tému?': 'agreement',
+}
+
+
+def fold(values):
+    """Matching key of each answer: lower-cased, without diacritics, single-spaced."""
+    return (pd.Series(values, dtype=object).astype(str).str.lower().str.translate(FOLD_TABLE)
+            .str.split().str.join(' ').to_numpy(dtype=object))
+
+
+def _compile(scale):
+    labels = SCALES[scale]
+    pairs = [(label, label) for label in labels] + list(ALIASES.get(scale, {}).items())
+    keys = fold([raw for raw, _ in pairs])
+    return {key: labels.index(label) for key, (_, label) in zip(keys, pairs)}
+
+
+# Folded key -> code, per scale
+LOOKUPS = {scale: _compile(scale) for scale in SCALES}
+
+
+def code(scale, label):
+    return SCALES[scale].index(label)
+
+
+def encode(values, scale):
+    """Codes of one column of answers on `scale` (-1 where missing or unmapped)."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    lookup = LOOKUPS[scale]
+    table = np.array([lookup.get(key, MISSING) for key in fold(uniques)] + [MISSING], dtype=np.int8)
+    return table[codes]
+
+
+class Answers:
+    """Integer codes of the closed questions of one frame (see canonicalize)."""
+
+    def __init__(self, codes, unmapped):
+        self.codes = codes
+        self.unmapped = unmapped
+
+    def __getitem__(self, col):
+        return self.codes[col]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def subset(self, mask):
+        mask = np.asarray(mask, dtype=bool)
+        return Answers(self.codes[mask], self.unmapped)
+
+    def scale(self, col):
+        return SCALES[QUESTIONS[col]]
+
+    def code(self, col, label):
+        return code(QUESTIONS[col], label)
+
+    def labels(self, col):
+        """Canonical label of every answer (NaN where there is none)."""
+        values = pd.Categorical.from_codes(self.codes[col].to_numpy(), categories=self.scale(col))
+        return pd.Series(values, index=self.codes.index, name=col).astype(object)
+
+    def counts(self, col, order=None, normalize=False, weights=None):
+        """
+        Like labels(col).value_counts(): most frequent first, ties in order of first appearance.
+        With `order`, the answers present in it are returned in that order instead. With
+        `weights` (one per row), the counts are sums of weights.
+        """
+        values = self.codes[col].to_numpy()
+        known = values != MISSING
+        if weights is not None:
+            weights = np.asarray(weights, dtype=float)[known]
+        values = values[known]
+        n = np.bincount(values, weights=weights, minlength=len(self.scale(col)))
+        return tally(col, n, pd.unique(values), order, normalize)
+
+
+def tally(col, n, seen, order=None, normalize=False):
+    """
+    The counts() Series of question `col` from its per-code totals `n` (indexed by code) and the
+    codes in order of their first appearance, `seen`. Shared with the merged shard states of
+    report_partial.py.
+    """
+    scale = SCALES[QUESTIONS[col]]
+    if order is None:
+        present = np.asarray(seen, dtype=np.intp)
+        present = present[n[present] > 0]
+        present = present[np.argsort(-n[present], kind='stable')]
+    else:
+        present = [c for c in (code(QUESTIONS[col], label) for label in order) if n[c]]
+    labels = [scale[c] for c in present]
+    result = n[present]
+    if normalize:
+        result = result / n.sum()
+    return pd.Series(result, index=pd.Index(labels, name=col), name='proportion' if normalize else 'count')
+
+
+def canonicalize(df, columns=None, warn=True):
+    """
+    Codes of every registered question present in `df` (a frame of any report_backend). All
+    answers are factorized together, each distinct answer is folded once and looked up per
+    scale; the codes are then gathered from the per-scale tables with one indexing operation
+    per scale.
+    """
+    backend = backend_for(df)
+    columns = [col for col in (columns or QUESTIONS) if col in df.columns]
+    positions, uniques = backend.factorize(df, columns)
+    keys = fold(uniques)
+
+    codes = np.full(positions.shape, MISSING, dtype=np.int8)
+    by_scale = {}
+    for j, col in enumerate(columns):
+        by_scale.setdefault(QUESTIONS[col], []).append(j)
+    for scale, cols in by_scale.items():
+        lookup = LOOKUPS[scale]
+        # Last slot catches the factorize NA sentinel (-1)
+        table = np.array([lookup.get(key, MISSING) for key in keys] + [MISSING], dtype=np.int8)
+        codes[:, cols] = table[positions[:, cols]]
+
+    rows, cols = np.nonzero((positions != -1) & (codes == MISSING))
+    unmapped = pd.Series(
+        [1] * len(rows),
+        index=pd.MultiIndex.from_arrays([np.asarray(columns, dtype=object)[cols], uniques[positions[rows, cols]]],
+                                        names=['question', 'answer']),
+        dtype='int64',
+    ).groupby(level=[0, 1], sort=False).sum()
+    if warn and len(unmapped):
+        listed = '; '.join(f'{q!r}: {a!r} ({n}x)' for (q, a), n in unmapped.items())
+        warnings.warn(f'Answers without a canonical label: {listed}', stacklevel=2)
+
+    return Answers(pd.DataFrame(codes, index=backend.index(df), columns=columns), unmapped)
@@ -0,0 +1,199 @@
+"""
+Dataframe backends for the load -> derive -> aggregate stages of report_data.py.
+
+A backend owns the row-wise work on a wave: reading and cleaning the CSV export (or taking over
+the Arrow rows of the survey store, report_store.py), factorizing the closed answers for
+report_answers.canonicalize and adding derived columns. Only that work is backend-specific. The
+reductions that make the aggregates (counts, means, crosstabs, correlations, the model) are
+pandas / NumPy code in report_data whatever the backend: they run on the integer answer codes and
+on narrow pandas frames of just the columns they need, so charts and the DOCX get identical
+aggregates from every backend. Choosing polars speeds up loading and deriving, not the reductions.
+
+  pandas  the default; frames are pandas DataFrames
+  polars  vectorized, multithreaded string handling and factorizing; frames are Polars
+          DataFrames (needs the optional `polars` package)
+
+The backend is picked per run, or per process with the REPORT_BACKEND environment variable:
+
+    python generate_report.py --backend polars
+    python report_bench.py --backend polars
+
+Functions that receive a frame dispatch on its type (backend_for), so frames of either kind can
+be passed around, pickled by the incremental build and converted with to_pandas where pandas is
+needed (snapshot, watch diff, notebooks).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers.readers import STR_NA_VALUES
+
+DEFAULT_BACKEND = os.environ.get('REPORT_BACKEND', 'pandas')
+# What pandas infers for text: its 'str' dtype from pandas 3 on, object before (where astype('str')
+# would turn a missing answer into the text 'None')
+TEXT_DTYPE = pd.Series(['']).dtype
+
+
+# ═══════════════════════════════════════════
+# PANDAS
+# ═══════════════════════════════════════════
+
+def strip_values(df):
+    return df.map(lambda x: x.strip() if isinstance(x, str) else x)
+
+
+class PandasBackend:
+    name = 'pandas'
+
+    def handles(self, frame):
+        return isinstance(frame, (pd.DataFrame, pd.Series))
+
+    def read_csv(self, path, drop=(), names=None):
+        df = strip_values(pd.read_csv(path))
+        if drop:
+            df = df.drop(columns=list(drop))
+        if names is not None:
+            df.columns = names
+        return df
+
+    def from_arrow(self, table):
+        return table.to_pandas()
+
+    def factorize(self, frame, columns):
+        """(rows, columns) positions into the distinct answers (-1 where missing) and those answers."""
+        raw = frame[columns].to_numpy(dtype=object)
+        flat, uniques = pd.factorize(raw.ravel(), use_na_sentinel=True)
+        return flat.reshape(raw.shape), uniques
+
+    def index(self, frame):
+        return frame.index
+
+    def with_columns(self, frame, columns):
+        for name, values in columns.items():
+            frame[name] = values
+        return frame
+
+    def take(self, frame, mask):
+        return frame[mask]
+
+    def to_pandas(self, frame, columns=None):
+        return frame if columns is None else frame[list(columns)]
+
+
+# ═══════════════════════════════════════════
+# POLARS
+# ═══════════════════════════════════════════
+
+class PolarsBackend:
+    name = 'polars'
+
+    @property
+    def pl(self):
+        try:
+            import polars
+        except ImportError:
+            raise ImportError("The 'polars' backend needs the polars package: pip install polars") from None
+        return polars
+
+    def handles(self, frame):
+        return type(frame).__module__.split('.')[0] == 'polars'
+
+    def read_csv(self, path, drop=(), names=None):
+        pl = self.pl
+        # Everything is read as text with pandas' missing-value markers and typed after stripping,
+        # the way pandas.read_csv types a column: integers if every value is one, else floats,
+        # else text (a column without a single value is float NaN)
+        df = pl.read_csv(path, null_values=sorted(STR_NA_VALUES), infer_schema=False)
+        df = df.with_columns(pl.all().str.strip_chars())
+        nulls = df.null_count().row(0)
+        typed = []
+        for name, missing in zip(df.columns, nulls):
+            column = pl.col(name)
+            if missing == df.height:
+                typed.append(column.cast(pl.Float64))
+                continue
+            for dtype in [pl.Int64, pl.Float64]:
+                if df.select(column.cast(dtype, strict=False).null_count()).item() == missing:
+                    typed.append(column.cast(dtype))
+                    break
+        if typed:
+            df = df.with_columns(typed)
+        if drop:
+            df = df.drop(list(drop))
+        if names is not None:
+            df.columns = names
+        return df
+
+    def from_arrow(self, table):
+        return self.pl.from_arrow(table)
+
+    def factorize(self, frame, columns):
+        pl = self.pl
+        rows = frame.height
+        if not columns:
+            return np.empty((rows, 0), dtype=np.int64), np.empty(0, dtype=object)
+        # All answers in one column, question after question, so each distinct answer is seen once
+        stacked = pl.concat([frame.get_column(col).cast(pl.String) for col in columns])
+        uniques = stacked.drop_nulls().unique(maintain_order=True)
+        positions = stacked.replace_strict(uniques, pl.Series(np.arange(len(uniques))), default=-1).fill_null(-1)
+        return positions.to_numpy().reshape(len(columns), rows).T, uniques.to_numpy().astype(object)
+
+    def index(self, frame):
+        return pd.RangeIndex(frame.height)
+
+    def with_columns(self, frame, columns):
+        pl = self.pl
+        series = []
+        for name, values in columns.items():
+            values = np.asarray(values)
+            # Labels come as object arrays, which Polars would keep as opaque Python objects
+            series.append(pl.Series(name, values.tolist()) if values.dtype == object else pl.Series(name, values))
+        return frame.with_columns(series)
+
+    def take(self, frame, mask):
+        return frame.filter(self.pl.Series(np.asarray(mask, dtype=bool)))
+
+    def to_pandas(self, frame, columns=None):
+        pl = self.pl
+        if columns is not None:
+            frame = frame.select(list(columns))
+        out = {}
+        for name, s in frame.to_dict().items():
+            if s.dtype == pl.String:
+                # Text columns get the dtype pandas.read_csv gives them; missing answers stay NaN
+                values = s.to_pandas()
+                out[name] = values.where(values.notna(), np.nan).astype(TEXT_DTYPE)
+            else:
+                out[name] = s.to_pandas()
+        return pd.DataFrame(out, columns=frame.columns)
+
+
+BACKENDS = {b.name: b for b in [PandasBackend(), PolarsBackend()]}
+# The backend loads use when none is asked for
+CURRENT = {'backend': DEFAULT_BACKEND}
+
+
+def get_backend(name=None):
+    name = name or CURRENT['backend']
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown dataframe backend {name!r}; available: {', '.join(BACKENDS)}")
+    return BACKENDS[name]
+
+
+def set_backend(name):
+    """Backend used for loading from now on; returns the previous one's name."""
+    previous = CURRENT['backend']
+    CURRENT['backend'] = get_backend(name).name
+    return previous
+
+
+def backend_for(frame):
+    for backend in BACKENDS.values():
+        if backend.handles(frame):
+            return backend
+    raise TypeError(f'No dataframe backend for {type(frame).__name__}')
+
+
+def to_pandas(frame, columns=None):
+    return backend_for(frame).to_pandas(frame, columns)
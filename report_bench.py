@@ -0,0 +1,290 @@
+"""
+Performance regression gate for the report build.
+
+Runs the build stages (load, derive, aggregate, every chart, DOCX) on a fixed synthetic
+dataset and compares each stage's time and peak memory with the baseline stored in
+perf_baseline.json. Fails (exit code 1) with a per-stage diff when a stage got slower or
+hungrier than the threshold allows, or when a stage is missing from the baseline (a new chart
+is gated only once the baseline is updated with it).
+
+    python report_bench.py                      # compare with the baseline
+    python report_bench.py --threshold 1.0      # allow stages to take twice as long
+    python report_bench.py --update-baseline    # record the current numbers as the baseline
+    python report_bench.py --backend polars     # the Polars backend against the (pandas) baseline
+    python report_bench.py --scale 10 --backend polars --baseline /tmp/pandas_x10.json
+
+The synthetic dataset is drawn column by column, with a fixed seed, from the values in the
+two CSV exports and scaled up to SYNTHETIC_ROWS responses, so it has the real schema and
+answer spellings. Everything runs locally in a temporary directory; the report, its images
+and the snapshot are left untouched.
+
+Times are the best of `--repeat` runs. Peak memory is measured in a separate run with
+tracemalloc (Python and NumPy allocations), since tracing slows the stages down; that run
+comes first and warms the caches for the timed ones.
+
+The baseline records the dataframe backend (report_backend.py) and dataset size it was measured
+with; comparing another backend against it shows that backend's per-stage speedup.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import report_backend
+import report_charts
+import report_data
+from report_charts import CHARTS, FINAL_OUTPUT
+from report_docx_stream import write_document
+from report_text import compute_text_aggregates
+
+BASELINE_PATH = os.path.join(report_data.BASE, 'perf_baseline.json')
+BASELINE_VERSION = 1
+
+SEED = 2025
+SYNTHETIC_ROWS = {'pre': 10000, 'after': 5000}
+
+REPEAT = 3
+# Relative slowdown / memory growth a stage may show before the gate fails. Timings of the
+# same build on a shared machine drift by up to a third between runs, memory hardly at all
+THRESHOLD = 0.5
+MEMORY_THRESHOLD = 0.25
+# Differences below these are noise, whatever the relative change
+MIN_SECONDS = 0.05
+MIN_MB = 1.0
+
+
+# ═══════════════════════════════════════════
+# SYNTHETIC DATA
+# ═══════════════════════════════════════════
+
+def synthetic_frame(source, rows, rng):
+    """`rows` responses drawn column by column from `source`, with unique form timestamps."""
+    df = pd.read_csv(source)
+    data = {col: df[col].to_numpy()[rng.integers(0, len(df), rows)] for col in df.columns}
+    start = pd.Timestamp('2025-04-01 08:00:00')
+    stamps = start + pd.to_timedelta(np.arange(rows) * 37, unit='s')
+    data[df.columns[0]] = [f'{t.day}.{t.month}.{t.year} {t:%H:%M:%S}' for t in stamps]
+    return pd.DataFrame(data, columns=df.columns)
+
+
+def write_synthetic_data(directory, seed=SEED, rows=SYNTHETIC_ROWS):
+    """Writes the synthetic pre / after CSVs; returns their paths and a fingerprint of their contents."""
+    rng = np.random.default_rng(seed)
+    paths = {}
+    h = hashlib.sha256()
+    for wave, source in [('pre', report_data.PRE_CSV), ('after', report_data.AFTER_CSV)]:
+        path = os.path.join(directory, f'{wave}_synthetic.csv')
+        synthetic_frame(source, rows[wave], rng).to_csv(path, index=False)
+        with open(path, 'rb') as f:
+            h.update(f.read())
+        paths[wave] = path
+    return paths, h.hexdigest()
+
+
+# ═══════════════════════════════════════════
+# STAGES
+# ═══════════════════════════════════════════
+
+class StageTimer:
+    def __init__(self):
+        self.results = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        yield
+        self.results[name] = time.perf_counter() - start
+
+
+class StageMemory:
+    def __init__(self):
+        self.results = {}
+
+    @contextmanager
+    def stage(self, name):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        yield
+        self.results[name] = (tracemalloc.get_traced_memory()[1] - base) / 2**20
+
+
+def run_stages(paths, directory, probe):
+    with probe.stage('load'):
+        pre_data = report_data.load_pre(paths['pre'])
+        after_data = report_data.load_after(paths['after'])
+    with probe.stage('derive'):
+        pre_data = report_data.derive_pre(pre_data)
+        after_data = report_data.derive_after(after_data)
+    with probe.stage('aggregate'):
+        agg = report_data.compute_aggregates(pre_data, after_data)
+        agg.update(compute_text_aggregates(paths['pre']))
+
+    img = {}
+    report_charts.set_output({**FINAL_OUTPUT, 'dir': os.path.join(directory, 'images')})
+    try:
+        for name in CHARTS:
+            with probe.stage(f'chart_{name}'):
+                img[name] = report_charts.render_chart(name, agg)
+    finally:
+        report_charts.set_output(FINAL_OUTPUT)
+
+    with probe.stage('docx'):
+        write_document(agg, img, os.path.join(directory, 'report.docx'))
+
+
+def scaled_rows(scale=1):
+    return {wave: rows * scale for wave, rows in SYNTHETIC_ROWS.items()}
+
+
+def measure(repeat=REPEAT, log=print, scale=1):
+    """Per-stage {'seconds', 'peak_mb'} on the synthetic dataset, plus the dataset fingerprint."""
+    with tempfile.TemporaryDirectory() as directory:
+        paths, fingerprint = write_synthetic_data(directory, rows=scaled_rows(scale))
+        # The memory run goes first and doubles as the warm-up (font cache, DOCX template, ...)
+        memory = StageMemory()
+        tracemalloc.start()
+        try:
+            run_stages(paths, directory, memory)
+        finally:
+            tracemalloc.stop()
+
+        timings = []
+        for i in range(repeat):
+            timer = StageTimer()
+            run_stages(paths, directory, timer)
+            timings.append(timer.results)
+            if log:
+                log(f'run {i + 1}/{repeat}: {sum(timer.results.values()):.2f}s')
+
+    stages = {name: {'seconds': min(run[name] for run in timings), 'peak_mb': memory.results[name]}
+              for name in timings[0]}
+    return stages, fingerprint
+
+
+# ═══════════════════════════════════════════
+# BASELINE
+# ═══════════════════════════════════════════
+
+def machine():
+    return {'platform': platform.platform(), 'python': platform.python_version(),
+            'processor': platform.processor() or platform.machine(), 'cpus': os.cpu_count()}
+
+
+def write_baseline(stages, fingerprint, path=BASELINE_PATH, repeat=REPEAT, scale=1):
+    baseline = {
+        'version': BASELINE_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': machine(),
+        'dataset': {'seed': SEED, 'rows': scaled_rows(scale), 'fingerprint': fingerprint},
+        'backend': report_backend.get_backend().name,
+        'repeat': repeat,
+        'stages': {name: {'seconds': round(s['seconds'], 4), 'peak_mb': round(s['peak_mb'], 2)}
+                   for name, s in stages.items()},
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=1)
+    return baseline
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError(f'{path} is a version {baseline.get("version")} baseline, '
+                         f'expected {BASELINE_VERSION}; record a new one with --update-baseline')
+    return baseline
+
+
+def _change(old, new):
+    return (new - old) / old if old else float('inf') if new else 0.0
+
+
+def compare(baseline, stages, threshold=THRESHOLD, memory_threshold=MEMORY_THRESHOLD):
+    """Rows of (stage, metric, baseline, current, relative change, regressed)."""
+    rows = []
+    for name, current in stages.items():
+        old = baseline['stages'].get(name)
+        for metric, limit, floor in [('seconds', threshold, MIN_SECONDS), ('peak_mb', memory_threshold, MIN_MB)]:
+            if old is None:
+                # A stage the baseline does not know yet fails, or it would never be gated
+                rows.append((name, metric, None, current[metric], None, True))
+                continue
+            change = _change(old[metric], current[metric])
+            regressed = change > limit and current[metric] - old[metric] > floor
+            rows.append((name, metric, old[metric], current[metric], change, regressed))
+    return rows
+
+
+def format_report(rows, threshold, memory_threshold):
+    unit = {'seconds': 's', 'peak_mb': ' MB'}
+    lines = [f"{'stage':<36} {'metric':<8} {'baseline':>11} {'current':>11} {'change':>8}"]
+    for name, metric, old, new, change, regressed in rows:
+        old_text = '-' if old is None else f'{old:.3f}{unit[metric]}'
+        change_text = 'new' if change is None else f'{change:+.1%}'
+        flag = '  NOT IN BASELINE' if old is None else '  REGRESSION' if regressed else ''
+        lines.append(f"{name:<36} {metric:<8} {old_text:>11} {f'{new:.3f}{unit[metric]}':>11} {change_text:>8}{flag}")
+    failed = [row for row in rows if row[5]]
+    if failed:
+        lines.append('')
+        lines.append(f'{len(failed)} regression(s) over the threshold '
+                     f'(time +{threshold:.0%}, memory +{memory_threshold:.0%}) or stage(s) missing from the baseline:')
+        for name, metric, old, new, change, _ in failed:
+            if old is None:
+                lines.append(f'  {name} {metric}: not in the baseline; record it with --update-baseline')
+            else:
+                lines.append(f'  {name} {metric}: {old:.3f}{unit[metric]} -> {new:.3f}{unit[metric]} ({change:+.1%})')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check the report build stages against the stored performance baseline.')
+    parser.add_argument('--update-baseline', action='store_true', help='store the current numbers as the new baseline')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f'allowed relative slowdown per stage (default {THRESHOLD})')
+    parser.add_argument('--memory-threshold', type=float, default=MEMORY_THRESHOLD,
+                        help=f'allowed relative peak memory growth per stage (default {MEMORY_THRESHOLD})')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help=f'timed runs, the best one counts (default {REPEAT})')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline file')
+    parser.add_argument('--backend', choices=list(report_backend.BACKENDS), default=report_backend.CURRENT['backend'],
+                        help='dataframe backend for load / derive / aggregate (default: $REPORT_BACKEND or pandas)')
+    parser.add_argument('--scale', type=int, default=1,
+                        help=f"multiply the synthetic dataset size (default 1: {SYNTHETIC_ROWS['pre']} + {SYNTHETIC_ROWS['after']} responses)")
+    args = parser.parse_args(argv)
+    report_backend.set_backend(args.backend)
+
+    if not args.update_baseline and not os.path.exists(args.baseline):
+        parser.error(f'No baseline at {args.baseline}; record one with --update-baseline')
+
+    stages, fingerprint = measure(args.repeat, scale=args.scale)
+    if args.update_baseline:
+        write_baseline(stages, fingerprint, args.baseline, args.repeat, args.scale)
+        print(f'Baseline with {len(stages)} stages written to {args.baseline}')
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline['dataset']['fingerprint'] != fingerprint:
+        print('Warning: the synthetic dataset differs from the baseline one (the CSV exports changed); '
+              'consider --update-baseline')
+    if baseline.get('backend', 'pandas') != args.backend:
+        print(f"Comparing the {args.backend} backend with a baseline measured with {baseline.get('backend', 'pandas')}")
+    if baseline['machine'] != machine():
+        print(f"Warning: the baseline was recorded on another machine ({baseline['machine']['platform']})")
+
+    rows = compare(baseline, stages, args.threshold, args.memory_threshold)
+    print(format_report(rows, args.threshold, args.memory_threshold))
+    return 1 if any(row[5] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+Incremental (make-style) report build.
+
+The report is a graph of named nodes: the survey store sync, the two cleaned frames read from
+the store, the aggregate groups, one node per chart, the snapshot, the dashboard export and the
+DOCX. Every node declares its inputs (other nodes and files) and its code. A node's output is
+pickled to BUILD_DIR under a key hashed from that code and those inputs, and the next build
+reruns the node only when the key changes. A node that reruns but produces the same output does
+not invalidate anything downstream.
+
+Charts and the DOCX record which aggregates they read, and depend on those values only. Editing
+a DOCX caption therefore rebuilds the DOCX alone, and fixing one answer scale recomputes the
+aggregates but re-renders only the charts whose numbers changed.
+
+    python generate_report.py --incremental
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+
+import report_answers
+import report_backend
+import report_captions
+import report_charts
+import report_compare
+import report_data
+import report_docx
+import report_docx_stream
+import report_export
+import report_model
+import report_snapshot
+import report_store
+import report_text
+import report_weights
+from report_pipeline import CHART_AGGREGATES
+
+BUILD_DIR = os.path.join(report_data.BASE, '_report_build')
+AGGREGATE_GROUPS = ['pre', 'after', 'cross', 'text']
+
+
+def _sha(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return _sha(f.read())
+
+
+def value_hash(value):
+    return _sha(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def module_code(module):
+    return inspect.getsource(module)
+
+
+def chart_code(fn):
+    # A chart depends on its own function and on the shared helpers above the chart functions,
+    # not on the other charts, so editing one chart re-renders only that chart
+    source = module_code(report_charts)
+    shared = source[:source.index('# ─── Registry')]
+    for _, chart in report_charts.CHARTS.values():
+        shared = shared.replace(inspect.getsource(chart), '')
+    # Charts made by a factory (one per matched question) share their source and differ in what they close over
+    closure = inspect.getclosurevars(fn).nonlocals
+    return [shared, inspect.getsource(fn), repr(sorted(closure.items()))]
+
+
+class TrackedAggregates(dict):
+    """The combined aggregates dict, remembering which keys were read."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.reads = set()
+
+    def __getitem__(self, key):
+        self.reads.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.reads.add(key)
+        return super().get(key, default)
+
+
+class Node:
+    """
+    One build step. `fn` is called with the outputs of `inputs`, in order. With `aggregates`,
+    the listed aggregate groups are merged into one tracked dict passed as the first argument,
+    and the node depends on the aggregates it read last time instead of the whole groups.
+    `writes` maps the output to the file it stands for; the node is only skipped while that file
+    is still there, unchanged since the node wrote it.
+    """
+
+    def __init__(self, name, fn, inputs=(), files=(), code=(), aggregates=(), writes=None):
+        self.name = name
+        self.fn = fn
+        self.inputs = list(inputs)
+        self.files = list(files)
+        self.code = _sha(*code)
+        self.aggregates = list(aggregates)
+        self.writes = writes
+
+    def key(self, state, reads):
+        parts = [self.code]
+        parts += [file_hash(path) for path in self.files]
+        parts += [state[name]['output'] for name in self.inputs]
+        for key in sorted(reads):
+            parts.append(key)
+            parts += [state[f'agg_{g}']['keys'].get(key, '') for g in self.aggregates]
+        return _sha(*parts)
+
+
+def report_graph(output_path):
+    data_code = [module_code(report_answers), module_code(report_backend), module_code(report_weights),
+                 module_code(report_compare), module_code(report_model), module_code(report_data)]
+    # The frames are of the backend's own type; the aggregates computed from them are not
+    frame_code = data_code + [report_backend.get_backend().name]
+    groups = [f'agg_{g}' for g in AGGREGATE_GROUPS]
+
+    store_code = data_code + [module_code(report_store)]
+    sources = report_store.source_files()
+
+    nodes = [
+        # Stands for the store's manifest, which a sync only rewrites when an export brought changes
+        Node('store', report_store.sync, files=sources, code=store_code, writes=lambda path: path),
+        Node('pre_data', lambda manifest: report_data.derive_pre(report_store.load_wave('pre')),
+             inputs=['store'], code=frame_code + store_code),
+        Node('after_data', lambda manifest: report_data.derive_after(report_store.load_wave('after')),
+             inputs=['store'], code=frame_code + store_code),
+        Node('agg_pre', report_data.compute_pre_aggregates, inputs=['pre_data'], code=data_code),
+        Node('agg_after', report_data.compute_after_aggregates, inputs=['after_data'], code=data_code),
+        Node('agg_cross', report_data.compute_cross_aggregates, inputs=['pre_data', 'after_data'], code=data_code),
+        Node('agg_text', report_text.compute_text_aggregates, inputs=['pre_data'],
+             code=data_code + [module_code(report_text)]),
+    ]
+
+    charts = []
+    for name, (section, fn) in report_charts.CHARTS.items():
+        charts.append(f'chart_{name}')
+        nodes.append(Node(f'chart_{name}', lambda agg, name=name: report_charts.render_chart(name, agg),
+                          code=chart_code(fn), aggregates=CHART_AGGREGATES[section], writes=lambda path: path))
+
+    def write_snapshot(pre, after, *parts):
+        agg = {}
+        for part in parts:
+            agg.update(part)
+        return report_snapshot.write_snapshot(pre, after, agg)
+
+    # The snapshot stores a fingerprint of the CSVs and the data code, so it is keyed on them as well
+    nodes.append(Node('snapshot', write_snapshot, inputs=['pre_data', 'after_data'] + groups,
+                      files=sources, code=store_code + [module_code(report_text), module_code(report_snapshot)],
+                      writes=lambda path: os.path.join(path, 'manifest.json')))
+
+    def write_export(*parts):
+        agg = {}
+        for part in parts:
+            agg.update(part)
+        return report_export.write_export(agg)
+
+    # Stamped with the same fingerprint as the snapshot
+    nodes.append(Node('export', write_export, inputs=groups,
+                      files=sources,
+                      code=store_code + [module_code(report_text), module_code(report_snapshot), module_code(report_export)],
+                      writes=lambda path: path))
+
+    def write_docx(agg, *paths):
+        img = dict(zip(report_charts.CHARTS, paths))
+        return report_docx_stream.write_document(agg, img, output_path)
+
+    nodes.append(Node('docx', write_docx, inputs=charts,
+                      code=[module_code(report_docx), module_code(report_captions), module_code(report_docx_stream), output_path],
+                      aggregates=AGGREGATE_GROUPS, writes=lambda path: path))
+    return nodes
+
+
+# ═══════════════════════════════════════════
+# BUILD
+# ═══════════════════════════════════════════
+
+def _load_state(build_dir):
+    try:
+        with open(os.path.join(build_dir, 'state.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_state(build_dir, state):
+    tmp = os.path.join(build_dir, 'state.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp, os.path.join(build_dir, 'state.json'))
+
+
+def _output_hash(node, output):
+    # Content hashes, so a node that reruns with the same result leaves its dependents alone
+    if node.writes is not None:
+        return file_hash(node.writes(output))
+    return value_hash(output)
+
+
+def _up_to_date(node, record, key):
+    if record is None or record['key'] != key:
+        return False
+    if node.writes is None:
+        return True
+    path = record['path']
+    return os.path.exists(path) and file_hash(path) == record['output']
+
+
+def build(output_path, build_dir=BUILD_DIR, nodes=None, log=print, memo=None):
+    """
+    Runs the nodes whose code or inputs changed since the last build; returns their names.
+    A long-running caller (report_watch.py) can pass the same `memo` dict to every build, so
+    node outputs stay in memory instead of being read back from BUILD_DIR.
+    """
+    nodes = report_graph(output_path) if nodes is None else nodes
+    os.makedirs(os.path.join(build_dir, 'outputs'), exist_ok=True)
+    previous = _load_state(build_dir)
+    state = {}
+    values = {} if memo is None else memo
+    rebuilt = []
+
+    def value(name):
+        if name not in values:
+            with open(os.path.join(build_dir, 'outputs', f'{name}.pkl'), 'rb') as f:
+                values[name] = pickle.load(f)
+        return values[name]
+
+    for node in nodes:
+        record = previous.get(node.name)
+        reads = record.get('reads', []) if record else []
+        if _up_to_date(node, record, node.key(state, reads)):
+            state[node.name] = record
+            continue
+
+        args = [value(name) for name in node.inputs]
+        if node.aggregates:
+            agg = TrackedAggregates()
+            for g in node.aggregates:
+                agg.update(value(f'agg_{g}'))
+            output = node.fn(agg, *args)
+            reads = sorted(agg.reads)
+        else:
+            output = node.fn(*args)
+        values[node.name] = output
+        with open(os.path.join(build_dir, 'outputs', f'{node.name}.pkl'), 'wb') as f:
+            pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        record = {'output': _output_hash(node, output), 'reads': reads}
+        if node.writes is not None:
+            record['path'] = node.writes(output)
+        if node.name.startswith('agg_'):
+            record['keys'] = {k: value_hash(v) for k, v in output.items()}
+        state[node.name] = record
+        record['key'] = node.key(state, reads)
+        rebuilt.append(node.name)
+        # Saved after every step, so an interrupted build keeps the steps it finished
+        _save_state(build_dir, {**previous, **state})
+
+    _save_state(build_dir, state)
+    if log:
+        log(f'{len(rebuilt)} of {len(nodes)} build steps rerun' + (': ' + ', '.join(rebuilt) if rebuilt else ''))
+    return rebuilt
@@ -0,0 +1,111 @@
+"""
+One report per school, rendered in bulk from the survey store.
+
+    python generate_report.py --schools                       # every school in both report waves
+    python report_bulk.py --school 'Stredná odborná škola s maturitou'
+
+Each school's responses of the two report waves (report_data.report_waves) are read from the
+store (report_store.py), aggregated and rendered like the full report. Captions and summaries are
+templates filled in from the school's own numbers (report_captions.py), and the title page names
+the school, so no report needs its text edited by hand. A school that has no responses in one of
+the waves is skipped, as there is nothing to compare. The free-text section summarizes the
+school's own open answers, which the store keeps with the rest of each response.
+
+BULK_DIR/<school>/
+  OZ Different - <school>.docx
+  images/              the report's charts for that school
+"""
+
+import argparse
+import os
+import sys
+
+import report_charts
+import report_data
+import report_store
+from report_backend import BACKENDS, CURRENT, set_backend
+from report_charts import FINAL_OUTPUT
+from report_docx import SECTIONS
+from report_docx_stream import new_document
+from report_text import compute_text_aggregates
+
+BULK_DIR = os.path.join(report_data.BASE, '_report_schools')
+
+
+def report_schools(store):
+    """(schools with responses in both report waves, schools missing from one of them)."""
+    index = store.index.select(['wave', 'school']).to_pandas()
+    waves = [set(index.loc[index['wave'] == wave, 'school'].dropna()) for wave in report_data.report_waves.values()]
+    schools = sorted(set.union(*waves))
+    both = [school for school in schools if all(school in wave for wave in waves)]
+    return both, [school for school in schools if school not in both]
+
+
+def school_aggregates(store, school, backend=None):
+    pre = report_data.derive_pre(store.read(report_data.report_waves['pre'], school, backend=backend))
+    after = report_data.derive_after(store.read(report_data.report_waves['after'], school, backend=backend))
+    agg = report_data.compute_aggregates(pre, after)
+    agg.update(compute_text_aggregates(pre))
+    agg['school'] = school
+    return agg
+
+
+def build_school_report(store, school, directory=BULK_DIR, backend=None):
+    """Renders one school's report into its own directory; returns the DOCX path."""
+    agg = school_aggregates(store, school, backend)
+    school_dir = os.path.join(directory, school)
+    charts = [chart for _, chart_section in SECTIONS.values() if chart_section
+              for chart in report_charts.charts_for(chart_section)]
+
+    report_charts.set_output({**FINAL_OUTPUT, 'dir': os.path.join(school_dir, 'images')})
+    try:
+        img = {name: report_charts.render_chart(name, agg) for name in charts}
+    finally:
+        report_charts.set_output(FINAL_OUTPUT)
+
+    path = os.path.join(school_dir, f'OZ Different - {school}.docx')
+    with new_document(path) as doc:
+        for build, _ in SECTIONS.values():
+            build(doc, agg, img)
+    return path
+
+
+def build_school_reports(schools=None, directory=BULK_DIR, backend=None, log=print):
+    """Syncs the store and renders the report of every school in `schools` (default: all that can be compared)."""
+    report_store.sync(log=log)
+    store = report_store.Store()
+    comparable, missing = report_schools(store)
+    if schools is None:
+        schools = comparable
+    for school in missing:
+        if log:
+            log(f'{school}: skipped, no responses in one of the report waves')
+    paths = []
+    for school in schools:
+        if school not in comparable:
+            raise ValueError(f"No responses of {school!r} in both report waves; schools with both: {', '.join(comparable)}")
+        paths.append(build_school_report(store, school, directory, backend))
+        if log:
+            log(f'{school}: {paths[-1]}')
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render one report per school from the survey store.')
+    parser.add_argument('--school', action='append', default=None,
+                        help='canonical school answer; repeatable (default: every school in both report waves)')
+    parser.add_argument('--output', default=BULK_DIR, help='directory of the per-school reports')
+    parser.add_argument('--backend', choices=list(BACKENDS), default=CURRENT['backend'],
+                        help='dataframe library for loading and deriving the data')
+    args = parser.parse_args(argv)
+    set_backend(args.backend)
+    try:
+        paths = build_school_reports(args.school, args.output)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f'{len(paths)} school reports in {os.path.abspath(args.output)}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
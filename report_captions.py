@@ -0,0 +1,647 @@
+"""
+Captions and summary bullets of the report, bound to the aggregates.
+
+Every number the DOCX prints comes from a template in CAPTIONS, filled in from the aggregates
+dict (report_data.py) when the section is written, so a report for another school or another
+wave needs no text edited by hand. A template field is either an aggregate or a named value
+of VALUES, computed from the aggregates when the field is filled in (a section only reads
+the aggregates its captions use, as report_pipeline.py and report_build.py expect):
+
+    caption(agg, 'pre_missed_school')
+    render('Zo {num_pre} respondentiek ...', agg)
+
+Numbers are written the Slovak way: decimal comma, non-breaking space between thousands
+('{avg_age:.2f}' -> '16,24'). Two format specs more cover what Slovak word order needs:
+
+  {n:|one|few|many}   the number with the noun agreeing with it: 1 respondentka,
+                      2-4 respondentky, 5+ respondentiek
+  {n:~one|few|many}   the agreeing word alone, for verbs ('uviedla' / 'uviedli' / 'uviedlo')
+  {n:z.1f} {n:Z}      the number after the preposition z / zo (zo 63,2%, z 79), chosen by how
+                      the number is read out; Z capitalizes it at the start of a sentence
+
+Sentences that make a claim about the data (a correlation's direction, which group had fewer
+amenities) are VALUES too, so the claim is only made when the numbers bear it out. A sentence
+whose number could not be computed (NaN: nobody in a group, no variance) is left out instead.
+"""
+
+import math
+import numbers
+import string
+
+import numpy as np
+
+from report_compare import headline
+from report_data import AGE_BINS, FIRST_PERIOD_BINS, group_order, group_order_age, matched_questions
+from report_model import MIN_GROUP
+
+NBSP = '\u00a0'
+
+# Spoken first words that take 'zo': štyri, šesť, sedem (and štrnásť, šesťdesiat, štyristo ...), sto
+ZO_DIGITS = {4, 6, 7}
+ZO_TEENS = {14, 16, 17}
+
+# Share in percent -> words, nominative and accusative ('Ide o dve tretiny', 'teda dve tretiny')
+FRACTIONS = [
+    (25, 'štvrtina', 'štvrtinu'),
+    (100 / 3, 'tretina', 'tretinu'),
+    (50, 'polovica', 'polovicu'),
+    (200 / 3, 'dve tretiny', 'dve tretiny'),
+    (75, 'tri štvrtiny', 'tri štvrtiny'),
+]
+
+# Information preparedness answers that count as not informed enough
+INFO_GAP = ['Mala som len čiastočné informácie', 'Nemala som žiadne informácie']
+# Information preparedness answers as the first period caption words their groups
+INFO_AGE_PHRASES = {
+    'Nemala som žiadne informácie': 'u tých bez informácií',
+    'Mala som len čiastočné informácie': 'u čiastočne informovaných',
+    'Áno, mala som všetky potrebné informácie': 'u plne informovaných',
+}
+# Correlations weaker than this (in absolute value) are reported as no clear relationship
+WEAK_CORRELATION = 0.1
+
+# After-installation age bands (report_answers.SCALES['age_band']) as the age caption words them
+AGE_BAND_PHRASES = {
+    'Do 15 rokov': 'mladších ako 16 rokov',
+    '16 - 18 rokov': 'vo veku 16-18 rokov',
+    'Viac ako 18 rokov': 'starších ako 18 rokov',
+}
+
+
+# ═══════════════════════════════════════════
+# SLOVAK NUMBERS
+# ═══════════════════════════════════════════
+
+def sk(value, spec=''):
+    """`value` formatted with `spec`, with a decimal comma and non-breaking spaces between thousands."""
+    text = format(value, spec.replace(',', '_'))
+    return text.replace('.', ',').replace('_', NBSP)
+
+
+def preposition_z(n, capital=False):
+    """'z' or 'zo' before the number `n`, by the first word it is read out with."""
+    n = abs(int(n))
+    # 'tisíc', 'dvetisíc', 'štyritisíc', 'sto tisíc': the leading group decides
+    while n >= 1000:
+        if n < 2000:
+            n = 0
+            break
+        n //= 1000
+    if n >= 200:
+        zo = n // 100 in ZO_DIGITS
+    elif n >= 100:
+        zo = True
+    elif n >= 20:
+        zo = n // 10 in ZO_DIGITS
+    elif n >= 10:
+        zo = n in ZO_TEENS
+    else:
+        zo = n in ZO_DIGITS
+    word = 'zo' if zo else 'z'
+    return word.capitalize() if capital else word
+
+
+def plural(n, one, few, many):
+    """The form agreeing with the count `n`: 1, 2-4, else (0, 5+)."""
+    n = abs(int(round(n)))
+    if n == 1:
+        return one
+    if 2 <= n <= 4:
+        return few
+    return many
+
+
+def listing(items):
+    """'a', 'a a b', 'a, b a c'."""
+    items = list(items)
+    if len(items) < 2:
+        return ''.join(items)
+    return ', '.join(items[:-1]) + ' a ' + items[-1]
+
+
+def fraction_words(share, case='nom'):
+    """A share in percent as 'takmer dve tretiny', 'viac ako polovica', ... in the nominative or accusative."""
+    form = 1 if case == 'nom' else 2
+    for i, fraction in enumerate(FRACTIONS):
+        if abs(share - fraction[0]) < 1:
+            return fraction[form]
+        if share < fraction[0]:
+            if fraction[0] - share <= 5:
+                return f'takmer {fraction[form]}'
+            return f'viac ako {FRACTIONS[i - 1][form]}' if i else f'menej ako {fraction[form]}'
+    return f'viac ako {FRACTIONS[-1][form]}'
+
+
+def share(count, total):
+    """`count` of `total` in percent; 0 when there is no one to count."""
+    return count / total * 100 if total else 0.0
+
+
+class SlovakFormatter(string.Formatter):
+    """Fills a template from the aggregates, VALUES and keyword arguments, formatting numbers the Slovak way."""
+
+    def __init__(self, agg):
+        self.agg = agg
+
+    def get_value(self, key, args, kwargs):
+        if key in kwargs:
+            return kwargs[key]
+        if key in VALUES:
+            return VALUES[key](self.agg)
+        return self.agg[key]
+
+    def format_field(self, value, spec):
+        if spec[:1] in ('|', '~'):
+            forms = spec[1:].split('|')
+            word = plural(value, *forms)
+            return word if spec[0] == '~' else f'{sk(int(round(value)), "d")} {word}'
+        if spec[:1] in ('z', 'Z'):
+            number = sk(value, spec[1:]) if spec[1:] else sk(int(round(value)), 'd')
+            return f'{preposition_z(value, spec[0] == "Z")} {number}'
+        if isinstance(value, numbers.Number) and not isinstance(value, bool):
+            return sk(value, spec)
+        return format(value, spec)
+
+
+def render(template, agg, **values):
+    """`template` filled in from `agg`; keyword arguments fill fields that are not aggregates (a table row)."""
+    return SlovakFormatter(agg).format(template, **values)
+
+
+def caption(agg, name, **values):
+    """The filled-in template `name`; empty when all of its sentences were left out."""
+    return render(CAPTIONS[name], agg, **values).strip()
+
+
+# ═══════════════════════════════════════════
+# DERIVED VALUES
+# ═══════════════════════════════════════════
+
+def capital(text):
+    return text[:1].upper() + text[1:]
+
+
+def ranked(counts, total, top=None, sep=None):
+    """'mama (88,0%), škola (16,5%) a internet (15,8%)': the largest counts, as shares of `total`."""
+    counts = counts[counts > 0].sort_values(ascending=False, kind='stable')
+    items = [f'{label.lower()} ({sk(share(n, total), ".1f")}%)' for label, n in counts.items()][:top]
+    return f' {sep} '.join(items) if sep else listing(items)
+
+
+def hist_edges(hist, bins):
+    """(lowest, highest, most frequent first) bin edges of a histogram with at least one value."""
+    filled = [edge for edge, n in zip(bins, hist) if n > 0]
+    modes = [bins[i] for i in np.argsort(-np.asarray(hist), kind='stable') if hist[i] > 0]
+    return filled[0], filled[-1], modes
+
+
+def answer_share(counts, labels, total=None):
+    """Share of the answers `labels` (one or several) among `total`, by default everyone who answered."""
+    labels = [labels] if isinstance(labels, str) else labels
+    total = counts.sum() if total is None else total
+    return share(sum(counts.get(label, 0) for label in labels), total)
+
+
+def school_types(counts):
+    types = [f'{label.lower()} ({n})' for label, n in counts.items() if n > 0]
+    return ('Typ školy: ' if len(types) == 1 else 'Typy škôl: ') + listing(types)
+
+
+def composition_note(a):
+    # School types that answered before the installation but not after it
+    only_pre = [label.lower() for label, n in a['schools_pre'].items() if n > 0 and a['schools_after'].get(label, 0) == 0]
+    if not only_pre:
+        return 'Vlny sa môžu líšiť zložením.'
+    verb = 'odpovedala' if len(only_pre) == 1 else 'odpovedali'
+    return f'Vlny sa líšia zložením: pred inštaláciou {verb} aj {listing(only_pre)}.'
+
+
+def matched_headline(a, name, key='matched'):
+    """The row of a matched question's headline answer in a['matched'] (or a[key])."""
+    return headline(a[key][name], matched_questions[name][2])
+
+
+def weighted_headline(a, name):
+    # The weighted shares of a matched question's headline answer, with the effective sample sizes
+    table = a['matched_weighted'][name]
+    return render(CAPTIONS['cross_weighted_change'], a, **{**matched_headline(a, name, 'matched_weighted'),
+                                                             'pre_n': table['pre_n'].sum(),
+                                                             'post_n': table['post_n'].sum()})
+
+
+def is_missing(value):
+    return isinstance(value, numbers.Number) and math.isnan(value)
+
+
+def info_age_later(a):
+    """
+    Whether respondents without information before their first period had it earlier than fully
+    informed ones; None when one of the two groups has no mean age.
+    """
+    means = a['mean_ages']
+    none = means.get('Nemala som žiadne informácie', np.nan)
+    full = means.get('Áno, mala som všetky potrebné informácie', np.nan)
+    if is_missing(none) or is_missing(full):
+        return None
+    return none < full
+
+
+def info_age_claim(a):
+    later = info_age_later(a)
+    if later is None:
+        return ''
+    if later:
+        return 'Respondentky, ktoré dostali menštruáciu skôr, mali k dispozícii menej informácií. '
+    return 'Respondentky, ktoré dostali menštruáciu skôr, nemali k dispozícii menej informácií. '
+
+
+def info_age_means(a):
+    means = a['mean_ages']
+    parts = [f'{sk(means[label], ".1f")} roka {phrase}' for label, phrase in INFO_AGE_PHRASES.items()
+             if not is_missing(means.get(label, np.nan))]
+    if not parts:
+        return ''
+    return f'Priemerný vek prvej menštruácie bol {listing(parts)}.'
+
+
+def info_age_summary(a):
+    later = info_age_later(a)
+    if later is None:
+        return ''
+    if later:
+        return 'Respondentky s nižším vekom prvej menštruácie mali menej informácií'
+    return 'Vek prvej menštruácie nesúvisel s menšou informovanosťou'
+
+
+def absence_change(a, caption_name):
+    row = matched_headline(a, 'absence')
+    direction = 'fell' if row['change'] < 0 else 'rose' if row['change'] > 0 else 'same'
+    return render(CAPTIONS[f'{caption_name}_{direction}'], a, **row, change_points=abs(row['change']))
+
+
+def correlation_direction(r):
+    """'negatívna' / 'pozitívna', or None for a correlation too weak (or undefined) to have a direction."""
+    if is_missing(r) or abs(r) < WEAK_CORRELATION:
+        return None
+    return 'negatívna' if r < 0 else 'pozitívna'
+
+
+def correlation_sentence(r, between):
+    if is_missing(r):
+        return ''
+    direction = correlation_direction(r)
+    if direction is None:
+        return f'Korelácia medzi {between} bola len {sk(r, ".2f")}, jasný vzťah sa teda nepotvrdil. '
+    return f'Bola zistená {direction} korelácia {sk(r, ".2f")} medzi {between}. '
+
+
+def lack_claim(a):
+    ages, siblings = a['corr_age_lack'], a['corr_siblings_lack']
+    if is_missing(ages) and is_missing(siblings):
+        return ''
+    parts = []
+    direction = correlation_direction(ages)
+    if direction is not None:
+        parts.append('mladšie respondentky' if direction == 'negatívna' else 'staršie respondentky')
+    direction = correlation_direction(siblings)
+    if direction is not None:
+        parts.append('respondentky s viac súrodencami' if direction == 'pozitívna' else 'respondentky s menej súrodencami')
+    if not parts:
+        return 'Medzi nedostatkom vybaveností a vekom či počtom súrodencov sa nepotvrdil jasný vzťah'
+    return capital(listing(parts)) + ' majú väčší nedostatok vybaveností'
+
+
+def group_extremes(means, order):
+    """
+    (group, mean) of the first and the last group of `order` that has respondents; None when fewer
+    than two groups have any.
+    """
+    present = [g for g in order if g in means.index and not math.isnan(means[g])]
+    if len(present) < 2:
+        return None
+    return (present[0], means[present[0]]), (present[-1], means[present[-1]])
+
+
+def siblings_note(a):
+    extremes = group_extremes(a['group_means'], group_order)
+    if extremes is None:
+        return ''
+    (few, few_mean), (many, many_mean) = extremes
+    who = {group: 'bez súrodencov' if group == '0' else f's {group} súrodencami' for group in [few, many]}
+    lack = {mean: 'nemali žiadny nedostatok' if mean == 0 else f'nemali v priemere {sk(mean, ".2f")} vybavenosti'
+            for mean in [few_mean, many_mean]}
+    if few_mean == many_mean:
+        return f'Respondentky {who[many]} {lack[many_mean]}, rovnako ako respondentky {who[few]}.'
+    return f'Respondentky {who[many]} {lack[many_mean]}, zatiaľ čo respondentky {who[few]} {lack[few_mean]}.'
+
+
+def age_lack_note(a):
+    extremes = group_extremes(a['group_means_age'], group_order_age)
+    if extremes is None:
+        return ''
+    (young, young_mean), (old, old_mean) = extremes
+    only = 'len ' if old_mean < young_mean else ''
+    return (f'Mladšie respondentky ({young} rokov) mali v priemere {sk(young_mean, ".2f")} chýbajúcich vybaveností, '
+            f'zatiaľ čo staršie ({old} rokov) {only}{sk(old_mean, ".2f")}.')
+
+
+def after_ages(a):
+    ages = a['age_counts']
+    answered = ages.sum()
+    bands = [f'{sk(share(ages[band], answered), ".1f")}% {phrase}' for band, phrase in AGE_BAND_PHRASES.items()
+             if ages.get(band, 0) > 0]
+    missing = a['num_after'] - answered
+    sentence = render(CAPTIONS['after_age_missing'], a, missing=missing) if missing else ''
+    return f'{listing(bands)}.{sentence}'
+
+
+def model_significance(a):
+    terms = a['model_terms'].iloc[1:]
+    significant = [term for term, row in terms.iterrows() if row['p_value'] < 0.05]
+    if significant:
+        return f"Štatisticky významné (p < 0,05) boli: {', '.join(significant)}."
+    return 'Žiadny z faktorov nebol štatisticky významný (p < 0,05).'
+
+
+def model_groups_skipped(a):
+    groups = a['model_groups']
+    skipped = groups[groups.drop(columns='n').isna().all(axis=1)]
+    small = [label.lower() for label in skipped.index[skipped['n'] < MIN_GROUP]]
+    diverged = [label.lower() for label in skipped.index[skipped['n'] >= MIN_GROUP]]
+    text = ''
+    if small:
+        text += (f'{capital(listing(small))} {plural(len(small), "má", "majú", "má")} menej ako {MIN_GROUP} '
+                 f'respondentiek s úplnými odpoveďami, preto {plural(len(small), "nemá", "nemajú", "nemá")} '
+                 'vlastný model. ')
+    if diverged:
+        text += (f'{capital(listing(diverged))} {plural(len(diverged), "nemá", "nemajú", "nemá")} vlastný model, '
+                 'lebo jeho odhad nekonvergoval (napríklad keď všetky respondentky odpovedali rovnako). ')
+    return text
+
+
+def model_bootstrap(a):
+    fit = a['model_fit']
+    if fit['boot_used'] == 0:
+        return f'Bootstrap intervaly sa pri menej ako {MIN_GROUP} respondentkách nepočítajú. '
+    if fit['boot_dropped'] == 0:
+        return ''
+    return render('{dropped:|bootstrap výber bol vynechaný|bootstrap výbery boli vynechané|bootstrap výberov bolo '
+                  'vynechaných}, lebo v nich všetky respondentky odpovedali rovnako alebo odhad nekonvergoval; '
+                  'bootstrap intervaly vychádzajú zo zvyšných {used:,.0f}. ',
+                  a, dropped=fit['boot_dropped'], used=fit['boot_used'])
+
+
+def after_share(key, labels):
+    """Value: share of the answers `labels` to an after-installation question among all its respondents."""
+    return lambda a: answer_share(a[key], labels, a['num_after'])
+
+VALUES = {
+    # ─── Collected data ───
+    'school_types_pre': lambda a: school_types(a['schools_pre']),
+    'school_types_after': lambda a: school_types(a['schools_after']),
+
+    # ─── Before installation ───
+    'age_min': lambda a: hist_edges(a['age_hist'], AGE_BINS)[0],
+    'age_max': lambda a: hist_edges(a['age_hist'], AGE_BINS)[1],
+    'age_mode': lambda a: hist_edges(a['age_hist'], AGE_BINS)[2][0],
+    'first_period_min': lambda a: hist_edges(a['first_period_hist'], FIRST_PERIOD_BINS)[0],
+    'first_period_max': lambda a: hist_edges(a['first_period_hist'], FIRST_PERIOD_BINS)[1],
+    'first_period_modes': lambda a: listing(str(age) for age in sorted(hist_edges(a['first_period_hist'], FIRST_PERIOD_BINS)[2][:2])),
+    'missed_yes': lambda a: a['missed_counts'].get('Áno', 0),
+    'missed_share': lambda a: share(a['missed_counts'].get('Áno', 0), a['num_pre']),
+    'missed_fraction': lambda a: fraction_words(share(a['missed_counts'].get('Áno', 0), a['num_pre']), 'acc'),
+    'afford_yes': lambda a: a['afford_counts'].get('Áno', 0),
+    'afford_share': lambda a: share(a['afford_counts'].get('Áno', 0), a['num_pre']),
+    'no_info': lambda a: a['info_prep_counts'].get('Nemala som žiadne informácie', 0),
+    'no_info_share': lambda a: share(a['info_prep_counts'].get('Nemala som žiadne informácie', 0), a['num_pre']),
+    'partial_info': lambda a: a['info_prep_counts'].get('Mala som len čiastočné informácie', 0),
+    'partial_info_share': lambda a: share(a['info_prep_counts'].get('Mala som len čiastočné informácie', 0), a['num_pre']),
+    'info_gap_share': lambda a: answer_share(a['info_prep_counts'], INFO_GAP, a['num_pre']),
+    'info_gap_fraction': lambda a: fraction_words(answer_share(a['info_prep_counts'], INFO_GAP, a['num_pre'])),
+    'info_sources_top': lambda a: ranked(a['info_sums'], a['num_pre'], top=3),
+    'info_lectures_share': lambda a: share(a['info_sums'].get('Prednášky/Workshopy', 0), a['num_pre']),
+    'info_age_claim': info_age_claim,
+    'info_age_means': info_age_means,
+    'products_top': lambda a: ranked(a['product_sums'], a['num_pre']),
+    'pads_share': lambda a: share(a['product_sums'].get('Menštruačné vložky', 0), a['num_pre']),
+    'full_access_share': lambda a: share(a['full_access'], a['num_pre']),
+    'lacking_share': lambda a: share(a['lacking_any'], a['num_pre']),
+    'siblings_note': siblings_note,
+    'corr_siblings_sentence': lambda a: correlation_sentence(a['corr_siblings_lack'], 'počtom súrodencov a nedostatkom vybaveností'),
+    'corr_age_sentence': lambda a: correlation_sentence(a['corr_age_lack'], 'vekom a nedostatkom vybaveností'),
+    'age_lack_note': age_lack_note,
+    'symptoms_top': lambda a: ranked(a['symptom_sums'], a['num_pre']),
+    'tampon_no_water': lambda a: a['hot_water_counts'].get('Nie', 0),
+    'tampon_no_water_share': lambda a: share(a['hot_water_counts'].get('Nie', 0), a['total_tampon']),
+    'model_respondents': lambda a: a['model_fit']['respondents'],
+    'model_events': lambda a: a['model_fit']['events'],
+    'model_fits': lambda a: a['model_fit']['fits'],
+    'model_accuracy': lambda a: a['model_fit']['cv_accuracy'],
+    'model_log_loss': lambda a: a['model_fit']['cv_log_loss'],
+    'model_baseline': lambda a: a['model_fit']['cv_baseline_log_loss'],
+    'model_significance': model_significance,
+    'model_groups_skipped': model_groups_skipped,
+    'model_bootstrap': model_bootstrap,
+
+    # ─── Summary before installation ───
+    'lack_claim': lack_claim,
+    'info_age_summary': info_age_summary,
+
+    # ─── After installation ───
+    'after_ages': after_ages,
+    'missed_after_share': after_share('missed_after', 'Áno'),
+    'days_top': lambda a: ranked(a['days_missed'], a['days_missed'].sum(), top=2, sep='alebo'),
+    'reason_top': lambda a: ranked(a['reasons'], a['reasons'].sum(), top=1),
+    'used_pads_yes': lambda a: answer_share(a['used_pads'], 'Áno'),
+    'used_pads_no': lambda a: answer_share(a['used_pads'], 'Nie'),
+    'products_multiple': after_share('products', 'Áno, viackrát'),
+    'products_once': after_share('products', 'Áno, raz'),
+    'products_not_needed': after_share('products', 'Vedela som o nich, ale nepotrebovala som ich'),
+    'products_unaware': after_share('products', 'Nevedela som, že sú dostupné'),
+    'attendance_more': after_share('attendance', 'Áno, chodila som do školy častejšie'),
+    'attendance_same': after_share('attendance', 'Nie, nezmenilo sa to'),
+    'attendance_same_fraction': lambda a: fraction_words(after_share('attendance', 'Nie, nezmenilo sa to')(a), 'acc'),
+    'feelings_better': after_share('feelings', 'Lepšie ako predtým'),
+    'feelings_same': after_share('feelings', 'Rovnako'),
+    'feelings_worse': after_share('feelings', 'Horšie'),
+    'confident_yes': after_share('confident', 'Áno'),
+    'continue_yes': after_share('continue_proj', 'Áno'),
+    'continue_indifferent': after_share('continue_proj', 'Je mi to jedno'),
+    'future_yes': after_share('future_proj', 'Áno, určite'),
+    'discussion_sure': after_share('discussion', 'Určite áno'),
+    'discussion_yes': after_share('discussion', ['Určite áno', 'Skôr áno']),
+    'psych_yes': after_share('psych', 'Áno'),
+    'psych_partly': after_share('psych', 'Čiastočne'),
+    'psych_positive': after_share('psych', ['Áno', 'Čiastočne']),
+    'lectures_sure': after_share('lectures', 'Určite áno'),
+    'lectures_yes': after_share('lectures', ['Určite áno', 'Skôr áno']),
+    'help_calm': after_share('help_issue', 'Cítila som sa pokojnejšie a bezpečnejšie'),
+    'help_overflow': after_share('help_issue', 'Pomohlo mi vyhnúť sa pretečeniu/nepríjemnostiam'),
+    'help_stress': after_share('help_issue', 'Nemala som pri sebe pomôcku, pomohlo mi to prekonať stres'),
+    'topics_top': lambda a: listing(f'{label.lower()} ({sk(n, ".0f")})' for label, n in a['topics'].head(3).items() if n > 0),
+
+    # ─── Cross analysis and final summary ───
+    'absence_change': lambda a: absence_change(a, 'cross_absence'),
+    'absence_change_summary': lambda a: absence_change(a, 'summary_change'),
+    'absence_pre': lambda a: matched_headline(a, 'absence')['pre'],
+    'absence_post': lambda a: matched_headline(a, 'absence')['post'],
+    'composition_note': composition_note,
+    'absence_weighted': lambda a: weighted_headline(a, 'absence'),
+    'used_share': lambda a: share(a['total_used'], a['num_after']),
+    'useful_share': lambda a: share(a['useful_yes'], a['num_after']),
+    'continue_share': lambda a: share(a['continue_yes_raw'], a['num_after']),
+    'future_share': lambda a: share(a['future_yes_raw'] + a['future_maybe_raw'], a['num_after']),
+    'afford_hs': lambda a: a['pre_afford_hs'].get('Áno', 0),
+    'stress_hs': lambda a: a['pre_stress_hs'].get('Áno', 0) + a['pre_stress_hs'].get('Niekedy', 0),
+    'info_gap_hs': lambda a: sum(a['pre_info_prep_hs'].get(label, 0) for label in INFO_GAP),
+}
+
+
+# ═══════════════════════════════════════════
+# TEMPLATES
+# ═══════════════════════════════════════════
+
+CAPTIONS = {
+    # ─── Title and collected data ───
+    'subtitle': 'Dátová analýza výskumu menštruačnej chudoby v Bardejove',
+    'subtitle_school': 'Dátová analýza výskumu menštruačnej chudoby v Bardejove – {school}',
+    'collected_pre': '{num_pre:|respondentka|respondentky|respondentiek}',
+    'collected_pre_schools': '{school_types_pre}',
+    'collected_after': '{num_after:|respondentka|respondentky|respondentiek}',
+    'collected_after_schools': '{school_types_after}',
+
+    # ─── Before installation ───
+    'pre_age': '{num_pre:Z} {num_pre:~respondentky|respondentiek|respondentiek} bol priemerný vek {avg_age:g} rokov. '
+               'Najmladšia respondentka mala {age_min} rokov, najstaršia {age_max} rokov. Najväčšie zastúpenie mali '
+               '{age_mode}-ročné respondentky.',
+    'pre_first_period': 'Priemerný vek prvej menštruácie bol {avg_first_period_age:g} rokov. Najmladšia respondentka dostala '
+                        'prvú menštruáciu v {first_period_min} rokoch, najstaršia v {first_period_max} rokoch. Najčastejšie '
+                        'sa prvá menštruácia objavila v {first_period_modes} rokoch.',
+    'pre_missed_school': '{missed_yes:|respondentka|respondentky|respondentiek} ({missed_share:.1f}%) '
+                  '{missed_yes:~uviedla|uviedli|uviedlo}, že niekedy {missed_yes:~vynechala|vynechali|vynechalo} školu '
+                  'kvôli menštruácii. Ide o {missed_fraction} všetkých respondentiek.',
+    'pre_afford': '{afford_yes:|respondentka|respondentky|respondentiek} ({afford_share:.1f}%) '
+                  '{afford_yes:~uviedla|uviedli|uviedlo}, že si aspoň raz {afford_yes:~nemohla|nemohli|nemohli} dovoliť '
+                  'kúpiť menštruačné pomôcky z finančných dôvodov.',
+    'pre_info_prep': '{no_info:|respondentka|respondentky|respondentiek} ({no_info_share:.1f}%) '
+                     '{no_info:~nemala|nemali|nemalo} žiadne informácie pred prvou menštruáciou a {partial_info} '
+                     '({partial_info_share:.1f}%) {partial_info:~mala|mali|malo} len čiastočné informácie. Spolu nebolo '
+                     'dostatočne informovaných {info_gap_share:.1f}% respondentiek, teda {info_gap_fraction}.',
+    'pre_info_sources': 'Najčastejšie zdroje informácií o menštruácii: {info_sources_top}. Prednášky a workshopy boli '
+                        'zdrojom informácií pre {info_lectures_share:.1f}% respondentiek.',
+    'pre_info_age': '{info_age_claim}{info_age_means}',
+    'pre_products': 'Respondentky používali {products_top}.',
+    'pre_amenities': '{full_access:|respondentka|respondentky|respondentiek} ({full_access_share:.1f}%) '
+                     '{full_access:~mala|mali|malo} plný prístup ku všetkým vybavenostiam. '
+                     '{lacking_any:|respondentka|respondentky|respondentiek} ({lacking_share:.1f}%) '
+                     '{lacking_any:~nemala|nemali|nemalo} prístup aspoň k jednej zo základných vybaveností '
+                     '(kúrenie, teplá voda, sprcha/vaňa, splachovací WC).',
+    'pre_siblings_amenities': '{corr_siblings_sentence}{siblings_note}',
+    'pre_age_amenities': '{corr_age_sentence}{age_lack_note}',
+    'pre_symptoms': 'Najčastejšie symptómy počas menštruácie: {symptoms_top}.',
+    'pre_tampon_water': '{total_tampon:Z} {total_tampon:~používateľky|používateliek|používateliek} tampónov '
+                        '{tampon_no_water} ({tampon_no_water_share:.1f}%) {tampon_no_water:~nemala|nemali|nemalo} prístup '
+                        'k teplej vode, čo predstavuje hygienické riziko.',
+    'pre_model': 'Logistická regresia vynechania školy kvôli menštruácii na všetkých faktoroch naraz '
+                 '({model_respondents:|respondentka|respondentky|respondentiek} s úplnými odpoveďami, {model_events:.0f} '
+                 'z nich {model_events:~vynechala|vynechali|vynechalo} školu). Pomer šancí nad 1 znamená vyššiu šancu absencie pri danom faktore, ak sú '
+                 'ostatné faktory rovnaké. Odhady faktorov sú mierne regularizované (ridge), aby zostali konečné aj pri malom '
+                 'počte respondentiek; Waldove intervaly a p-hodnoty vychádzajú zo štandardných chýb tohto '
+                 'regularizovaného odhadu. {model_bootstrap}{model_significance} Pri krížovej validácii model správne zaradil '
+                 '{model_accuracy:.1f}% respondentiek (logaritmická strata {model_log_loss:.3f} oproti '
+                 '{model_baseline:.3f} pri odhade len podľa podielu absencie).',
+    'pre_model_groups': 'Pomery šancí podľa typu školy s 95% Waldovým intervalom v zátvorke; široké intervaly '
+                        'znamenajú, že odhad pre daný typ školy je nespoľahlivý. {model_groups_skipped}'
+                        '{model_fits:.0f} modelov (celá vzorka, bootstrap, krížová validácia a typy škôl) bolo '
+                        'odhadnutých naraz.',
+
+    # ─── Free-text answers ───
+    'text_responses': '{responses:~Na otázku odpovedala|Na otázku odpovedali|Na otázku odpovedalo} '
+                      '{responses:|respondentka|respondentky|respondentiek}. Tabuľka uvádza najčastejšie výrazy '
+                      '(v základnom tvare) a počet odpovedí, v ktorých sa vyskytli.',
+
+    # ─── Summary before installation ───
+    'pre_summary_intro': '{num_pre:Z} {num_pre:~respondentky|respondentiek|respondentiek}:',
+    'pre_summary_first_period': 'Najmladší vek prvej menštruácie bol {first_period_min} rokov',
+    'pre_summary_missed': '{missed_share:.1f}% vynechalo školu kvôli menštruácii',
+    'pre_summary_afford': '{afford_share:.1f}% si nemohlo dovoliť menštruačné pomôcky',
+    'pre_summary_no_info': '{no_info_share:.1f}% nemalo žiadne informácie pred prvou menštruáciou',
+    'pre_summary_pads': '{pads_share:.0f}% používa menštruačné vložky',
+    'pre_summary_amenities': '{lacking_share:.0f}% má obmedzený prístup k základnej vybavenosti',
+    'pre_summary_lack': '{lack_claim}',
+    'pre_summary_info_age': '{info_age_summary}',
+
+    # ─── After installation ───
+    'after_age': '{num_after:Z} {num_after:~respondentky|respondentiek|respondentiek} bolo {after_ages}',
+    'after_age_missing': ' {missing:|respondentka neuviedla|respondentky neuviedli|respondentiek neuviedlo} vek.',
+    'after_absence': '{missed_after_share:.1f}% respondentiek chýbalo v škole kvôli menštruácii. Najčastejšie chýbali '
+                     '{days_top}. Najčastejší dôvod: {reason_top}.',
+    'after_used_pads': '{used_pads_yes:.1f}% respondentiek používalo bezplatné vložky poskytované v škole. '
+                       '{used_pads_no:.1f}% ich nepoužívalo.',
+    'after_products': '{products_multiple:.1f}% respondentiek využilo bezplatné pomôcky viackrát, {products_once:.1f}% raz. '
+                      '{products_not_needed:.1f}% o nich vedelo, ale nepotrebovalo ich. {products_unaware:.1f}% '
+                      'nevedelo o ich dostupnosti.',
+    'after_attendance': '{attendance_more:.1f}% respondentiek uviedlo, že vďaka projektu chodili do školy častejšie. '
+                        'Pre {attendance_same_fraction} ({attendance_same:.1f}%) sa dochádzka nezmenila.',
+    'after_feelings': '{feelings_better:.1f}% respondentiek sa cítilo lepšie ako predtým. {feelings_same:.1f}% sa cítilo '
+                      'rovnako. {feelings_worse:.1f}% uviedlo zhoršenie.',
+    'after_confident': '{confident_yes:.1f}% respondentiek sa cítilo istejšie, keď vedeli, že majú v škole k dispozícii '
+                       'hygienické pomôcky.',
+    'after_continue': '{continue_yes:.1f}% respondentiek chce, aby sa poskytovanie vložiek zachovalo. {future_yes:.1f}% '
+                      'chce bezplatné pomôcky aj v ďalších školských rokoch. {continue_indifferent:.1f}% odpovedalo, že je im to '
+                      'jedno.',
+    'after_discussion': '{discussion_sure:.1f}% respondentiek si myslí, že projekt určite prispel k otvorenejšej diskusii '
+                        'o menštruácii v škole. Spolu so "skôr áno" je to {discussion_yes:.1f}%.',
+    'after_psych': '{psych_yes:.1f}% respondentiek sa cítilo psychicky lepšie vďaka projektu, {psych_partly:.1f}% čiastočne. '
+                   'Spolu {psych_positive:.1f}% respondentiek vnímalo pozitívny psychologický vplyv.',
+    'after_lectures': '{lectures_sure:.1f}% respondentiek uviedlo, že prednášky im určite pomohli získať nové informácie. '
+                      'Spolu so "skôr áno" je to {lectures_yes:.1f}%.',
+    'after_help': '{help_calm:.1f}% respondentiek sa cítilo pokojnejšie a bezpečnejšie. {help_overflow:.1f}% sa vyhlo '
+                  'pretečeniu alebo nepríjemnostiam. {help_stress:.1f}% prekonalo stres z nedostatku pomôcok.',
+    'after_topics': 'Najžiadanejšie témy pre budúce prednášky (počet respondentiek): {topics_top}.',
+
+    # ─── Cross analysis ───
+    'cross_absence': 'Absencia v škole kvôli menštruácii {absence_change}.',
+    'cross_absence_fell': 'klesla {pre:z.1f}% na {post:.1f}%, čo predstavuje pokles o {change_points:.1f} '
+                          'percentuálnych bodov (95% interval spoľahlivosti zmeny {change_low:+.1f} až '
+                          '{change_high:+.1f})',
+    'cross_absence_rose': 'stúpla {pre:z.1f}% na {post:.1f}%, čo predstavuje nárast o {change_points:.1f} '
+                          'percentuálnych bodov (95% interval spoľahlivosti zmeny {change_low:+.1f} až '
+                          '{change_high:+.1f})',
+    'cross_absence_same': 'sa nezmenila, pred aj po inštalácii bola {post:.1f}%',
+    'cross_weighted': '{composition_note} Po vážení oboch vĺn na spoločnú štruktúru podľa vekovej skupiny, typu školy a '
+                      'ročníka bola absencia {absence_weighted}.',
+    'cross_weighted_change': '{pre:.1f}% pred a {post:.1f}% po inštalácii, teda zmena o {change:+.1f} percentuálnych '
+                             'bodov (95% interval spoľahlivosti {change_low:+.1f} až {change_high:+.1f}; efektívna '
+                             'veľkosť vzorky {pre_n:.0f} a {post_n:.0f} respondentiek)',
+    'cross_sample': 'Počet a podiel respondentiek podľa typu školy, vekovej skupiny a ročníka v každej vlne. Tabuľka '
+                    'opisuje, kto dotazník vyplnil; rozdiely medzi stĺpcami vyplývajú zo zloženia vzoriek, '
+                    'nie z projektu.',
+    'cross_matched': '{title}, {focus}: {pre:.1f}% pred a {post:.1f}% po inštalácii, zmena o {change:+.1f} '
+                     'percentuálnych bodov (95% interval spoľahlivosti {change_low:+.1f} až {change_high:+.1f}).',
+    'cross_satisfaction': '{used_share:.1f}% respondentiek využilo bezplatné pomôcky aspoň raz. {useful_share:.1f}% '
+                          'považovalo projekt za užitočný. {continue_share:.1f}% chce pokračovanie projektu a '
+                          '{future_share:.1f}% respondentiek chce bezplatné pomôcky aj v budúcich rokoch '
+                          '(vrátane odpovede „Možno“).',
+
+    # ─── Final summary ───
+    'summary_pre_absence': 'Pred inštaláciou: {absence_pre:.1f}% respondentiek chýbalo v škole kvôli menštruácii',
+    'summary_post_absence': 'Po inštalácii: {absence_post:.1f}% respondentiek chýbalo v škole kvôli menštruácii',
+    'summary_change': 'Zmena: {absence_change_summary}',
+    'summary_change_fell': 'pokles o {change_points:.1f} percentuálnych bodov',
+    'summary_change_rose': 'nárast o {change_points:.1f} percentuálnych bodov',
+    'summary_change_same': 'bez zmeny',
+    'summary_afford': 'Pred (stredné školy): {afford_hs:.1f}% si nemohlo dovoliť menštruačné pomôcky',
+    'summary_used': 'Po: {used_share:.1f}% využilo bezplatné pomôcky v škole',
+    'summary_confident': 'Po: {confident_yes:.1f}% sa cíti istejšie s dostupnými pomôckami',
+    'summary_stress': 'Pred (stredné školy): {stress_hs:.1f}% pociťovalo stres pri výmene pomôcok mimo domova',
+    'summary_psych': 'Po: {psych_positive:.1f}% sa cítilo psychicky lepšie vďaka projektu',
+    'summary_calm': 'Po: {help_calm:.1f}% sa cítilo pokojnejšie a bezpečnejšie',
+    'summary_info': 'Pred (stredné školy): {info_gap_hs:.1f}% malo nedostatočné informácie pred prvou menštruáciou',
+    'summary_discussion': 'Po: {discussion_yes:.1f}% uviedlo, že projekt prispel k otvorenejšej diskusii',
+    'summary_lectures': 'Po: {lectures_yes:.1f}% považovalo prednášky za prínosné',
+    'summary_useful': '{useful_share:.1f}% považovalo projekt za užitočný pre dievčatá',
+    'summary_continue': '{continue_share:.1f}% chce pokračovanie projektu',
+    'summary_future': '{future_share:.1f}% chce bezplatné pomôcky aj v ďalších školských rokoch',
+}
+
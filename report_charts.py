@@ -0,0 +1,532 @@
+"""
+Chart rendering for the OZ Different report. Every chart is drawn from the aggregates
+computed in report_data.py only, so charts can be rendered independently of each other.
+Figures come from a small per-size pool and are cleared and reused rather than closed:
+
+    with POOL.figure((10, 5)) as fig:
+        ...
+        return save_fig(fig, 'pre_info_age')
+"""
+
+import os
+from contextlib import contextmanager
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from report_data import BASE, AGE_BINS, FIRST_PERIOD_BINS, matched_questions
+
+# ─── Paths ───
+IMG_DIR = os.path.join(BASE, '_report_images')
+PREVIEW_IMG_DIR = os.path.join(BASE, '_report_preview')
+
+# ─── Output: report quality, or quick low-resolution drafts (report_preview.py) ───
+FINAL_OUTPUT = {'dir': IMG_DIR, 'dpi': 200, 'bbox_inches': 'tight'}
+DRAFT_OUTPUT = {'dir': PREVIEW_IMG_DIR, 'dpi': 72, 'bbox_inches': None}
+OUTPUT = dict(FINAL_OUTPUT)
+
+
+def set_output(settings):
+    OUTPUT.clear()
+    OUTPUT.update(settings)
+
+# ─── Chart generation helpers ───
+CHART_COLOR = '#1a4a6e'
+CHART_COLOR2 = '#6baed6'
+COLORS_COMPARISON = ['#2171b5', '#6baed6']
+
+
+# ─── Figure pool ───
+# Sizes the report charts use; figures of these sizes are created once per process
+POOL_SIZES = [(10, 4), (10, 5), (10, 6), (8, 5), (12, 5)]
+# Idle figures kept per size, anything beyond is closed
+POOL_LIMIT = 2
+
+
+class FigurePool:
+    """
+    Cleared-and-reused figures, one stack per figsize. A chart draws on figure() (which also
+    becomes the pyplot current figure), and the figure is released when the with block exits,
+    also when drawing fails, so a batch of any number of charts keeps at most `limit` figures
+    per size alive.
+    """
+
+    def __init__(self, sizes=POOL_SIZES, limit=POOL_LIMIT):
+        self.limit = limit
+        self.idle = {tuple(size): [] for size in sizes}
+        self.sizes = {}
+
+    def warm(self):
+        # Pre-creates one figure per known size, e.g. while a worker waits for its first chart
+        for size, idle in self.idle.items():
+            if not idle:
+                idle.append(self._create(size))
+
+    def _create(self, size):
+        fig = plt.figure(figsize=size)
+        self.sizes[fig.number] = size
+        return fig
+
+    def acquire(self, figsize):
+        size = tuple(figsize)
+        idle = self.idle.setdefault(size, [])
+        fig = idle.pop() if idle else self._create(size)
+        plt.figure(fig.number)
+        return fig
+
+    def release(self, fig):
+        idle = self.idle[self.sizes[fig.number]]
+        if len(idle) < self.limit:
+            fig.clear()
+            idle.append(fig)
+        else:
+            del self.sizes[fig.number]
+            plt.close(fig)
+
+    @contextmanager
+    def figure(self, figsize):
+        fig = self.acquire(figsize)
+        try:
+            yield fig
+        finally:
+            self.release(fig)
+
+
+POOL = FigurePool()
+
+
+def save_fig(fig, name):
+    os.makedirs(OUTPUT['dir'], exist_ok=True)
+    path = os.path.join(OUTPUT['dir'], f'{name}.png')
+    fig.savefig(path, dpi=OUTPUT['dpi'], bbox_inches=OUTPUT['bbox_inches'], facecolor='white')
+    return path
+
+
+def hbar_counts(name, counts, title, figsize=(8, 5), bold_int=False, total=None):
+    # Horizontal bar chart used by most of the after-installation questions
+    with POOL.figure(figsize) as fig:
+        plt.barh(counts.index, counts.values, color=CHART_COLOR)
+        plt.title(title)
+        plt.gca().invert_yaxis()
+        for spine in plt.gca().spines.values():
+            spine.set_visible(False)
+        plt.gca().xaxis.set_visible(False)
+        total = sum(counts.values) if total is None else total
+        for i, v in enumerate(counts.values):
+            label = int(v) if bold_int else v
+            plt.text(v + 0.5, i, f"$\\mathbf{{{label}}}$ {v/total*100:.1f}%", va='center', fontsize=10)
+        plt.tight_layout()
+        return save_fig(fig, name)
+
+
+def barh_share(name, counts, title, total, figsize=(10, 4), as_int=False):
+    # Horizontal bar chart with "count (share of respondents)" labels used by the pre-installation charts
+    with POOL.figure(figsize) as fig:
+        ax = fig.add_subplot()
+        bars = ax.barh(counts.index, counts.values, color=CHART_COLOR)
+        ax.bar_label(bars, padding=3, labels=[f'$\\mathbf{{{int(v) if as_int else v}}}$ ({v/total*100:.1f}%)' for v in counts.values])
+        ax.xaxis.set_visible(False)
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        ax.set_title(title)
+        plt.tight_layout()
+        return save_fig(fig, name)
+
+
+def group_means_bar(name, means, counts, group_order, xlabel, title):
+    with POOL.figure((10, 5)) as fig:
+        ax = fig.add_subplot()
+        present = [g for g in group_order if g in means.index]
+        ax.bar(present, [means[g] for g in present], color=CHART_COLOR)
+        for i, g in enumerate(present):
+            ax.text(i, means[g] + 0.05, f'$\\mathbf{{{means[g]:.2f}}}$\n(n={counts[g]})',
+                    ha='center', va='bottom', fontsize=10)
+        ax.set_xlabel(xlabel)
+        ax.set_title(title)
+        ax.yaxis.set_visible(False)
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        plt.tight_layout()
+        return save_fig(fig, name)
+
+
+def histogram(name, hist, bins, mean, xlabel, title, ticks):
+    # Binned counts drawn exactly like plt.hist over the raw column
+    with POOL.figure((10, 6)) as fig:
+        plt.hist(bins[:-1], bins=bins, weights=hist, edgecolor='black', alpha=0.9, color=CHART_COLOR)
+        plt.axvline(x=mean, color='#fffacd', linestyle='--', linewidth=2, label=f'Priemer: {mean:.2f}')
+        plt.xlabel(xlabel)
+        plt.ylabel('Počet respondentiek')
+        plt.title(title)
+        plt.legend()
+        plt.xticks([x + 0.5 for x in ticks], ticks)
+        plt.tight_layout()
+        return save_fig(fig, name)
+
+
+# ═══════════════════════════════════════════
+# PRE INSTALLATION CHARTS
+# ═══════════════════════════════════════════
+
+def chart_pre_age(agg):
+    return histogram('pre_age', agg['age_hist'], AGE_BINS, agg['avg_age'],
+                     'Vek', 'Rozdelenie veku respondentiek', range(12, 20))
+
+
+def chart_pre_first_period(agg):
+    return histogram('pre_first_period', agg['first_period_hist'], FIRST_PERIOD_BINS, agg['avg_first_period_age'],
+                     'Vek prvej menštruácie', 'Rozdelenie veku prvej menštruácie', range(9, 16))
+
+
+def chart_pre_missed_school(agg):
+    return barh_share('pre_missed_school', agg['missed_counts'], 'Vynechanie školy kvôli menštruácii', agg['num_pre'])
+
+
+def chart_pre_afford(agg):
+    return barh_share('pre_afford', agg['afford_counts'],
+                      'Nemožnosť kúpiť si menštruačné pomôcky z finančných dôvodov aspoň raz', agg['num_pre'])
+
+
+def chart_pre_info_prep(agg):
+    return barh_share('pre_info_prep', agg['info_prep_counts'], 'Dostatok informácií pred prvou menštruáciou', agg['num_pre'])
+
+
+def chart_pre_info_sources(agg):
+    return barh_share('pre_info_sources', agg['info_sums'], 'Zdroje informácií o menštruácii', agg['num_pre'],
+                      figsize=(10, 5), as_int=True)
+
+
+def chart_pre_info_age(agg):
+    mean_ages = agg['mean_ages']
+    with POOL.figure((10, 5)) as fig:
+        ax = fig.add_subplot()
+        bars = ax.bar(mean_ages.index, mean_ages.values, color=CHART_COLOR)
+        ax.bar_label(bars, padding=3, labels=[f'$\\mathbf{{{v:.1f}}}$ rokov' for v in mean_ages.values])
+        ax.yaxis.set_visible(False)
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        ax.set_title('Priemerný vek prvej menštruácie podľa úrovne informovanosti')
+        ax.set_xlabel('Úroveň informovanosti pred prvou menštruáciou')
+        plt.tight_layout()
+        return save_fig(fig, 'pre_info_age')
+
+
+def chart_pre_products(agg):
+    return barh_share('pre_products', agg['product_sums'], 'Používané menštruačné pomôcky', agg['num_pre'],
+                      figsize=(10, 5), as_int=True)
+
+
+def chart_pre_amenities(agg):
+    df_plot = agg['df_plot']
+    num_pre = agg['num_pre']
+    full_access = agg['full_access']
+    lacking_any = agg['lacking_any']
+
+    with POOL.figure((10, 6)) as fig:
+        ax = fig.add_subplot()
+        y = np.arange(len(df_plot))
+        height = 0.25
+        bars1 = ax.barh(y + height, df_plot['Áno'], height, label='Áno', color='#6baed6')
+        bars2 = ax.barh(y, df_plot['Nie'], height, label='Nie', color='#2171b5')
+        bars3 = ax.barh(y - height, df_plot['Nechcem odpovedať'], height, label='Nechcem odpovedať', color='#08306b')
+
+        ax.bar_label(bars1, padding=3, labels=[f'{v:.0f} ({v/num_pre*100:.1f}%)' if v > 0 else '' for v in df_plot['Áno']])
+        ax.bar_label(bars2, padding=3, labels=[f'{v:.0f} ({v/num_pre*100:.1f}%)' if v > 0 else '' for v in df_plot['Nie']])
+        ax.bar_label(bars3, padding=3, labels=[f'{v:.0f} ({v/num_pre*100:.1f}%)' if v > 0 else '' for v in df_plot['Nechcem odpovedať']])
+        ax.text(0.95, 0.05, f'Plný prístup: {full_access} ({full_access/num_pre*100:.1f}%)\nChýba ≥1: {lacking_any} ({lacking_any/num_pre*100:.1f}%)',
+                transform=ax.transAxes, ha='right', va='bottom', fontsize=10,
+                bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+        ax.xaxis.set_visible(False)
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        ax.set_title('Prístup k vybavenosti')
+        ax.set_yticks(y)
+        ax.set_yticklabels(df_plot.index)
+        ax.legend()
+        plt.tight_layout()
+        return save_fig(fig, 'pre_amenities')
+
+
+def chart_pre_siblings_amenities(agg):
+    return group_means_bar('pre_siblings_amenities', agg['group_means'], agg['group_counts'], ['0', '1-2', '3-4', '5+'],
+                           'Počet súrodencov', 'Priemerný počet chýbajúcich vybaveností podľa počtu súrodencov')
+
+
+def chart_pre_age_amenities(agg):
+    return group_means_bar('pre_age_amenities', agg['group_means_age'], agg['group_counts_age'],
+                           ['12-13', '14-15', '16-17', '18-19'],
+                           'Veková skupina', 'Priemerný počet chýbajúcich vybaveností podľa vekovej skupiny')
+
+
+def chart_pre_symptoms(agg):
+    return barh_share('pre_symptoms', agg['symptom_sums'], 'Symptómy pociťované počas menštruácie', agg['num_pre'],
+                      figsize=(10, 5), as_int=True)
+
+
+def chart_pre_tampon_water(agg):
+    return barh_share('pre_tampon_water', agg['hot_water_counts'], 'Prístup k teplej vode medzi používateľkami tampónov',
+                      agg['total_tampon'])
+
+
+def chart_pre_model(agg):
+    # Odds ratios of the absence model with their 95% intervals, on a log scale around 1
+    terms = agg['model_terms'].drop(index=agg['model_terms'].index[0])
+    with POOL.figure((10, 6)) as fig:
+        ax = fig.add_subplot()
+        y = np.arange(len(terms))
+        ratios = terms['odds_ratio'].to_numpy()
+        errors = [ratios - terms['or_low'].to_numpy(), terms['or_high'].to_numpy() - ratios]
+        ax.errorbar(ratios, y, xerr=errors, fmt='o', color=CHART_COLOR, ecolor=CHART_COLOR2, elinewidth=2, capsize=4)
+        ax.axvline(1, color='#999999', linestyle='--', linewidth=1)
+        ax.set_xscale('log')
+        ticks = [0.125, 0.25, 0.5, 1, 2, 4, 8]
+        ax.set_xticks(ticks, labels=[f'{t:g}' for t in ticks])
+        ax.set_xticks([], minor=True)
+        ax.set_xlim(min(terms['or_low'].min(), 0.5) / 1.2, max(terms['or_high'].max(), 2) * 1.2)
+        ax.set_yticks(y)
+        ax.set_yticklabels(terms.index)
+        ax.invert_yaxis()
+        for yi, v in zip(y, ratios):
+            ax.annotate(f'{v:.2f}', (v, yi), textcoords='offset points', xytext=(0, 8), ha='center', fontsize=10, fontweight='bold')
+        ax.set_xlabel('Pomer šancí vynechania školy (95% interval)')
+        ax.set_title('Faktory absencie v škole: viacrozmerný model', fontsize=14, fontweight='bold')
+        for spine in ['top', 'right', 'left']:
+            ax.spines[spine].set_visible(False)
+        plt.tight_layout()
+        return save_fig(fig, 'pre_model')
+
+
+# ═══════════════════════════════════════════
+# AFTER INSTALLATION CHARTS
+# ═══════════════════════════════════════════
+
+def chart_after_age(agg):
+    age_counts = agg['age_counts']
+    with POOL.figure((8, 5)) as fig:
+        plt.bar(age_counts.index, age_counts.values, color=CHART_COLOR)
+        plt.xlabel('Vek')
+        plt.title('Rozdelenie veku respondentiek')
+        for spine in plt.gca().spines.values():
+            spine.set_visible(False)
+        plt.gca().yaxis.set_visible(False)
+        total_after = sum(age_counts.values)
+        for i, v in enumerate(age_counts.values):
+            plt.text(i, v + 0.5, f"$\\mathbf{{{v}}}$ {v/total_after*100:.1f}%", ha='center', fontsize=10)
+        plt.tight_layout()
+        return save_fig(fig, 'after_age')
+
+
+def chart_after_missed_school(agg):
+    return hbar_counts('after_missed_school', agg['missed_after'], 'Chýbali ste niekedy v škole kvôli menštruácii?')
+
+
+def chart_after_days_missed(agg):
+    return hbar_counts('after_days_missed', agg['days_missed'], 'Koľko dní ste chýbali kvôli menštruácii?')
+
+
+def chart_after_reasons(agg):
+    return hbar_counts('after_reasons', agg['reasons'], 'Dôvod absencie počas menštruácie')
+
+
+def chart_after_used_pads(agg):
+    return hbar_counts('after_used_pads', agg['used_pads'], 'Používali ste bezplatné vložky poskytované v škole?')
+
+
+def chart_after_products_detail(agg):
+    return hbar_counts('after_products_detail', agg['products'],
+                       'Využili ste niekedy menštruačné pomôcky poskytované v rámci projektu zdarma v škole?', figsize=(10, 5))
+
+
+def chart_after_attendance(agg):
+    return hbar_counts('after_attendance', agg['attendance'], 'Ovplyvnilo to vašu dochádzku do školy počas menštruácie?')
+
+
+def chart_after_feelings(agg):
+    return hbar_counts('after_feelings', agg['feelings'], 'Ako sa cítite počas menštruácie v škole teraz (počas projektu)?')
+
+
+def chart_after_confident(agg):
+    return hbar_counts('after_confident', agg['confident'],
+                       'Cítite sa istejšie, keď viete, že máte v škole k dispozícii hygienické pomôcky?')
+
+
+def chart_after_continue(agg):
+    return hbar_counts('after_continue', agg['continue_proj'],
+                       'Chceli by ste, aby sa poskytovanie vložiek na škole zachovalo aj naďalej?')
+
+
+def chart_after_future(agg):
+    return hbar_counts('after_future', agg['future_proj'],
+                       'Chceli by ste, aby boli vložky zadarmo poskytované aj v ďalších školských rokoch?')
+
+
+def chart_after_discussion(agg):
+    return hbar_counts('after_discussion', agg['discussion'],
+                       'Myslíte si, že projekt prispel k otvorenejšej diskusii o menštruácii v škole?', figsize=(10, 5))
+
+
+def chart_after_psych(agg):
+    return hbar_counts('after_psych', agg['psych'], 'Cítili ste sa vďaka projektu psychicky lepšie?')
+
+
+def chart_after_lectures(agg):
+    return hbar_counts('after_lectures', agg['lectures'],
+                       'Pomohli vám prednášky získať nové informácie alebo iný pohľad na túto tému?')
+
+
+def chart_after_help(agg):
+    return hbar_counts('after_help', agg['help_issue'], 'Pomohlo vám to vyriešiť niektorý konkrétny problém?', figsize=(10, 5))
+
+
+def chart_after_topics(agg):
+    return hbar_counts('after_topics', agg['topics'], 'Aké témy by ste do budúcna uvítali na prednáškach?',
+                       figsize=(10, 5), bold_int=True, total=agg['num_after'])
+
+
+# ═══════════════════════════════════════════
+# CROSS-ANALYSIS CHARTS
+# ═══════════════════════════════════════════
+
+def matched_comparison(name, table, focus, title):
+    """Pre vs after shares of one matched question, with 95% intervals and the change of `focus`."""
+    with POOL.figure((10, 6)) as fig:
+        ax = fig.add_subplot()
+        x = np.arange(len(table))
+        width = 0.35
+        for offset, wave, label, color in [(-width/2, 'pre', 'Pred inštaláciou', COLORS_COMPARISON[0]),
+                                           (width/2, 'post', 'Po inštalácii', COLORS_COMPARISON[1])]:
+            values = table[wave].to_numpy()
+            low, high = table[f'{wave}_low'].to_numpy(), table[f'{wave}_high'].to_numpy()
+            ax.bar(x + offset, values, width, yerr=[values - low, high - values], capsize=4,
+                   error_kw={'ecolor': '#555555', 'lw': 1}, label=label, color=color)
+            # Labels above the interval, not the bar, so the error bars do not cross them
+            for xi, v, top in zip(x + offset, values, high):
+                ax.text(xi, top + 1, f'{v:.1f}%', ha='center', va='bottom', fontsize=11, fontweight='bold')
+        top = table[['pre_high', 'post_high']].to_numpy().max()
+        ax.set_ylim(0, top + 12)
+        ax.set_title(title, fontsize=14, fontweight='bold')
+        ax.set_xticks(x)
+        ax.set_xticklabels(table.index)
+        ax.legend()
+        if focus in table.index:
+            row = table.loc[focus]
+            ax.annotate(f'Zmena: {row["change"]:+.1f}pb', xy=(table.index.get_loc(focus), max(row['pre_high'], row['post_high']) + 7),
+                        fontsize=12, ha='center', color='green' if row['change'] < 0 else 'red')
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        ax.yaxis.set_visible(False)
+        plt.tight_layout()
+        return save_fig(fig, name)
+
+
+def matched_chart(name, pair, weighted=False):
+    # One chart per entry of report_data.matched_questions, named cross_<name>, and with both waves
+    # raked to a common structure (agg['matched_weighted']), cross_<name>_weighted
+    def chart_cross_matched(agg):
+        _, _, focus, title = pair
+        if weighted:
+            return matched_comparison(f'cross_{name}_weighted', agg['matched_weighted'][name], focus, f'{title} (vážené)')
+        return matched_comparison(f'cross_{name}', agg['matched'][name], focus, title)
+    return chart_cross_matched
+
+
+def chart_cross_satisfaction(agg):
+    num_after = agg['num_after']
+    with POOL.figure((12, 5)) as fig:
+        ax = fig.add_subplot()
+        metrics = [
+            'Využili bezplatné pomôcky\naspoň raz',
+            'Projekt bol užitočný\npre dievčatá',
+            'Chcú pokračovanie\nprojektu',
+            'Chcú bezplatné pomôcky\naj v ďalších rokoch'
+        ]
+        values = [
+            agg['total_used'] / num_after * 100,
+            agg['useful_yes'] / num_after * 100,
+            agg['continue_yes_raw'] / num_after * 100,
+            (agg['future_yes_raw'] + agg['future_maybe_raw']) / num_after * 100
+        ]
+        bars = ax.barh(metrics, values, color=CHART_COLOR)
+        ax.bar_label(bars, padding=3, labels=[f'$\\mathbf{{{v:.1f}}}$%' for v in values])
+        ax.set_title('Ukazovatele spokojnosti s projektom', fontsize=14, fontweight='bold')
+        ax.set_xlim(0, 110)
+        ax.invert_yaxis()
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        ax.xaxis.set_visible(False)
+        plt.tight_layout()
+        return save_fig(fig, 'cross_satisfaction')
+
+
+# ═══════════════════════════════════════════
+# FREE-TEXT CHARTS
+# ═══════════════════════════════════════════
+
+def text_terms_chart(name, stats, title):
+    # Most frequent lemmas, as a share of everyone who answered the question
+    terms = stats['terms']['responses'].iloc[::-1]
+    return barh_share(name, terms, title, stats['responses'], figsize=(10, 6))
+
+
+def chart_text_feelings(agg):
+    return text_terms_chart('text_feelings', agg['text']['feelings'], 'Najčastejšie pocity a emócie počas menštruácie')
+
+
+def chart_text_gyn_sources(agg):
+    return text_terms_chart('text_gyn_sources', agg['text']['gyn_sources'],
+                            'Kde respondentky hľadajú informácie pri podozrení na gynekologický problém')
+
+
+# ─── Registry: chart name -> (report section, renderer), in report order ───
+CHARTS = {
+    'pre_age': ('pre', chart_pre_age),
+    'pre_first_period': ('pre', chart_pre_first_period),
+    'pre_missed_school': ('pre', chart_pre_missed_school),
+    'pre_afford': ('pre', chart_pre_afford),
+    'pre_info_prep': ('pre', chart_pre_info_prep),
+    'pre_info_sources': ('pre', chart_pre_info_sources),
+    'pre_info_age': ('pre', chart_pre_info_age),
+    'pre_products': ('pre', chart_pre_products),
+    'pre_amenities': ('pre', chart_pre_amenities),
+    'pre_siblings_amenities': ('pre', chart_pre_siblings_amenities),
+    'pre_age_amenities': ('pre', chart_pre_age_amenities),
+    'pre_symptoms': ('pre', chart_pre_symptoms),
+    'pre_tampon_water': ('pre', chart_pre_tampon_water),
+    'pre_model': ('pre', chart_pre_model),
+    'text_feelings': ('text', chart_text_feelings),
+    'text_gyn_sources': ('text', chart_text_gyn_sources),
+    'after_age': ('after', chart_after_age),
+    'after_missed_school': ('after', chart_after_missed_school),
+    'after_days_missed': ('after', chart_after_days_missed),
+    'after_reasons': ('after', chart_after_reasons),
+    'after_used_pads': ('after', chart_after_used_pads),
+    'after_products_detail': ('after', chart_after_products_detail),
+    'after_attendance': ('after', chart_after_attendance),
+    'after_feelings': ('after', chart_after_feelings),
+    'after_confident': ('after', chart_after_confident),
+    'after_continue': ('after', chart_after_continue),
+    'after_future': ('after', chart_after_future),
+    'after_discussion': ('after', chart_after_discussion),
+    'after_psych': ('after', chart_after_psych),
+    'after_lectures': ('after', chart_after_lectures),
+    'after_help': ('after', chart_after_help),
+    'after_topics': ('after', chart_after_topics),
+    **{f'cross_{name}': ('cross', matched_chart(name, pair)) for name, pair in matched_questions.items()},
+    **{f'cross_{name}_weighted': ('cross', matched_chart(name, pair, weighted=True))
+       for name, pair in matched_questions.items()},
+    'cross_satisfaction': ('cross', chart_cross_satisfaction),
+}
+
+
+def charts_for(section):
+    return [name for name, (sec, _) in CHARTS.items() if sec == section]
+
+
+def render_chart(name, agg):
+    return CHARTS[name][1](agg)
+
+
+def render_all(agg):
+    return {name: render_chart(name, agg) for name in CHARTS}
@@ -0,0 +1,250 @@
+"""
+Pre / post comparison of the outcomes the two questionnaires have in common, and a side-by-side
+description of who answered each wave.
+
+The pairs are declared once, in report_data: matched_questions holds the outcomes (a name, the pre
+and after column, the answer the report headlines and a title), sample_questions the respondents'
+school type, age band and grade (a name, the pre and after column and a title). Both columns of a
+pair are harmonized to one set of categories: closed questions to their canonical answers
+(report_answers), Vek and Ročník to the age bands and grades of report_weights, since the pre form
+asks for exact ages and the after form for bands.
+
+All pairs are counted in one pass per wave: the category codes of every pair are offset into one
+range and counted with a single bincount. The statistics are computed on those flat arrays too:
+
+  share      percentage of each category among the respondents who answered the question
+  interval   95% Wilson score interval of each share
+  change     after minus pre share, in percentage points, with Newcombe's hybrid score interval
+             (the difference of two independent proportions, built from the two Wilson intervals)
+
+Each outcome pair becomes one table, categories in scale order, so a new pair needs only its
+mapping entry: the aggregates, the chart and the DOCX rows follow from it.
+
+The sample pairs only differ between the waves because different respondents answered, so they
+get counts and shares per wave (describe_waves) and no change or interval.
+
+With per-respondent weights (report_weights.wave_weights), compare_waves sums the weights instead
+of counting respondents, and rescales each pair to its Kish effective sample size: pre_n / post_n
+are then effective respondents, and the intervals are as wide as that size warrants.
+"""
+
+import numpy as np
+import pandas as pd
+
+from report_answers import MISSING, QUESTIONS, SCALES, canonicalize
+from report_backend import to_pandas
+from report_weights import GRADES, age_band_codes, grade_codes
+
+# Normal quantile of a two-sided 95% interval
+Z = 1.959963984540054
+
+# Columns without an answer scale: their categories and how the raw values are coded
+HARMONIZED = {
+    'Vek': (SCALES['age_band'], age_band_codes),
+    'Ročník': ([f'{grade}. ročník' for grade in GRADES], grade_codes),
+}
+
+COLUMNS = ['pre_n', 'post_n', 'pre', 'post', 'pre_low', 'pre_high', 'post_low', 'post_high',
+           'change', 'change_low', 'change_high']
+SAMPLE_COLUMNS = ['pre_n', 'post_n', 'pre', 'post']
+
+
+# ═══════════════════════════════════════════
+# HARMONIZE
+# ═══════════════════════════════════════════
+
+def categories(col):
+    if col in HARMONIZED:
+        return HARMONIZED[col][0]
+    return SCALES[QUESTIONS[col]]
+
+
+def pair_categories(pairs):
+    """Common categories of each pair; both columns of a pair must share them."""
+    result = {}
+    for name, (pre_col, post_col, *_) in pairs.items():
+        labels = categories(pre_col)
+        if categories(post_col) != labels:
+            raise ValueError(f'Matched question {name!r}: {pre_col!r} and {post_col!r} have different answer scales')
+        result[name] = labels
+    return result
+
+
+def check_focus(pairs):
+    for name, labels in pair_categories(pairs).items():
+        focus = pairs[name][2]
+        if focus not in labels:
+            raise ValueError(f'Matched question {name!r}: {focus!r} is not one of its answers')
+
+
+def harmonized_codes(df, columns):
+    """(rows, columns) category codes of `columns` in `df`, -1 where missing or unmapped."""
+    questions = [col for col in columns if col not in HARMONIZED]
+    answers = canonicalize(df, questions)
+    num = to_pandas(df, [col for col in dict.fromkeys(columns) if col in HARMONIZED])
+    codes = []
+    for col in columns:
+        if col in HARMONIZED:
+            codes.append(HARMONIZED[col][1](num[col]))
+        elif col in answers.codes.columns:
+            codes.append(answers[col].to_numpy())
+        else:
+            codes.append(np.full(len(answers), MISSING))
+    return np.column_stack(codes).astype(np.int64) if codes else np.empty((len(answers), 0), dtype=np.int64)
+
+
+# ═══════════════════════════════════════════
+# COUNT
+# ═══════════════════════════════════════════
+
+def offsets(pairs):
+    sizes = np.array([len(labels) for labels in pair_categories(pairs).values()], dtype=np.intp)
+    return np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp), sizes
+
+
+def matched_codes(df, pairs, wave):
+    """(rows, pairs) category codes of every pair in one wave (wave 0: pre columns, 1: after columns)."""
+    return harmonized_codes(df, [columns[wave] for columns in pairs.values()])
+
+
+def flat_counts(codes, pairs, weights=None):
+    """
+    Respondents per category of every pair, as one flat array in mapping order, from their
+    matched_codes. With `weights` (one per row), the sums of their weights.
+    """
+    start, sizes = offsets(pairs)
+    known = codes >= 0
+    if weights is None:
+        return np.bincount((codes + start)[known], minlength=int(sizes.sum())).astype(np.int64)
+    weights = np.broadcast_to(np.asarray(weights, dtype=float)[:, None], codes.shape)[known]
+    return np.bincount((codes + start)[known], weights=weights, minlength=int(sizes.sum()))
+
+
+def matched_counts(df, pairs, wave, mask=None, weights=None):
+    """
+    flat_counts of one wave's respondents. `mask` keeps only some rows. Counts of shards add up.
+    """
+    codes = matched_codes(df, pairs, wave)
+    if mask is not None:
+        mask = np.asarray(mask, dtype=bool)
+        codes = codes[mask]
+        weights = None if weights is None else np.asarray(weights)[mask]
+    return flat_counts(codes, pairs, weights)
+
+
+# ═══════════════════════════════════════════
+# STATISTICS
+# ═══════════════════════════════════════════
+
+def wilson(k, n):
+    """Shares k / n with the bounds of their 95% Wilson score interval (NaN where n is 0)."""
+    k = np.asarray(k, dtype=float)
+    n = np.asarray(n, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = k / n
+        denominator = 1 + Z ** 2 / n
+        center = (p + Z ** 2 / (2 * n)) / denominator
+        half = Z * np.sqrt(p * (1 - p) / n + Z ** 2 / (4 * n ** 2)) / denominator
+    # The interval lies in [0, 1] and contains p; at p = 0 or 1 rounding can put a bound a hair past it
+    return p, np.clip(center - half, 0, p), np.clip(center + half, p, 1)
+
+
+def newcombe(p1, low1, high1, p2, low2, high2):
+    """p2 - p1 with its 95% interval, from the Wilson intervals of both shares."""
+    change = p2 - p1
+    low = change - np.sqrt((p2 - low2) ** 2 + (high1 - p1) ** 2)
+    high = change + np.sqrt((high2 - p2) ** 2 + (p1 - low1) ** 2)
+    return change, low, high
+
+
+def _totals(counts, start, sizes):
+    # Respondents who answered each pair, repeated over its categories
+    return np.repeat(np.add.reduceat(counts, start) if len(start) else [], sizes)
+
+
+def _tables(pairs, values, columns, counts_dtype='int64'):
+    start, sizes = offsets(pairs)
+    tables = {}
+    for (name, labels), first, k in zip(pair_categories(pairs).items(), start, sizes):
+        block = values[first:first + k]
+        # Categories no one chose in either wave are left out
+        present = (block[:, 0] > 0) | (block[:, 1] > 0)
+        index = pd.Index([label for label, keep in zip(labels, present) if keep], name=name)
+        table = pd.DataFrame(block[present], index=index, columns=columns)
+        tables[name] = table.astype({'pre_n': counts_dtype, 'post_n': counts_dtype})
+    return tables
+
+
+def comparison_tables(pairs, pre_counts, post_counts):
+    """
+    {name: table} of every outcome pair from the flat counts of both waves (see matched_counts),
+    whole respondents or effective ones (see weighted_tables).
+    """
+    check_focus(pairs)
+    start, sizes = offsets(pairs)
+    pre_counts = np.asarray(pre_counts)
+    post_counts = np.asarray(post_counts)
+    counts_dtype = np.result_type(pre_counts, post_counts)
+
+    pre = wilson(pre_counts, _totals(pre_counts, start, sizes))
+    post = wilson(post_counts, _totals(post_counts, start, sizes))
+    change = newcombe(*pre, *post)
+    shares = 100 * np.array([pre[0], post[0], pre[1], pre[2], post[1], post[2], *change])
+    return _tables(pairs, np.column_stack([pre_counts, post_counts, *shares]), COLUMNS, counts_dtype)
+
+
+def effective_counts(sums, squares, pairs):
+    """
+    Summed weights per category rescaled to their pair's Kish effective size (sum of weights
+    squared over sum of squared weights), from the flat sums of weights and of squared weights.
+    """
+    start, sizes = offsets(pairs)
+    totals = _totals(sums, start, sizes)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(totals > 0, sums * totals / _totals(squares, start, sizes), 0.0)
+
+
+def weighted_tables(pairs, pre_sums, pre_squares, post_sums, post_squares):
+    """{name: table} of every outcome pair from the flat sums of weights and squared weights of both waves."""
+    return comparison_tables(pairs, effective_counts(pre_sums, pre_squares, pairs),
+                             effective_counts(post_sums, post_squares, pairs))
+
+
+def sample_tables(pairs, pre_counts, post_counts):
+    """{name: table} of respondents and their percentage per category in each wave, no change."""
+    start, sizes = offsets(pairs)
+    pre_counts = np.asarray(pre_counts, dtype=np.int64)
+    post_counts = np.asarray(post_counts, dtype=np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pre = 100 * pre_counts / _totals(pre_counts, start, sizes)
+        post = 100 * post_counts / _totals(post_counts, start, sizes)
+    return _tables(pairs, np.column_stack([pre_counts, post_counts, pre, post]), SAMPLE_COLUMNS)
+
+
+def compare_waves(pairs, pre_data, after_data, pre_mask=None, weights=None):
+    """
+    Comparison tables of every pair; `pre_mask` restricts the pre wave to comparable respondents.
+    With `weights`, (pre weights, after weights) one per row, the tables are weighted estimates.
+    """
+    if weights is None:
+        return comparison_tables(pairs, matched_counts(pre_data, pairs, 0, pre_mask),
+                                 matched_counts(after_data, pairs, 1))
+    pre_w, after_w = (np.asarray(w, dtype=float) for w in weights)
+    if pre_mask is not None:
+        pre_w = np.where(np.asarray(pre_mask, dtype=bool), pre_w, 0.0)
+    pre_codes = matched_codes(pre_data, pairs, 0)
+    after_codes = matched_codes(after_data, pairs, 1)
+    return weighted_tables(pairs, flat_counts(pre_codes, pairs, pre_w), flat_counts(pre_codes, pairs, pre_w ** 2),
+                           flat_counts(after_codes, pairs, after_w), flat_counts(after_codes, pairs, after_w ** 2))
+
+
+def describe_waves(pairs, pre_data, after_data):
+    """Sample tables of every pair over all respondents of both waves."""
+    return sample_tables(pairs, matched_counts(pre_data, pairs, 0), matched_counts(after_data, pairs, 1))
+
+
+def headline(table, focus):
+    """The row of `focus`, zeros if no one chose it in either wave."""
+    if focus in table.index:
+        return table.loc[focus]
+    return pd.Series(0.0, index=COLUMNS)
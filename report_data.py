@@ -0,0 +1,389 @@
+"""
+Data loading, cleaning and aggregation for the OZ Different period poverty research.
+Shared by generate_report.py, the report snapshot and the analysis notebooks.
+
+Frames are loaded and derived by the selected dataframe backend (report_backend.py: pandas or
+Polars); the aggregates are reduced from pandas columns, so they do not depend on the backend.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from report_answers import canonicalize, code
+from report_backend import backend_for, get_backend, to_pandas
+from report_compare import compare_waves, describe_waves
+from report_model import model_aggregates, model_data
+from report_weights import wave_weights
+
+# ─── Paths ───
+BASE = os.path.dirname(os.path.abspath(__file__))
+PRE_CSV = os.path.join(BASE, 'pre_installation_data.csv')
+AFTER_CSV = os.path.join(BASE, 'after_installation_data.csv')
+
+# ─── Survey waves (report_store.py): wave number -> (questionnaire form, CSV exports of that wave) ───
+# A wave run at several schools lists every school's export; the report compares the waves of report_waves
+waves = {
+    1: ('pre', [PRE_CSV]),
+    2: ('after', [AFTER_CSV]),
+}
+report_waves = {'pre': 1, 'after': 2}
+
+# ─── Pre-data columns ───
+# Open-ended questions, analysed separately in report_text.py
+COL_PRE_FEELINGS_TEXT = 'Aké pocity alebo emócie najčastejšie pociťujete počas menštruácie? (napíšte):'
+COL_PRE_GYN_TEXT = 'Ak máte podozrenie na gynekologický problém, kde najskôr hľadáte informácie? (napíšte)'
+COL_PRE_COMMENTS_TEXT = 'Priestor na Vaše pripomienky a komentáre (NEPOVINNÉ):'
+
+PRE_DROP_COLUMNS = [
+    'Kde alebo od koho ste získali informácie o menštruácii? (môžete zaškrtnúť viac možností)',
+    'Aké menštruačné pomôcky ste používali? (môžete zaškrtnúť viac možností)',
+    'S akými prekážkami ste sa počas menštruácie najčastejšie stretli?',
+    COL_PRE_FEELINGS_TEXT,
+    COL_PRE_GYN_TEXT,
+    COL_PRE_COMMENTS_TEXT
+]
+
+PRE_COLUMNS = [
+    'Timestamp','Vek', 'Škola', 'Ročník', 'S kým aktuálne bývate?', 'Rodinný stav', 'Počet detí', 'Počet bratov', 'Počet sestier', 'Počet súrodencov',
+    'Zamestnanie otca', 'Najvyššie dosiahnuté vzdelanie alebo posledný ukončený ročník otca', 'Zamestnanie matky', 'Najvyššie dosiahnuté vzdelanie alebo posledný ukončený ročník matky',
+    'Prístup k teplej vode', 'Prístup k sprche alebo vani', 'Prístup k splachovaciemu WC', 'Prístup ku teplu alebo kúreniu',
+    'Mávate aktuálne menštruáciu', 'Vek prvej menštruácie', 'Mali ste pred prvou menštruáciou dostatok informácií o tom, čo menštruácia znamená a ako sa na ňu pripraviť?',
+    'Informácie o menštruácií získané od iného rodinného príslušníka', 'Informácie o menštruácií získané zo školy', 'Informácie o menštruácií získané od sestry/sestier', 'Informácie o menštruácií získané z prednášok/workshopov', 'Informácie o menštruácií získané od kamarátov', 'Informácie o menštruácií získané z internetu', 'Informácie o menštruácií získané od matky',
+    'Používané potreby: Handry','Používané potreby: Menštruačné nohavičky','Používané porteby: Intímky','Používané porteby: Tampóny','Používané potreby: Menštruačné vložky',
+    'Dostatok pomôcok na celé trvanie menštruácie', 'Prekážka: peniaze', 'Prekážka: žiadne', 'Prekážka: bolesť',
+    'Sledujete svoj menštruačný cyklus?','Akým spôsobom si zaznamenávate svoj cyklus?', 'Vnímate menštruáciu ako zásah do svojich každodenných plánov?',
+    'Pocity: smútok / depresia / úzkosť / strach', 'Pocity: hnev / nervozita / náladovosť / stres', 'Pocity: únava', 'Pocity: bolesť',
+    'Informácie ku gynekologickému problému získané z/od : Lekára', 'Informácie ku gynekologickému problému získané z/od : Kamarátov', 'Informácie ku gynekologickému problému získané z/od : Internetu', 'Informácie ku gynekologickému problému získané z/od : Mamy',
+    'Je pre vás ťažké komunikovať o intímnych témach so svojím lekárom?', 'Pri hľadaní informácií o zdravotných problémoch dávate prednosť:', 'Nosievate so sebou zásobu menštruačných pomôcok ako prvú pomoc?',
+    'Je pre vás výmena vložky alebo tampónu stresujúca, ak ste mimo domova?', 'Cítili ste sa niekedy trápne pri nákupe menštruačných pomôcok?', 'Stalo sa vám, že ste si kvôli finančným dôvodom nemohli dovoliť kúpiť menštruačné pomôcky?',
+    'Vynechali ste niekedy školu kvôli menštruácii?', 'Ako vnímate menštruáciu?'
+]
+
+# ─── Multi-column questions ───
+access_cols = ['Prístup k teplej vode', 'Prístup k sprche alebo vani',
+               'Prístup k splachovaciemu WC', 'Prístup ku teplu alebo kúreniu']
+
+info_cols = {
+    'Informácie o menštruácií získané od matky': 'Mama',
+    'Informácie o menštruácií získané zo školy': 'Škola',
+    'Informácie o menštruácií získané z internetu': 'Internet',
+    'Informácie o menštruácií získané od kamarátov': 'Kamarátky',
+    'Informácie o menštruácií získané od sestry/sestier': 'Sestra/sestry',
+    'Informácie o menštruácií získané od iného rodinného príslušníka': 'Iný rodinný príslušník',
+    'Informácie o menštruácií získané z prednášok/workshopov': 'Prednášky/Workshopy'
+}
+
+product_cols = {
+    'Používané potreby: Menštruačné vložky': 'Menštruačné vložky',
+    'Používané porteby: Tampóny': 'Tampóny',
+    'Používané potreby: Menštruačné nohavičky': 'Menštruačné nohavičky',
+    'Používané porteby: Intímky': 'Intímky',
+    'Používané potreby: Handry': 'Handry'
+}
+
+columns_amenities = {
+    'Prístup k teplej vode': 'Prístup k teplej vode',
+    'Prístup k sprche alebo vani': 'Prístup k sprche alebo vani',
+    'Prístup k splachovaciemu WC': 'Prístup k splachovaciemu WC',
+    'Prístup ku teplu alebo kúreniu': 'Prístup ku kúreniu'
+}
+
+symptom_cols = {
+    'Pocity: bolesť': 'Bolesť',
+    'Pocity: únava': 'Únava',
+    'Pocity: hnev / nervozita / náladovosť / stres': 'Hnev / Nervozita / Náladovosť / Stres',
+    'Pocity: smútok / depresia / úzkosť / strach': 'Smútok / Depresia / Úzkosť / Strach'
+}
+
+topic_columns = {
+    'Téme do budúcna: Gynekologické problémy a prevencia': 'Gynekologické problémy a prevencia',
+    'Téma do budúcna: Telesné zmeny v období dospievania': 'Telesné zmeny v období dospievania',
+    'Téma do budúcna: Vzťah menštruácie a psychického zdravia': 'Vzťah menštruácie a psychického zdravia',
+    'Téma do budúcna: Starostlivosť počas menštruácie': 'Starostlivosť počas menštruácie',
+    'Téma do budúcnosti: Práva a dôstojnosť žien': 'Práva a dôstojnosť žien',
+    'Téma do budúcna: iné': 'Iné'
+}
+
+# ─── Question columns ───
+COL_PRE_MISSED = 'Vynechali ste niekedy školu kvôli menštruácii?'
+COL_PRE_AFFORD = 'Stalo sa vám, že ste si kvôli finančným dôvodom nemohli dovoliť kúpiť menštruačné pomôcky?'
+COL_PRE_INFO_PREP = 'Mali ste pred prvou menštruáciou dostatok informácií o tom, čo menštruácia znamená a ako sa na ňu pripraviť?'
+COL_PRE_STRESS = 'Je pre vás výmena vložky alebo tampónu stresujúca, ak ste mimo domova?'
+COL_AFTER_MISSED = 'Chýbala si niekedy v škole kvôli menštruácii?'
+COL_AFTER_DAYS = 'Koľko dní si vymeškala počas menštruácii?'
+COL_AFTER_REASON = 'Dôvod tvojej absencie počas menštruácii?'
+COL_AFTER_USED_PADS = 'Používala si bezplatné vložky poskytované v škole?'
+COL_AFTER_USAGE = 'Využili ste niekedy menštruačné pomôcky, ktoré boli v rámci projektu zdarma k dispozícii na škole?'
+COL_AFTER_ATTENDANCE = 'Ovplyvnilo to tvoju dochádzku do školy počas menštruácie?'
+COL_AFTER_FEELINGS = 'Ako sa cítiš počas menštruácie v škole teraz (počas projektu)?'
+COL_AFTER_CONFIDENT = 'Cítiš sa istejšie, keď vieš, že máš v škole k dispozícii hygienické pomôcky?'
+COL_AFTER_CONTINUE = 'Chcela by si, aby sa poskytovanie vložiek na škole zachovalo aj naďalej?'
+COL_AFTER_FUTURE = 'Chcela by si, aby boli vložky zadarmo poskytované aj v ďalších školských rokoch?'
+COL_AFTER_USEFUL = 'Mala si pocit, že projekt bol pre dievčatá užitočný?'
+COL_AFTER_DISCUSSION = 'Myslíš si, že projekt prispel k tomu, aby sa o menštruácii v škole hovorilo otvorenejšie a prirodzenejšie?'
+COL_AFTER_PSYCH = 'Cítila si sa vďaka projektu psychicky lepšie?'
+COL_AFTER_LECTURES = 'V mesiaci december 2025, sa prebehla vo Vašej škola séria prednášok, na tému: Dospievanie, menštruácia a menštruačná chudoba. Prednášali ti: My mami n.o., Zdravé regióny, DM Drogerie a ČLOVEK v ohrození n.o. Pomohli ti tieto aktivity získať nové informácie alebo iný pohľad na túto tému?'
+COL_AFTER_HELP = 'Ak áno, pomohlo ti to vyriešiť niektorý konkrétny problém?'
+COL_SCHOOL = 'Škola'
+
+# ─── Outcomes asked in both waves (report_compare.py): name -> (pre column, after column, headline answer, title) ───
+matched_questions = {
+    'absence': (COL_PRE_MISSED, COL_AFTER_MISSED, 'Áno', 'Chýbanie v škole kvôli menštruácii'),
+}
+
+# ─── Who answered each wave (report_compare.py): name -> (pre column, after column, title) ───
+# Described side by side, never compared as a change: they differ by who filled in the form
+sample_questions = {
+    'school': (COL_SCHOOL, COL_SCHOOL, 'Typ školy'),
+    'age_band': ('Vek', 'Vek', 'Veková skupina'),
+    'grade': ('Ročník', 'Ročník', 'Ročník'),
+}
+
+# ─── Absence model (report_model.py): outcome (column, answer coded 1, answer coded 0) and predictors ───
+# term -> (column, answer coded 1 for a closed question, or None for a numeric column)
+model_outcome = (COL_PRE_MISSED, 'Áno', 'Nie')
+model_terms = {
+    'Nemohla si dovoliť pomôcky': (COL_PRE_AFFORD, 'Áno'),
+    'Počet chýbajúcich vybaveností': ('Lack_count', None),
+    'Bolesť': ('Pocity: bolesť', None),
+    'Únava': ('Pocity: únava', None),
+    'Hnev / Nervozita / Náladovosť / Stres': ('Pocity: hnev / nervozita / náladovosť / stres', None),
+    'Smútok / Depresia / Úzkosť / Strach': ('Pocity: smútok / depresia / úzkosť / strach', None),
+    'Čiastočné informácie pred 1. menštruáciou': (COL_PRE_INFO_PREP, 'Mala som len čiastočné informácie'),
+    'Žiadne informácie pred 1. menštruáciou': (COL_PRE_INFO_PREP, 'Nemala som žiadne informácie'),
+}
+
+# ─── Histogram bins ───
+AGE_BINS = list(range(12, 21))
+FIRST_PERIOD_BINS = list(range(8, 17))
+
+# ─── Columns the pre aggregates reduce, besides the closed answers ───
+PRE_AGGREGATE_COLUMNS = list(dict.fromkeys([
+    'Timestamp', 'Vek', 'Vek prvej menštruácie', 'Počet súrodencov', *info_cols, *product_cols, *symptom_cols,
+    'Lack_count', 'Sibling_group', 'Age_group',
+]))
+
+# ─── Display orders ───
+order = ['Nechcem odpovedať', 'Nie', 'Áno']
+order_hw = ['Nechcem odpovedať', 'Nie', 'Áno']
+group_order = ['0', '1-2', '3-4', '5+']
+group_order_age = ['12-13', '14-15', '16-17', '18-19']
+order_days = ['Menej ako 1 deň', '1 deň', '2 dni', '3 dni', 'Viac ako 3 dni']
+order_products = ['Áno, viackrát', 'Áno, raz', 'Nie', 'Vedela som o nich, ale nepotrebovala som ich', 'Nevedela som, že sú dostupné']
+order_att = ['Áno, chodila som do školy častejšie', 'Nie, nezmenilo sa to', 'Neviem posúdiť']
+order_f = ['Lepšie ako predtým', 'Rovnako', 'Horšie']
+order_c = ['Áno', 'Nie', 'Neviem']
+order_d = ['Určite áno', 'Skôr áno', 'Skôr nie', 'Určite nie']
+order_ps = ['Áno', 'Čiastočne', 'Neviem', 'Nie']
+order_l = ['Určite áno', 'Skôr áno', 'Neviem posúdiť', 'Skôr nie', 'Určite nie']
+order_h = ['Cítila som sa pokojnejšie a bezpečnejšie', 'Pomohlo mi vyhnúť sa pretečeniu/nepríjemnostiam',
+           'Nemala som pri sebe pomôcku, pomohlo mi to prekonať stres',
+           'Pomohlo mi to s infekciami alebo zdravotným diskomfortom', 'Nepomohlo / nič z toho sa ma netýka', 'Iné']
+
+
+# ═══════════════════════════════════════════
+# LOAD
+# ═══════════════════════════════════════════
+
+def load_pre(path=PRE_CSV, backend=None):
+    # Pre-data column renaming (same as notebook)
+    return get_backend(backend).read_csv(path, drop=PRE_DROP_COLUMNS, names=PRE_COLUMNS)
+
+
+def load_after(path=AFTER_CSV, backend=None):
+    return get_backend(backend).read_csv(path)
+
+
+# ═══════════════════════════════════════════
+# DERIVED FEATURES
+# ═══════════════════════════════════════════
+
+def sibling_groups(n):
+    """Sibling group ('0', '1-2', '3-4', '5+') of every count in `n`; None where unknown."""
+    n = np.asarray(n, dtype=float)
+    return np.select([n == 0, n <= 2, n <= 4, n > 4], [np.array(g, dtype=object) for g in group_order], None)
+
+
+def age_groups(n):
+    """Age group ('12-13', ..., '18-19') of every age in `n`; None where unknown."""
+    n = np.asarray(n, dtype=float)
+    return np.select([n <= 13, n <= 15, n <= 17, n > 17], [np.array(g, dtype=object) for g in group_order_age], None)
+
+
+def derive_pre(pre_data):
+    backend = backend_for(pre_data)
+    access = canonicalize(pre_data, access_cols).codes.to_numpy()
+    num = to_pandas(pre_data, ['Počet súrodencov', 'Vek'])
+    return backend.with_columns(pre_data, {
+        'Lack_count': (access == code('yes_no', 'Nie')).sum(axis=1),
+        'Sibling_group': sibling_groups(num['Počet súrodencov']),
+        'Age_group': age_groups(num['Vek']),
+    })
+
+
+def derive_after(after_data):
+    # Spelling variants ('nie' / 'Nie') are resolved by report_answers.canonicalize
+    return after_data
+
+
+def is_high_school(answers):
+    return (answers[COL_SCHOOL] != answers.code(COL_SCHOOL, 'Základná škola')).to_numpy()
+
+
+def high_school_only(pre_data):
+    # Filter pre_data to high school only for comparison
+    return backend_for(pre_data).take(pre_data, is_high_school(canonicalize(pre_data, [COL_SCHOOL])))
+
+
+def load_csv_data(pre_path=PRE_CSV, after_path=AFTER_CSV, backend=None):
+    """
+    Loaded, renamed and derived (pre_data, after_data) frames, read straight from the CSVs. The
+    pre frame has no open answers; report_store.load_data reads both waves with them.
+    """
+    return derive_pre(load_pre(pre_path, backend)), derive_after(load_after(after_path, backend))
+
+
+# ═══════════════════════════════════════════
+# AGGREGATES
+# ═══════════════════════════════════════════
+
+def labelled_sums(df, cols, ascending=True, weights=None):
+    values = df[list(cols.keys())]
+    if weights is not None:
+        values = values.mul(weights, axis=0)
+    sums = values.sum().sort_values(ascending=ascending)
+    sums.index = [cols[col] for col in sums.index]
+    return sums
+
+
+def group_means(values, groups, weights=None):
+    """Mean of `values` per group of `groups`, missing values left out; with `weights` (one per row), weighted."""
+    if weights is None:
+        return values.groupby(groups).mean()
+    weights = pd.Series(np.asarray(weights, dtype=float), index=values.index).where(values.notna(), 0.0)
+    means = (values.fillna(0) * weights).groupby(groups).sum() / weights.groupby(groups).sum()
+    return means.rename(values.name)
+
+
+def compute_pre_aggregates(pre_data):
+    answers = canonicalize(pre_data)
+    pre_data = to_pandas(pre_data, PRE_AGGREGATE_COLUMNS)
+    a = {}
+    a['num_pre'] = len(pre_data)
+    a['schools_pre'] = answers.counts(COL_SCHOOL)
+    a['avg_age'] = pre_data['Vek'].mean().__round__(2)
+    a['avg_first_period_age'] = pre_data['Vek prvej menštruácie'].mean().__round__(2)
+    a['age_hist'] = np.histogram(pre_data['Vek'].dropna(), bins=AGE_BINS)[0]
+    a['first_period_hist'] = np.histogram(pre_data['Vek prvej menštruácie'].dropna(), bins=FIRST_PERIOD_BINS)[0]
+
+    a['missed_counts'] = answers.counts(COL_PRE_MISSED, order)
+    a['afford_counts'] = answers.counts(COL_PRE_AFFORD)
+    a['info_prep_counts'] = answers.counts(COL_PRE_INFO_PREP)
+    a['stress_counts'] = answers.counts(COL_PRE_STRESS)
+    a['info_sums'] = labelled_sums(pre_data, info_cols)
+
+    info_level = answers.labels(COL_PRE_INFO_PREP).rename('Úroveň informovanosti')
+    a['mean_ages'] = group_means(pre_data['Vek prvej menštruácie'], info_level)
+
+    a['product_sums'] = labelled_sums(pre_data, product_cols)
+
+    df_plot = pd.DataFrame({
+        label: answers.counts(sk_col, ['Áno', 'Nie', 'Nechcem odpovedať']) for sk_col, label in columns_amenities.items()
+    }).T
+    a['df_plot'] = df_plot.reindex(columns=['Áno', 'Nie', 'Nechcem odpovedať']).fillna(0).astype(float)
+    a['full_access'] = (pre_data['Lack_count'] == 0).sum()
+    a['lacking_any'] = (pre_data['Lack_count'] > 0).sum()
+
+    plot_data = pre_data[pre_data['Sibling_group'].notna()]
+    a['group_means'] = group_means(plot_data['Lack_count'], plot_data['Sibling_group'])
+    a['group_counts'] = plot_data.groupby('Sibling_group')['Lack_count'].count()
+
+    plot_data_age = pre_data[pre_data['Age_group'].notna()]
+    a['group_means_age'] = group_means(plot_data_age['Lack_count'], plot_data_age['Age_group'])
+    a['group_counts_age'] = plot_data_age.groupby('Age_group')['Lack_count'].count()
+    a['corr_age_lack'] = pre_data['Vek'].corr(pre_data['Lack_count'])
+    a['corr_siblings_lack'] = pre_data['Počet súrodencov'].corr(pre_data['Lack_count'])
+
+    a['symptom_sums'] = labelled_sums(pre_data, symptom_cols)
+
+    tampon_users = (pre_data['Používané porteby: Tampóny'] == 1).to_numpy()
+    a['hot_water_counts'] = answers.subset(tampon_users).counts('Prístup k teplej vode', order_hw)
+    a['total_tampon'] = int(tampon_users.sum())
+
+    # Absence on all its drivers together, fitted per school type, resample and fold in one batch
+    a.update(model_aggregates([model_data(pre_data, answers, model_outcome, model_terms, COL_SCHOOL)], model_terms, 'school'))
+    return a
+
+
+def compute_after_aggregates(after_data):
+    answers = canonicalize(after_data)
+    after_data = to_pandas(after_data, ['Vek'] + [col for col in topic_columns if col in after_data.columns])
+    a = {}
+    a['num_after'] = len(after_data)
+    a['schools_after'] = answers.counts(COL_SCHOOL)
+    a['age_counts'] = after_data['Vek'].value_counts()
+    a['missed_after'] = answers.counts(COL_AFTER_MISSED, ['Áno', 'Nie', 'Nechcem odpovedať'])
+    a['days_missed'] = answers.counts(COL_AFTER_DAYS, order_days)
+    a['reasons'] = answers.counts(COL_AFTER_REASON)
+    a['used_pads'] = answers.counts(COL_AFTER_USED_PADS, ['Áno', 'Nie', 'Nechcem odpovedať'])
+    a['products'] = answers.counts(COL_AFTER_USAGE, order_products)
+    a['attendance'] = answers.counts(COL_AFTER_ATTENDANCE, order_att)
+    a['feelings'] = answers.counts(COL_AFTER_FEELINGS, order_f)
+    a['confident'] = answers.counts(COL_AFTER_CONFIDENT, order_c)
+    a['continue_proj'] = answers.counts(COL_AFTER_CONTINUE, ['Áno', 'Je mi to jedno'])
+    a['future_proj'] = answers.counts(COL_AFTER_FUTURE, ['Áno, určite', 'Možno'])
+    a['discussion'] = answers.counts(COL_AFTER_DISCUSSION, order_d)
+    a['psych'] = answers.counts(COL_AFTER_PSYCH, order_ps)
+    a['lectures'] = answers.counts(COL_AFTER_LECTURES, order_l)
+    a['help_issue'] = answers.counts(COL_AFTER_HELP, order_h)
+
+    topic_counts = {}
+    for sk_col, sk_label in topic_columns.items():
+        if sk_col in after_data.columns:
+            topic_counts[sk_label] = after_data[sk_col].sum()
+    a['topics'] = pd.Series(topic_counts).sort_values(ascending=False)
+    return a
+
+
+def compute_cross_aggregates(pre_data, after_data):
+    a = {}
+    pre = canonicalize(pre_data)
+    after = canonicalize(after_data)
+    pre_hs = pre.subset(is_high_school(pre))
+    # The final summary's 'before' side, on the same high-school respondents
+    a['pre_afford_hs'] = pre_hs.counts(COL_PRE_AFFORD, normalize=True) * 100
+    a['pre_stress_hs'] = pre_hs.counts(COL_PRE_STRESS, normalize=True) * 100
+    a['pre_info_prep_hs'] = pre_hs.counts(COL_PRE_INFO_PREP, normalize=True) * 100
+
+    # Every outcome asked in both waves, the pre wave again restricted to high schools
+    a['matched'] = compare_waves(matched_questions, pre_data, after_data, pre_mask=is_high_school(pre))
+    # Who answered each wave, all respondents of both
+    a['sample'] = describe_waves(sample_questions, pre_data, after_data)
+
+    # The same outcomes with both waves raked to a common age band / school type / grade structure;
+    # respondents outside the common support (the primary school) get weight 0, so no filter is needed
+    a['matched_weighted'] = compare_waves(matched_questions, pre_data, after_data,
+                                          weights=wave_weights(pre_data, after_data))
+
+    def count(col, label):
+        return int((after[col] == after.code(col, label)).sum())
+
+    a['used_multiple'] = count(COL_AFTER_USAGE, 'Áno, viackrát')
+    a['used_once'] = count(COL_AFTER_USAGE, 'Áno, raz')
+    a['total_used'] = a['used_multiple'] + a['used_once']
+    a['useful_yes'] = count(COL_AFTER_USEFUL, 'Áno')
+    a['continue_yes_raw'] = count(COL_AFTER_CONTINUE, 'Áno')
+    a['future_yes_raw'] = count(COL_AFTER_FUTURE, 'Áno, určite')
+    a['future_maybe_raw'] = count(COL_AFTER_FUTURE, 'Možno')
+    return a
+
+
+def compute_aggregates(pre_data, after_data):
+    """Every number the report shows, keyed by the name used in generate_report.py."""
+    agg = {}
+    agg.update(compute_pre_aggregates(pre_data))
+    agg.update(compute_after_aggregates(after_data))
+    agg.update(compute_cross_aggregates(pre_data, after_data))
+    return agg
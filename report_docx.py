@@ -0,0 +1,344 @@
+"""
+DOCX assembly for the OZ Different report. The document is built section by section
+from the aggregates (report_data.py) and the rendered chart images (report_charts.py);
+every caption and summary bullet is a template of report_captions.py filled in from them.
+The same sections also write into a streaming document (report_docx_stream.py).
+"""
+
+import functools
+import math
+
+from docx import Document
+from docx.shared import Inches, Pt, RGBColor
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+from report_captions import caption, sk
+from report_compare import headline
+from report_data import matched_questions, sample_questions
+
+
+def new_document():
+    doc = Document()
+
+    # --- Styles ---
+    style = doc.styles['Normal']
+    font = style.font
+    font.name = 'Calibri'
+    font.size = Pt(11)
+
+    style_heading = doc.styles['Heading 1']
+    style_heading.font.color.rgb = RGBColor(0x1a, 0x4a, 0x6e)
+
+    style_heading2 = doc.styles['Heading 2']
+    style_heading2.font.color.rgb = RGBColor(0x1a, 0x4a, 0x6e)
+    return doc
+
+
+# --- Helper ---
+def block(helper):
+    # A streaming document writes the block itself, from fragments compiled out of this helper
+    @functools.wraps(helper)
+    def write(doc, *args, **kwargs):
+        if getattr(doc, 'streaming', False):
+            return getattr(doc, helper.__name__)(*args, **kwargs)
+        return helper(doc, *args, **kwargs)
+    return write
+
+@block
+def add_title(doc, title, subtitle):
+    p = doc.add_paragraph()
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = p.add_run('\n\n\n\n')
+    run = p.add_run(title)
+    run.font.size = Pt(36)
+    run.font.bold = True
+    run.font.color.rgb = RGBColor(0x1a, 0x4a, 0x6e)
+
+    p = doc.add_paragraph()
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = p.add_run(subtitle)
+    run.font.size = Pt(18)
+    run.font.color.rgb = RGBColor(0x55, 0x55, 0x55)
+
+@block
+def add_chart(doc, img_path, width=Inches(6)):
+    p = doc.add_paragraph()
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = p.add_run()
+    run.add_picture(img_path, width=width)
+
+@block
+def add_outcome(doc, text):
+    p = doc.add_paragraph()
+    p.style = doc.styles['Normal']
+    run = p.add_run(text)
+    run.font.size = Pt(10)
+    run.font.italic = True
+    run.font.color.rgb = RGBColor(0x33, 0x33, 0x33)
+
+@block
+def add_bullet(doc, text):
+    p = doc.add_paragraph(text, style='List Bullet')
+    p.runs[0].font.size = Pt(10)
+
+@block
+def add_table(doc, header, rows):
+    table = doc.add_table(rows=1, cols=len(header), style='Light List Accent 1')
+    for cell, text in zip(table.rows[0].cells, header):
+        cell.text = text
+    for row in rows:
+        for cell, value in zip(table.add_row().cells, row):
+            cell.text = str(value)
+    for row in table.rows:
+        for cell in row.cells:
+            for run in cell.paragraphs[0].runs:
+                run.font.size = Pt(10)
+    doc.add_paragraph()
+
+
+# ═══════════════ TITLE PAGE ═══════════════
+def section_title(doc, agg, img):
+    # A report of one school (report_bulk.py) names it under the title
+    subtitle = caption(agg, 'subtitle_school') if agg.get('school') else caption(agg, 'subtitle')
+    add_title(doc, 'OZ Different', subtitle)
+
+    doc.add_page_break()
+
+
+# ═══════════════ COLLECTED DATA ═══════════════
+def section_collected(doc, agg, img):
+    doc.add_heading('Zozbierané dáta', level=1)
+
+    doc.add_heading('Pred inštaláciou menštruačných skriniek:', level=2)
+    add_bullet(doc, caption(agg, 'collected_pre'))
+    add_bullet(doc, caption(agg, 'collected_pre_schools'))
+
+    doc.add_heading('Po inštalácii menštruačných skriniek:', level=2)
+    add_bullet(doc, caption(agg, 'collected_after'))
+    add_bullet(doc, caption(agg, 'collected_after_schools'))
+
+    doc.add_page_break()
+
+
+# ═══════════════ BEFORE INSTALLATION ═══════════════
+# Chart -> heading; each chart is followed by the report_captions caption of the same name
+PRE_CHARTS = {
+    'pre_age': 'Rozdelenie veku',
+    'pre_first_period': 'Vek prvej menštruácie',
+    'pre_missed_school': 'Vynechanie školy kvôli menštruácii',
+    'pre_afford': 'Dostupnosť menštruačných pomôcok',
+    'pre_info_prep': 'Informovanosť o menštruácii',
+    'pre_info_sources': 'Zdroje informácií o menštruácii',
+    'pre_info_age': 'Informovanosť a vek prvej menštruácie',
+    'pre_products': 'Používané menštruačné pomôcky',
+    'pre_amenities': 'Prístup k vybavenosti',
+    'pre_siblings_amenities': 'Vybavenosť podľa počtu súrodencov',
+    'pre_age_amenities': 'Vybavenosť podľa veku',
+    'pre_symptoms': 'Symptómy počas menštruácie',
+    'pre_tampon_water': 'Prístup k teplej vode medzi používateľkami tampónov',
+}
+
+
+def interval_cell(low, high):
+    # A bootstrap that was not run has no interval
+    if math.isnan(low):
+        return '–'
+    return f"{sk(low, '.2f')} – {sk(high, '.2f')}"
+
+
+def odds_ratio_cell(value, low, high):
+    # A school type too small for its own fit, or whose fit did not converge, has no odds ratios
+    if math.isnan(value):
+        return '–'
+    return f"{sk(value, '.2f')} ({interval_cell(low, high)})"
+
+
+def section_pre(doc, agg, img):
+    doc.add_heading('Pred inštaláciou menštruačných skriniek', level=1)
+
+    for chart, heading in PRE_CHARTS.items():
+        doc.add_heading(heading, level=2)
+        add_chart(doc, img[chart])
+        text = caption(agg, chart)
+        if text:
+            add_outcome(doc, text)
+
+    # Absence model: all drivers together
+    doc.add_heading('Viacrozmerný model absencie v škole', level=2)
+    add_chart(doc, img['pre_model'])
+    terms = agg['model_terms'].iloc[1:]
+    add_table(doc, ['Faktor', 'Pomer šancí', '95% interval', 'Bootstrap 95% interval', 'p'],
+              [[term, sk(row['odds_ratio'], '.2f'), f"{sk(row['or_low'], '.2f')} – {sk(row['or_high'], '.2f')}",
+                interval_cell(row['boot_low'], row['boot_high']), sk(row['p_value'], '.3f')]
+               for term, row in terms.iterrows()])
+    add_outcome(doc, caption(agg, 'pre_model'))
+    groups, low, high = agg['model_groups'], agg['model_groups_low'], agg['model_groups_high']
+    add_table(doc, ['Faktor'] + [f'{school} (n={n})' for school, n in groups['n'].items()],
+              [[term] + [odds_ratio_cell(*values) for values in zip(groups[term], low[term], high[term])]
+               for term in terms.index])
+    add_outcome(doc, caption(agg, 'pre_model_groups'))
+
+    doc.add_page_break()
+
+
+# ═══════════════ FREE-TEXT ANSWERS ═══════════════
+TEXT_HEADINGS = {
+    'feelings': 'Pocity a emócie počas menštruácie',
+    'gyn_sources': 'Zdroje informácií pri gynekologickom probléme',
+    'comments': 'Pripomienky a komentáre',
+}
+TEXT_CHARTS = {'feelings': 'text_feelings', 'gyn_sources': 'text_gyn_sources'}
+
+
+def section_text(doc, agg, img):
+    doc.add_heading('Otvorené odpovede', level=1)
+    for key, heading in TEXT_HEADINGS.items():
+        stats = agg['text'][key]
+        responses = stats['responses']
+        doc.add_heading(heading, level=2)
+        if key in TEXT_CHARTS:
+            add_chart(doc, img[TEXT_CHARTS[key]])
+        add_outcome(doc, caption(agg, 'text_responses', responses=responses))
+        add_table(doc, ['Výraz', 'Počet odpovedí', 'Podiel'],
+                  [(term, row['responses'], f"{sk(row['responses']/responses*100, '.1f')}%") for term, row in stats['terms'].iterrows()])
+        if len(stats['bigrams']):
+            add_table(doc, ['Slovné spojenie', 'Výskyty'], list(stats['bigrams'].items()))
+
+    doc.add_page_break()
+
+
+# ═══════════════ SUMMARY - BEFORE ═══════════════
+PRE_SUMMARY = ['pre_summary_first_period', 'pre_summary_missed', 'pre_summary_afford', 'pre_summary_no_info',
+               'pre_summary_pads', 'pre_summary_amenities', 'pre_summary_lack', 'pre_summary_info_age']
+
+
+def section_pre_summary(doc, agg, img):
+    doc.add_heading('Zhrnutie zistení – pred inštaláciou', level=1)
+    doc.add_paragraph(caption(agg, 'pre_summary_intro'))
+    for name in PRE_SUMMARY:
+        text = caption(agg, name)
+        if text:
+            add_bullet(doc, text)
+
+    doc.add_page_break()
+
+
+# ═══════════════ AFTER INSTALLATION ═══════════════
+# Heading -> (charts, caption)
+AFTER_CHARTS = {
+    'Rozdelenie veku': (['after_age'], 'after_age'),
+    'Absencia v škole': (['after_missed_school', 'after_days_missed', 'after_reasons'], 'after_absence'),
+    'Používanie bezplatných vložiek v škole': (['after_used_pads'], 'after_used_pads'),
+    'Využitie bezplatných menštruačných pomôcok': (['after_products_detail'], 'after_products'),
+    'Vplyv na dochádzku': (['after_attendance'], 'after_attendance'),
+    'Pocity počas menštruácie v škole': (['after_feelings'], 'after_feelings'),
+    'Pocit istoty s dostupnými pomôckami': (['after_confident'], 'after_confident'),
+    'Pokračovanie projektu': (['after_continue', 'after_future'], 'after_continue'),
+    'Vplyv na otvorenosť diskusie': (['after_discussion'], 'after_discussion'),
+    'Psychologický prínos projektu': (['after_psych'], 'after_psych'),
+    'Prínos prednášok': (['after_lectures'], 'after_lectures'),
+    'Riešenie konkrétnych problémov': (['after_help'], 'after_help'),
+    'Témy pre budúce prednášky': (['after_topics'], 'after_topics'),
+}
+
+
+def section_after(doc, agg, img):
+    doc.add_heading('Po inštalácii menštruačných skriniek', level=1)
+
+    for heading, (charts, name) in AFTER_CHARTS.items():
+        doc.add_heading(heading, level=2)
+        for chart in charts:
+            add_chart(doc, img[chart])
+        add_outcome(doc, caption(agg, name))
+
+    doc.add_page_break()
+
+
+# ═══════════════ CROSS ANALYSIS ═══════════════
+def sample_cell(n, share):
+    return f"{int(n)} ({sk(share, '.1f')}%)" if n else '–'
+
+
+def section_cross(doc, agg, img):
+    doc.add_heading('Krížová analýza: Pred vs Po inštalácii', level=1)
+
+    # Absence comparison
+    doc.add_heading('Porovnanie absencie v škole', level=2)
+    add_chart(doc, img['cross_absence'])
+    add_outcome(doc, caption(agg, 'cross_absence'))
+
+    # Who answered each wave (report_data.sample_questions): described side by side, not compared
+    doc.add_heading('Zloženie vzoriek', level=2)
+    doc.add_paragraph(caption(agg, 'cross_sample'))
+    rows = []
+    for name, (_, _, title) in sample_questions.items():
+        for label, row in agg['sample'][name].iterrows():
+            rows.append([title, label, sample_cell(row['pre_n'], row['pre']), sample_cell(row['post_n'], row['post'])])
+    add_table(doc, ['Znak', 'Kategória', 'Pred inštaláciou', 'Po inštalácii'], rows)
+
+    # Absence comparison, weighted to a common structure
+    doc.add_heading('Porovnanie absencie po vážení', level=2)
+    add_chart(doc, img['cross_absence_weighted'])
+    add_outcome(doc, caption(agg, 'cross_weighted'))
+
+    # Every other outcome asked in both waves (report_data.matched_questions); absence is shown above
+    others = {name: pair for name, pair in matched_questions.items() if name != 'absence'}
+    if others:
+        doc.add_heading('Porovnanie výsledkov z oboch dotazníkov', level=2)
+        rows = []
+        for name, (_, _, focus, title) in others.items():
+            row = headline(agg['matched'][name], focus)
+            rows.append([title, focus, f"{sk(row['pre'], '.1f')}%", f"{sk(row['post'], '.1f')}%",
+                         f"{sk(row['change'], '+.1f')} pb",
+                         f"{sk(row['change_low'], '+.1f')} až {sk(row['change_high'], '+.1f')} pb"])
+        add_table(doc, ['Otázka', 'Odpoveď', 'Pred', 'Po', 'Zmena', '95% interval zmeny'], rows)
+        for name, (_, _, focus, title) in others.items():
+            add_chart(doc, img[f'cross_{name}'])
+            add_outcome(doc, caption(agg, 'cross_matched', title=title, focus=focus,
+                                     **headline(agg['matched'][name], focus)))
+
+    # Satisfaction
+    doc.add_heading('Ukazovatele spokojnosti s projektom', level=2)
+    add_chart(doc, img['cross_satisfaction'])
+    add_outcome(doc, caption(agg, 'cross_satisfaction'))
+
+    doc.add_page_break()
+
+
+# ═══════════════ FINAL SUMMARY ═══════════════
+SUMMARY = {
+    'Absencia v škole': ['summary_pre_absence', 'summary_post_absence', 'summary_change'],
+    'Riešenie existujúcich výziev': ['summary_afford', 'summary_used', 'summary_confident'],
+    'Psychologický dopad': ['summary_stress', 'summary_psych', 'summary_calm'],
+    'Otvorenosť a vzdelávanie': ['summary_info', 'summary_discussion', 'summary_lectures'],
+    'Podpora projektu': ['summary_useful', 'summary_continue', 'summary_future'],
+}
+
+
+def section_summary(doc, agg, img):
+    doc.add_heading('Záverečné zhrnutie', level=1)
+
+    for heading, names in SUMMARY.items():
+        doc.add_heading(heading, level=2)
+        for name in names:
+            add_bullet(doc, caption(agg, name))
+
+
+# ─── Sections in document order: name -> (builder, chart section it needs) ───
+SECTIONS = {
+    'title': (section_title, None),
+    'collected': (section_collected, None),
+    'pre': (section_pre, 'pre'),
+    'text': (section_text, 'text'),
+    'pre_summary': (section_pre_summary, None),
+    'after': (section_after, 'after'),
+    'cross': (section_cross, 'cross'),
+    'summary': (section_summary, None),
+}
+
+
+def build_document(agg, img):
+    doc = new_document()
+    for build, _ in SECTIONS.values():
+        build(doc, agg, img)
+    return doc
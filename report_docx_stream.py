@@ -0,0 +1,265 @@
+"""
+Streaming DOCX writer for the OZ Different report.
+
+python-docx keeps the whole document as an object tree and serializes it again on save. Here
+the styled template (report_docx.new_document, or any .docx passed as `template`) is unpacked
+once per process, and every block the sections write (heading, outcome, bullet, table, chart,
+...) is compiled once into XML fragments with slots for its text. A report then only fills in
+those fragments and streams them into the zip: the template parts and each chart image are
+written as soon as they are known, the body text at the end.
+
+The section builders in report_docx are shared: its helpers hand their block to a streaming
+document instead of building it through python-docx.
+
+    write_document(agg, img, output_path)
+"""
+
+import functools
+import io
+import os
+import re
+import struct
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+from docx.shared import Inches
+from lxml import etree
+
+import report_docx
+from report_docx import SECTIONS
+
+DOCUMENT = 'word/document.xml'
+DOCUMENT_RELS = 'word/_rels/document.xml.rels'
+CONTENT_TYPES = '[Content_Types].xml'
+IMAGE_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/image'
+
+# Stands for the i-th text of a block while it is compiled; the spaces make python-docx mark
+# the run xml:space="preserve", which the filled-in text then keeps
+SLOT = ' @@{}@@ '
+
+CHART_XML = (
+    '<w:p><w:pPr><w:jc w:val="center"/></w:pPr><w:r><w:drawing>'
+    '<wp:inline><wp:extent cx="{cx}" cy="{cy}"/><wp:docPr id="{id}" name="Picture {id}"/>'
+    '<wp:cNvGraphicFramePr><a:graphicFrameLocks xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+    '<a:graphic xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">'
+    '<a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+    '<pic:pic xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+    '<pic:nvPicPr><pic:cNvPr id="0" name={name}/><pic:cNvPicPr/></pic:nvPicPr>'
+    '<pic:blipFill><a:blip r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+    '<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm><a:prstGeom prst="rect"/></pic:spPr>'
+    '</pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing></w:r></w:p>'
+)
+
+
+# ═══════════════════════════════════════════
+# TEMPLATE
+# ═══════════════════════════════════════════
+
+class Template:
+    """The parts of a styled .docx, with its body split around the place new blocks go."""
+
+    def __init__(self, data):
+        with zipfile.ZipFile(io.BytesIO(data)) as z:
+            self.parts = {name: z.read(name) for name in z.namelist()}
+        document = self.parts.pop(DOCUMENT).decode('utf-8')
+        # New blocks go after whatever the template body holds, before its section properties
+        end = document.rindex('<w:sectPr')
+        self.head, self.tail = document[:end], document[end:]
+        self.rels = self.parts.pop(DOCUMENT_RELS).decode('utf-8')
+        types = self.parts.pop(CONTENT_TYPES).decode('utf-8')
+        if 'Extension="png"' not in types:
+            types = types.replace('<Default ', '<Default Extension="png" ContentType="image/png"/><Default ', 1)
+        self.content_types = types.encode('utf-8')
+        # Namespaces the document root declares, so compiled fragments need not repeat them
+        root = self.head[self.head.index('<w:document'):self.head.index('>', self.head.index('<w:document'))]
+        self.namespaces = re.compile(' xmlns:(?:{})="[^"]*"'.format('|'.join(re.findall(r'xmlns:(\w+)=', root))))
+
+
+@functools.lru_cache(maxsize=None)
+def load_template(path=None):
+    if path is not None:
+        with open(path, 'rb') as f:
+            return Template(f.read())
+    data = io.BytesIO()
+    report_docx.new_document().save(data)
+    return Template(data.getvalue())
+
+
+# ═══════════════════════════════════════════
+# FRAGMENTS
+# ═══════════════════════════════════════════
+
+def _capture(write, template):
+    # The XML python-docx produces for one block, with the template's namespaces left to the root
+    doc = report_docx.new_document()
+    body = doc.element.body
+    start = len(body) - 1
+    write(doc)
+    xml = ''.join(etree.tostring(e, encoding='unicode') for e in body[start:-1])
+    return template.namespaces.sub('', xml)
+
+
+def _split(xml, slots):
+    return tuple(re.split('|'.join(re.escape(SLOT.format(i)) for i in range(slots)), xml)) if slots else (xml,)
+
+
+def _text(value):
+    text = escape(str(value))
+    return text.replace('\n', '</w:t><w:br/><w:t xml:space="preserve">').replace('\t', '</w:t><w:tab/><w:t xml:space="preserve">')
+
+
+def _fill(parts, *values):
+    out = [parts[0]]
+    for value, part in zip(values, parts[1:]):
+        out.append(_text(value))
+        out.append(part)
+    return ''.join(out)
+
+
+@functools.lru_cache(maxsize=None)
+def fragment(kind, *args, template=None):
+    """One compiled block: static XML parts with the block's texts going between them."""
+    t = load_template(template)
+    slots = [SLOT.format(i) for i in range(2)]
+    if kind == 'heading':
+        return _split(_capture(lambda doc: doc.add_heading(slots[0], level=args[0]), t), 1)
+    if kind == 'paragraph':
+        return _split(_capture(lambda doc: doc.add_paragraph(slots[0], style=args[0]), t), 1)
+    if kind == 'empty':
+        return _split(_capture(lambda doc: doc.add_paragraph(), t), 0)
+    if kind == 'page_break':
+        return _split(_capture(lambda doc: doc.add_page_break(), t), 0)
+    if kind == 'outcome':
+        return _split(_capture(lambda doc: report_docx.add_outcome(doc, slots[0]), t), 1)
+    if kind == 'bullet':
+        return _split(_capture(lambda doc: report_docx.add_bullet(doc, slots[0]), t), 1)
+    if kind == 'title':
+        return _split(_capture(lambda doc: report_docx.add_title(doc, slots[0], slots[1]), t), 2)
+    if kind == 'table':
+        # table start / one row with a slot per cell / table end, for `args[0]` columns
+        cols = [SLOT.format(i) for i in range(args[0])]
+        xml = _capture(lambda doc: report_docx.add_table(doc, cols, [cols]), t)
+        start = xml.index('<w:tr>')
+        end = xml.rindex('</w:tbl>')
+        rows = xml[start:end]
+        row = rows[:rows.index('</w:tr>') + len('</w:tr>')]
+        return xml[:start], _split(row, args[0]), xml[end:]
+    raise ValueError(f'Unknown block: {kind}')
+
+
+def png_size(path):
+    with open(path, 'rb') as f:
+        header = f.read(24)
+    if header[:8] != b'\x89PNG\r\n\x1a\n':
+        raise ValueError(f'Not a PNG image: {path}')
+    return struct.unpack('>II', header[16:24])
+
+
+# ═══════════════════════════════════════════
+# DOCUMENT
+# ═══════════════════════════════════════════
+
+class StreamDocument:
+    """
+    A report being written straight into `path`. Offers the part of the python-docx Document
+    API the sections use, and the report_docx blocks (add_chart, add_outcome, ...) as methods.
+    The file appears at `path` on close(); until then it is written next to it.
+    """
+
+    streaming = True
+
+    def __init__(self, path, template=None):
+        self.path = path
+        self.template = template
+        self._template = load_template(template)
+        self._tmp = f'{path}.tmp'
+        self._zip = zipfile.ZipFile(self._tmp, 'w', zipfile.ZIP_DEFLATED)
+        self._zip.writestr(CONTENT_TYPES, self._template.content_types)
+        for name, data in self._template.parts.items():
+            self._zip.writestr(name, data)
+        self._body = [self._template.head]
+        self._images = {}
+        self._pictures = 0
+
+    def _block(self, kind, *values, args=()):
+        self._body.append(_fill(fragment(kind, *args, template=self.template), *values))
+
+    # ─── python-docx Document API ───
+    def add_heading(self, text='', level=1):
+        self._block('heading', text, args=(level,))
+
+    def add_paragraph(self, text='', style=None):
+        if text or style:
+            self._block('paragraph', text, args=(style,))
+        else:
+            self._block('empty')
+
+    def add_page_break(self):
+        self._block('page_break')
+
+    # ─── report_docx blocks ───
+    def add_title(self, title, subtitle):
+        self._block('title', title, subtitle)
+
+    def add_outcome(self, text):
+        self._block('outcome', text)
+
+    def add_bullet(self, text):
+        self._block('bullet', text)
+
+    def add_table(self, header, rows):
+        start, row, end = fragment('table', len(header), template=self.template)
+        self._body.append(start)
+        for values in [header, *rows]:
+            self._body.append(_fill(row, *values))
+        self._body.append(end)
+
+    def add_chart(self, img_path, width=Inches(6)):
+        if img_path not in self._images:
+            n = len(self._images) + 1
+            name = f'image{n}.png'
+            # matplotlib's PNGs still deflate by about a quarter; level 1 gets that at a fraction of the cost
+            self._zip.write(img_path, f'word/media/{name}', compresslevel=1)
+            self._images[img_path] = (f'rIdImage{n}', name)
+        rid, name = self._images[img_path]
+        px_width, px_height = png_size(img_path)
+        self._pictures += 1
+        self._body.append(CHART_XML.format(cx=int(width), cy=int(round(width * px_height / px_width)),
+                                           id=self._pictures, name=quoteattr(os.path.basename(img_path)), rid=rid))
+
+    # ─── Output ───
+    def close(self):
+        with self._zip.open(DOCUMENT, 'w') as f:
+            for part in self._body:
+                f.write(part.encode('utf-8'))
+            f.write(self._template.tail.encode('utf-8'))
+        images = ''.join(f'<Relationship Id="{rid}" Type="{IMAGE_REL}" Target="media/{name}"/>'
+                         for rid, name in self._images.values())
+        self._zip.writestr(DOCUMENT_RELS, self._template.rels.replace('</Relationships>', images + '</Relationships>'))
+        self._zip.close()
+        os.replace(self._tmp, self.path)
+        return self.path
+
+    def discard(self):
+        self._zip.close()
+        os.remove(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def new_document(path, template=None):
+    return StreamDocument(path, template)
+
+
+def write_document(agg, img, path, template=None):
+    with new_document(path, template) as doc:
+        for build, _ in SECTIONS.values():
+            build(doc, agg, img)
+    return path
@@ -0,0 +1,314 @@
+"""
+Aggregate export for the dashboard.
+
+Every build writes every aggregate of the report (the keys of report_data.compute_aggregates and
+report_text, nested ones joined with dots: 'text.feelings.terms') to EXPORT_DIR in two formats:
+
+  aggregates.json   compact, self-describing JSON for small payloads
+  aggregates.arrow  Arrow IPC file, one long table of (name, row, column, value), which a reader
+                    memory-maps and slices without copying
+
+Both carry EXPORT_VERSION, the fingerprint of the CSVs and data code they were computed from
+(report_snapshot.source_fingerprint) and the id of the build that wrote them. Within a version,
+names and layout only ever grow. The two files are written in full before either is swapped in,
+and load_export checks that both come from the same build, so a reader never pairs the JSON of one
+build with the Arrow file of another.
+
+Each aggregate has a kind:
+  scalar  one value                          JSON {"kind", "value"}
+  array   values by position (histograms)    JSON {"kind", "values"}
+  series  values by row label                JSON {"kind", "index", "values"}
+  table   values by row and column label     JSON {"kind", "index", "columns", "values" (row-major)}
+
+In the Arrow file every value is one float64 row, its labels stored as text; the schema metadata
+maps each name to its kind, first row and row count, and keeps the dtypes and names of its labels
+(and the labels of a table without columns, which has no rows), so one aggregate is a zero-copy
+slice that is rebuilt with the labels it had:
+
+    from report_export import load_export
+    export = load_export()
+    export['missed_counts']          # pandas Series, as in the report
+    export.table('missed_counts')    # the Arrow rows themselves
+"""
+
+import json
+import math
+import os
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import report_data
+from report_snapshot import source_fingerprint
+
+EXPORT_VERSION = 2
+EXPORT_DIR = os.path.join(report_data.BASE, '_report_export')
+JSON_NAME = 'aggregates.json'
+ARROW_NAME = 'aggregates.arrow'
+# How often load_export looks again when it caught a build between swapping the two files in
+READ_RETRIES = 5
+
+ARROW_SCHEMA = pa.schema([
+    ('name', pa.dictionary(pa.int32(), pa.string())),
+    ('row', pa.string()),
+    ('column', pa.string()),
+    ('value', pa.float64()),
+])
+
+
+# ═══════════════════════════════════════════
+# FLATTEN
+# ═══════════════════════════════════════════
+
+def flatten(agg, prefix=''):
+    """(name, value) of every aggregate, nested dicts expanded into dotted names."""
+    for key, value in agg.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            yield from flatten(value, f'{name}.')
+        else:
+            yield name, value
+
+
+def kind_of(value):
+    if isinstance(value, pd.DataFrame):
+        return 'table'
+    if isinstance(value, pd.Series):
+        return 'series'
+    if isinstance(value, (np.ndarray, list, tuple)):
+        return 'array'
+    return 'scalar'
+
+
+def _json_value(value):
+    # numpy scalars to Python ones; NaN, which JSON cannot hold, to null
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _json_values(values):
+    return [_json_value(v) for v in np.asarray(values).tolist()]
+
+
+def to_json(value):
+    kind = kind_of(value)
+    if kind == 'scalar':
+        return {'kind': kind, 'value': _json_value(value)}
+    if kind == 'array':
+        return {'kind': kind, 'values': _json_values(value)}
+    entry = {'kind': kind, 'index': _json_values(value.index)}
+    if value.index.name is not None:
+        entry['index_name'] = value.index.name
+    if kind == 'series':
+        if value.name is not None:
+            entry['name'] = value.name
+        entry['values'] = _json_values(value.to_numpy())
+    else:
+        entry['columns'] = _json_values(value.columns)
+        if value.columns.name is not None:
+            entry['columns_name'] = value.columns.name
+        entry['values'] = [_json_values(row) for row in value.to_numpy()]
+    return entry
+
+
+def _labels(values):
+    return [None if label is None else str(label) for label in values]
+
+
+def _label_spec(labels):
+    return {'dtype': str(labels.dtype), 'name': labels.name}
+
+
+def label_specs(value):
+    """What the text labels of the Arrow rows lose: label dtypes and names, the Series name."""
+    kind = kind_of(value)
+    if kind == 'series':
+        return {'index': _label_spec(value.index), 'name': value.name}
+    if kind == 'table':
+        specs = {'index': _label_spec(value.index),
+                 'columns': dict(_label_spec(value.columns), values=_json_values(value.columns))}
+        if not len(value.columns):
+            specs['index']['values'] = _json_values(value.index)
+        return specs
+    return {}
+
+
+def restore_labels(labels, spec):
+    """The Index of text `labels` with the dtype and name recorded by label_specs."""
+    dtype = spec['dtype']
+    if dtype == 'bool':
+        labels = [label == 'True' if isinstance(label, str) else label for label in labels]
+    index = pd.Index(labels, dtype=object)
+    if dtype != 'object':
+        index = index.astype(dtype)
+    return index.rename(spec['name'])
+
+
+def to_rows(value):
+    """(row labels, column labels, float values) of one aggregate in the long Arrow layout."""
+    kind = kind_of(value)
+    if kind == 'scalar':
+        return [None], [None], np.array([value], dtype=float)
+    if kind == 'array':
+        values = np.asarray(value, dtype=float).ravel()
+        return [None] * len(values), [None] * len(values), values
+    if kind == 'series':
+        return _labels(value.index), [None] * len(value), value.to_numpy(dtype=float)
+    rows, cols = value.shape
+    return (_labels(np.repeat(value.index.to_numpy(dtype=object), cols)),
+            _labels(np.tile(value.columns.to_numpy(dtype=object), rows)),
+            value.to_numpy(dtype=float).ravel())
+
+
+# ═══════════════════════════════════════════
+# WRITE
+# ═══════════════════════════════════════════
+
+def _header(fingerprint):
+    return {
+        'version': EXPORT_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'fingerprint': fingerprint or source_fingerprint(),
+        'build': uuid.uuid4().hex,
+    }
+
+
+def write_json(items, path, header):
+    payload = dict(header, aggregates={name: to_json(value) for name, value in items})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def write_arrow(items, path, header):
+    names, rows, columns, values = [], [], [], []
+    index = {}
+    start = 0
+    for code, (name, value) in enumerate(items):
+        r, c, v = to_rows(value)
+        index[name] = {'kind': kind_of(value), 'start': start, 'length': len(v), **label_specs(value)}
+        names.append(np.full(len(v), code, dtype=np.int32))
+        rows += r
+        columns += c
+        values.append(v)
+        start += len(v)
+
+    table = pa.table([
+        pa.DictionaryArray.from_arrays(np.concatenate(names), [name for name, _ in items]),
+        pa.array(rows, pa.string()),
+        pa.array(columns, pa.string()),
+        pa.array(np.concatenate(values), pa.float64()),
+    ], schema=ARROW_SCHEMA.with_metadata({
+        'version': str(header['version']),
+        'created': header['created'],
+        'fingerprint': header['fingerprint'],
+        'build': header['build'],
+        'index': json.dumps(index, ensure_ascii=False),
+    }))
+    # Uncompressed, so the buffers can be used straight from the memory map
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def write_export(agg, path=EXPORT_DIR, fingerprint=None):
+    """Write aggregates.json and aggregates.arrow to `path`; returns the JSON path."""
+    os.makedirs(path, exist_ok=True)
+    items = list(flatten(agg))
+    header = _header(fingerprint)
+    outputs = [(ARROW_NAME, write_arrow), (JSON_NAME, write_json)]
+    # Both are written next to the old files first and then swapped in, so a reader never sees half
+    # an export, and the two only differ in build for the moment between the two renames
+    for name, write in outputs:
+        write(items, os.path.join(path, f'{name}.tmp'), header)
+    for name, _ in outputs:
+        os.replace(os.path.join(path, f'{name}.tmp'), os.path.join(path, name))
+    return os.path.join(path, JSON_NAME)
+
+
+# ═══════════════════════════════════════════
+# READ
+# ═══════════════════════════════════════════
+
+class Export:
+    """A memory-mapped aggregates.arrow: aggregates are sliced from it on access, without copying."""
+
+    def __init__(self, path):
+        self.path = path
+        self._source = pa.memory_map(path, 'r')
+        self._table = pa.ipc.open_file(self._source).read_all()
+        meta = {k.decode(): v.decode() for k, v in self._table.schema.metadata.items()}
+        if int(meta['version']) != EXPORT_VERSION:
+            raise ValueError(f"{path} is a version {meta['version']} export, expected {EXPORT_VERSION}")
+        self.version = int(meta['version'])
+        self.created = meta['created']
+        self.fingerprint = meta['fingerprint']
+        self.build = meta['build']
+        self.index = json.loads(meta['index'])
+
+    @property
+    def names(self):
+        return list(self.index)
+
+    def table(self, name):
+        entry = self.index[name]
+        return self._table.slice(entry['start'], entry['length'])
+
+    def __getitem__(self, name):
+        """
+        The aggregate rebuilt as a scalar, NumPy array, Series or DataFrame, with its labels, label
+        dtypes and names as written (values as floats).
+        """
+        entry = self.index[name]
+        kind = entry['kind']
+        rows = self.table(name)
+        values = rows.column('value').to_numpy()
+        if kind == 'scalar':
+            return values[0]
+        if kind == 'array':
+            return values
+        labels = rows.column('row').to_pylist()
+        if kind == 'series':
+            return pd.Series(values, index=restore_labels(labels, entry['index']), name=entry['name'])
+        columns = entry['columns']
+        n = len(columns['values'])
+        # Row-major: the row label repeats for every column
+        labels = entry['index']['values'] if n == 0 else labels[::n]
+        return pd.DataFrame(values.reshape(len(labels), n), index=restore_labels(labels, entry['index']),
+                            columns=restore_labels(columns['values'], columns))
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def close(self):
+        self._table = None
+        self._source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_build(path=EXPORT_DIR):
+    """Build id of the aggregates.json in `path`."""
+    with open(os.path.join(path, JSON_NAME), encoding='utf-8') as f:
+        return json.load(f)['build']
+
+
+def load_export(path=EXPORT_DIR, retries=READ_RETRIES):
+    """The Arrow export in `path`, checked to come from the same build as the JSON next to it."""
+    for attempt in range(retries + 1):
+        export = Export(os.path.join(path, ARROW_NAME))
+        if export.build == read_build(path):
+            return export
+        export.close()
+        # A build is between swapping in its Arrow file and its JSON
+        time.sleep(0.05 * (attempt + 1))
+    raise ValueError(f'{JSON_NAME} and {ARROW_NAME} in {path} come from different builds')
@@ -0,0 +1,393 @@
+"""
+Multivariate model of school absence in the pre-installation wave.
+
+A logistic regression of the absence answer on affordability, missing amenities, symptoms and
+information preparedness together (report_data.model_outcome / model_terms), instead of one
+driver at a time. Every fit the report needs is solved in batches:
+
+  full       all respondents: coefficients, odds ratios and Wald intervals
+  bootstrap  BOOTSTRAP (Poisson) resamples of the respondents: percentile intervals of the odds ratios,
+             drawn only when the sample has at least MIN_GROUP respondents
+  folds      FOLDS cross-validation training sets: held-out log loss and accuracy
+  schools    one fit per school type with at least MIN_GROUP respondents, with Wald intervals
+
+The predictors are answers and small counts, so the respondents collapse into cells of identical
+(school, outcome, predictors). Fits run on the cells, weighted by how many respondents each cell
+stands for in that fit; a resample or a fold is just another row of weights. The solver is
+Newton's method vectorized over a batch of fits: per iteration, one (fits, cells) matrix product
+for the gradients, one against the precomputed cell outer products for the Hessians and a batched
+solve. A step that would lower a fit's penalized likelihood is halved until it does not. Resamples
+are solved BLOCK at a time and drawn for CHUNK respondents at a time, which bounds memory at
+BLOCK x cells weights and BLOCK x CHUNK draws; thousands of fits take about a second. A light
+ridge penalty on the predictors keeps their coefficients finite where an answer separates the
+outcome, as it can in a small school. The estimates are therefore penalized ones, shrunk slightly
+towards 0, and their standard errors are those of the penalized estimate: the sandwich
+(H + P)⁻¹ H (H + P)⁻¹ of the unpenalized Hessian H and the penalty P, not the inverse penalized
+Hessian (H + P)⁻¹ on its own.
+
+The intercept is not penalized, so a fit whose respondents all share one outcome has no finite
+estimate and does not converge. Such resamples (likely in a small, lopsided school) are left out
+of the bootstrap percentiles along with any other fit that did not converge, and model_fit
+reports how many were; a school type whose fit did not converge gets no odds ratios.
+
+The respondents and their cells are held by a ModelData, which only ever answers with sums over
+them: respondents and events per fit, and the log-likelihood, gradient and Hessian of every fit
+of a batch at the coefficients it is given. model_aggregates runs the Newton iterations on those
+sums, added up over any number of ModelData, so report_partial.py fits the model on data that
+stays on its nodes. Each respondent's bootstrap draws and fold are derived from a hash of its
+response key (its form timestamp, a repeated one numbered) and SEED, not from its position, so
+the results do not depend on row order or on how the respondents are split between nodes.
+"""
+
+import math
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from report_answers import MISSING, SCALES
+
+SEED = 2025
+BOOTSTRAP = 2000
+FOLDS = 5
+# Fits solved together
+BLOCK = 250
+# Respondents whose bootstrap draws are generated together
+CHUNK = 1024
+RIDGE = 0.1
+TOLERANCE = 1e-8
+MAX_ITER = 50
+MAX_HALVING = 30
+# Respondents a school type needs to get its own fit; fewer give odds ratios that mean nothing
+MIN_GROUP = 30
+# Normal quantile of a two-sided 95% interval
+Z = 1.959963984540054
+INTERCEPT = 'Konštanta'
+KEY = 'Timestamp'
+
+# P(X <= k) of a Poisson(1) count, k = 0, 1, ...: a uniform draw is turned into a count by how many
+# of these it reaches, compared as 53-bit integers
+POISSON_CDF = np.cumsum([math.exp(-1) / math.factorial(k) for k in range(20)])
+POISSON_CUTS = np.ceil(POISSON_CDF * 2.0 ** 53).astype(np.uint64)
+
+
+# ═══════════════════════════════════════════
+# RESPONDENT DRAWS
+# ═══════════════════════════════════════════
+
+def mix(h):
+    """SplitMix64 finalizer of uint64 values: every bit of the result depends on every bit of `h`."""
+    h = np.asarray(h, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        h = h + np.uint64(0x9E3779B97F4A7C15)
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def respondent_seeds(stamps, seed=SEED):
+    """One uint64 per respondent from its response key: the timestamp, a repeated one numbered '#2', '#3', ..."""
+    stamps = pd.Series(np.asarray(stamps, dtype=object)).astype(str)
+    repeat = stamps.groupby(stamps, sort=False).cumcount().to_numpy()
+    keys = np.where(repeat == 0, stamps, stamps + '#' + (repeat + 1).astype(str)).astype(object)
+    return mix(pd.util.hash_array(keys) ^ np.uint64(seed))
+
+
+def respondent_folds(seeds, folds=FOLDS):
+    return (mix(seeds) % np.uint64(folds)).astype(np.intp)
+
+
+def respondent_draws(seeds, start, stop):
+    """(resamples start..stop-1, respondents) Poisson(1) bootstrap draws: how often each respondent is resampled."""
+    streams = mix(np.arange(start, stop, dtype=np.uint64) + np.uint64(1))
+    bits = mix(seeds[None, :] ^ streams[:, None]) >> np.uint64(11)
+    draws = np.zeros(bits.shape, dtype=np.uint8)
+    for cut in POISSON_CUTS[POISSON_CUTS <= bits.max()]:
+        draws += bits >= cut
+    return draws
+
+
+# ═══════════════════════════════════════════
+# RESPONDENTS
+# ═══════════════════════════════════════════
+
+def term_values(df, answers, column, level):
+    """One predictor: 1 / 0 for answer `level` of a closed question, else the numeric column."""
+    if level is None:
+        return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+    codes = answers[column].to_numpy()
+    return np.where(codes == MISSING, np.nan, (codes == answers.code(column, level)).astype(float))
+
+
+def cell_moments(x, y, weights, beta, outer):
+    """Log-likelihood (fits,), gradient (fits, terms) and Hessian (fits, terms, terms) of every fit at `beta`."""
+    eta = beta @ x.T
+    mu = expit(eta)
+    softplus = np.maximum(eta, 0) + np.log1p(np.exp(-np.abs(eta)))
+    value = (weights * (y * eta - softplus)).sum(axis=1)
+    gradient = (weights * (y - mu)) @ x
+    hessian = ((weights * mu * (1 - mu)) @ outer).reshape(len(beta), x.shape[1], x.shape[1])
+    return value, gradient, hessian
+
+
+def log_loss(beta, x, y, weights):
+    mu = np.clip(expit(beta @ x.T), 1e-12, 1 - 1e-12)
+    return -(weights * (y * np.log(mu) + (1 - y) * np.log(1 - mu))).sum()
+
+
+class ModelData:
+    """
+    The respondents with a known outcome and every predictor known, as cells, each respondent
+    with its fold and bootstrap draws. `group` holds the group codes, `x` the predictors (no
+    intercept), `stamps` the response timestamps; rows with a missing value are left out.
+
+    Every method answers with sums over the respondents, shaped by the fits and terms only. A
+    batch is ('main', fitted groups): the full sample, the FOLDS training sets and one fit per
+    fitted group, or ('boot', start, stop): those bootstrap resamples.
+    """
+
+    def __init__(self, group, y, x, stamps, seed=SEED):
+        rows = np.column_stack([group, y, x]).astype(float)
+        known = ~np.isnan(rows).any(axis=1)
+        seeds = respondent_seeds(stamps, seed)[known]
+        rows = rows[known]
+        cells, cell = np.unique(rows, axis=0, return_inverse=True)
+        # Respondents in cell order, so the draws of a run of them add up into cells with reduceat
+        order = np.argsort(cell.reshape(-1), kind='stable')
+        self.cell = cell.reshape(-1)[order]
+        self.seeds = seeds[order]
+        self.group = cells[:, 0].astype(np.intp)
+        self.y = cells[:, 1]
+        self.x = np.column_stack([np.ones(len(cells)), cells[:, 2:]])
+        self.outer = (self.x[:, :, None] * self.x[:, None, :]).reshape(len(cells), self.x.shape[1] ** 2)
+        self.counts = np.bincount(self.cell, minlength=len(cells)).astype(float)
+        self.held_out = np.zeros((FOLDS, len(cells)))
+        np.add.at(self.held_out, (respondent_folds(self.seeds), self.cell), 1)
+        self.train = self.counts - self.held_out
+        self._batch = None
+
+    def weights(self, batch):
+        """(fits, cells) respondents each cell stands for in every fit of `batch`."""
+        if batch == self._batch:
+            return self._weights
+        if batch[0] == 'main':
+            by_group = [np.where(self.group == g, self.counts, 0.0) for g in batch[1]]
+            weights = np.vstack([self.counts[None], self.train, *by_group])
+        else:
+            _, start, stop = batch
+            weights = np.zeros((stop - start, len(self.counts)))
+            for first in range(0, len(self.cell), CHUNK):
+                cell = self.cell[first:first + CHUNK]
+                bounds = np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]])
+                draws = respondent_draws(self.seeds[first:first + CHUNK], start, stop)
+                weights[:, cell[bounds]] += np.add.reduceat(draws, bounds, axis=1, dtype=float)
+        self._batch, self._weights = batch, weights
+        return weights
+
+    def summary(self, groups):
+        """(respondents per group code 0..groups-1, events)."""
+        return np.bincount(self.group, weights=self.counts, minlength=groups), np.float64(self.counts @ self.y)
+
+    def totals(self, batch):
+        """(respondents, events) of every fit of `batch`."""
+        weights = self.weights(batch)
+        return weights.sum(axis=1), weights @ self.y
+
+    def moments(self, batch, beta):
+        """Unpenalized log-likelihood, gradient and Hessian of every fit of `batch` at `beta`."""
+        return cell_moments(self.x, self.y, self.weights(batch), beta, self.outer)
+
+    def cv(self, fold_beta):
+        """Per fold: held-out log loss and correct predictions, and respondents and events of its two parts."""
+        loss = np.array([log_loss(fold_beta[k], self.x, self.y, self.held_out[k]) for k in range(FOLDS)])
+        hits = np.array([(self.held_out[k] * ((expit(self.x @ fold_beta[k]) >= 0.5) == self.y)).sum()
+                         for k in range(FOLDS)])
+        return (loss, hits, self.train @ self.y, self.train.sum(axis=1),
+                self.held_out @ self.y, self.held_out.sum(axis=1))
+
+
+def model_data(df, answers, outcome, terms, group):
+    """
+    ModelData of the respondents of `df`. `outcome` is (column, answer coded 1, answer coded 0);
+    respondents with another answer, or without one, are left out.
+    """
+    column, positive, negative = outcome
+    codes = answers[column].to_numpy()
+    y = np.where(codes == answers.code(column, positive), 1.0,
+                 np.where(codes == answers.code(column, negative), 0.0, np.nan))
+    x = np.column_stack([term_values(df, answers, col, level) for col, level in terms.values()])
+    return ModelData(answers[group].to_numpy().astype(float), y, x, df[KEY].to_numpy())
+
+
+def total(parts):
+    """Element-wise sum of the answers of several ModelData."""
+    parts = list(parts)
+    return tuple(sum(values) for values in zip(*parts))
+
+
+# ═══════════════════════════════════════════
+# BATCHED SOLVER
+# ═══════════════════════════════════════════
+
+def expit(eta):
+    return 1 / (1 + np.exp(-np.clip(eta, -30, 30)))
+
+
+def newton(moments, weight, terms, ridge=RIDGE, tol=TOLERANCE, max_iter=MAX_ITER, warn=True):
+    """
+    Ridge-penalized logistic regressions by Newton's method, one per entry of `weight` (the
+    respondents of each fit). `moments(beta)` gives the unpenalized log-likelihood, gradient and
+    Hessian of every fit at `beta` (fits, terms). Returns the coefficients, their sandwich
+    covariances and whether each fit converged; with `warn`, one that did not raises a warning.
+    """
+    fits = len(weight)
+    penalty = np.full(terms, ridge)
+    penalty[0] = 0.0
+    # A fit whose weights hold no respondent would have a singular Hessian; it stays at zero
+    penalty = np.where(np.asarray(weight)[:, None] > 0, penalty, 1.0)
+
+    def penalized(beta):
+        value, gradient, hessian = moments(beta)
+        return (value - 0.5 * (penalty * beta ** 2).sum(axis=1), gradient - penalty * beta,
+                hessian + penalty[:, :, None] * np.eye(terms), hessian)
+
+    beta = np.zeros((fits, terms))
+    current = penalized(beta)
+    converged = np.zeros(fits, dtype=bool)
+    for _ in range(max_iter):
+        value, gradient, hessian, _ = current
+        step = np.linalg.solve(hessian, gradient[..., None])[..., 0]
+        # Step-halving, per fit, where the full Newton step overshoots
+        scale = np.ones(fits)
+        for _ in range(MAX_HALVING):
+            candidate = beta + scale[:, None] * step
+            new = penalized(candidate)
+            worse = new[0] < value - 1e-12 * np.abs(value)
+            if not worse.any():
+                break
+            scale[worse] /= 2
+        beta, current = candidate, new
+        converged = np.abs(step).max(axis=1, initial=0.0) < tol
+        if converged.all():
+            break
+    if warn and not converged.all():
+        warnings.warn(f'Logistic regression: {int((~converged).sum())} of {fits} fits did not converge in '
+                      f'{max_iter} iterations', stacklevel=2)
+    _, _, penalized_hessian, unpenalized = current
+    bread = np.linalg.inv(penalized_hessian)
+    return beta, bread @ unpenalized @ bread, converged
+
+
+def fit_logistic(x, y, weights, ridge=RIDGE, tol=TOLERANCE, max_iter=MAX_ITER, warn=True):
+    """
+    Ridge-penalized logistic regressions of `y` on `x` (cells, terms), one per row of `weights`
+    (fits, cells). Returns the coefficients (fits, terms), their covariance estimates
+    (fits, terms, terms), the sandwich of the penalized and unpenalized Hessians, and whether each
+    fit converged (fits,). The intercept is not penalized. With `warn`, a fit that did not converge
+    raises a warning.
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    outer = (x[:, :, None] * x[:, None, :]).reshape(len(x), x.shape[1] ** 2)
+    return newton(lambda beta: cell_moments(x, y, weights, beta, outer), weights.sum(axis=1), x.shape[1],
+                  ridge, tol, max_iter, warn)
+
+
+def bootstrap(sources, reps, terms, block=BLOCK):
+    """
+    Coefficients (reps, terms) of `reps` resamples, drawn and solved `block` at a time, and which
+    of them can be used (reps,): converged, with respondents of both outcomes.
+    """
+    betas, usable = [np.empty((0, terms))], [np.empty(0, dtype=bool)]
+    for start in range(0, reps, block):
+        batch = ('boot', start, min(start + block, reps))
+        weight, events = total(source.totals(batch) for source in sources)
+        beta, _, converged = newton(lambda b: total(source.moments(batch, b) for source in sources), weight, terms,
+                                    warn=False)
+        betas.append(beta)
+        usable.append(converged & (events > 0) & (events < weight))
+    return np.vstack(betas), np.concatenate(usable)
+
+
+# ═══════════════════════════════════════════
+# AGGREGATES
+# ═══════════════════════════════════════════
+
+def model_aggregates(sources, terms, group_scale, reps=BOOTSTRAP):
+    """
+    The model fitted on the respondents of every ModelData in `sources` together:
+
+    model_terms        coefficient, standard error, odds ratio with Wald and bootstrap 95% intervals
+                       and p-value of every term
+    model_groups       odds ratios fitted within each group (school type) and its respondents; NaN
+                       for a group of fewer than MIN_GROUP respondents, which gets no fit
+    model_groups_low   lower and upper bounds of the 95% Wald intervals of those odds ratios
+    model_groups_high
+    model_fit          respondents, events, fits in the batch, bootstrap resamples used and left out,
+                       and cross-validated log loss / accuracy
+    """
+    sources = list(sources)
+    p = len(terms) + 1
+    labels = SCALES[group_scale]
+    sizes, events = total(source.summary(len(labels)) for source in sources)
+    n = sizes.sum()
+    present = [g for g in range(len(sizes)) if sizes[g] > 0]
+    fitted = [g for g in present if sizes[g] >= MIN_GROUP]
+
+    # The full sample, the folds and the groups in one batch, the resamples in blocks
+    main = ('main', tuple(fitted))
+    weight, _ = total(source.totals(main) for source in sources)
+    beta, cov, converged = newton(lambda b: total(source.moments(main, b) for source in sources), weight, p)
+    full, fold_beta, group_beta = beta[0], beta[1:1 + FOLDS], beta[1 + FOLDS:]
+    group_se = np.sqrt(np.diagonal(cov[1 + FOLDS:], axis1=1, axis2=2))
+    # A group whose fit ran off to infinity has no odds ratios to show
+    group_beta = np.where(converged[1 + FOLDS:, None], group_beta, np.nan)
+    # Too few respondents to resample; the bootstrap intervals stay empty
+    reps = reps if n >= MIN_GROUP else 0
+    boot_beta, usable = bootstrap(sources, reps, p)
+
+    names = [INTERCEPT, *terms]
+    se = np.sqrt(np.diag(cov[0]))
+    z = full / se
+    if usable.any():
+        low, high = np.percentile(boot_beta[usable], [2.5, 97.5], axis=0)
+    else:
+        low = high = np.full(len(names), np.nan)
+    table = pd.DataFrame({
+        'coef': full,
+        'se': se,
+        'odds_ratio': np.exp(full),
+        'or_low': np.exp(full - Z * se),
+        'or_high': np.exp(full + Z * se),
+        'boot_low': np.exp(low),
+        'boot_high': np.exp(high),
+        'p_value': [math.erfc(abs(v) / math.sqrt(2)) for v in z],
+    }, index=pd.Index(names, name='term'))
+
+    index = pd.Index([labels[g] for g in present], name='group')
+    row = [present.index(g) for g in fitted]
+
+    def by_school(values):
+        table = np.full((len(present), len(terms)), np.nan)
+        table[row] = np.exp(values[:, 1:])
+        return pd.DataFrame(table, index=index, columns=list(terms))
+
+    groups = by_school(group_beta)
+    groups['n'] = sizes[present].astype(np.int64)
+
+    # Held-out fit against always predicting the training share of absence
+    loss, hits, train_events, train_n, held_events, held_n = total(source.cv(fold_beta) for source in sources)
+    # A fold whose training share is 0 or 1 would otherwise give an infinite loss, like log_loss clips
+    share = np.clip(train_events / train_n, 1e-12, 1 - 1e-12)
+    baseline = -(held_events * np.log(share) + (held_n - held_events) * np.log(1 - share)).sum()
+    fit = pd.Series({
+        'respondents': n,
+        'events': events,
+        'fits': float(len(weight) + reps),
+        'boot_used': float(usable.sum()),
+        'boot_dropped': float(reps - usable.sum()),
+        'cv_log_loss': loss.sum() / n,
+        'cv_baseline_log_loss': baseline / n,
+        'cv_accuracy': hits.sum() / n * 100,
+    }, name='model')
+    return {'model_terms': table, 'model_groups': groups, 'model_groups_low': by_school(group_beta - Z * group_se),
+            'model_groups_high': by_school(group_beta + Z * group_se), 'model_fit': fit}
@@ -0,0 +1,497 @@
+"""
+Mergeable partial aggregates, for computing the report from exports spread over many machines.
+
+Each shard (one municipality's pre / after exports) is reduced on its own machine to a partial
+state of counts and sums. No respondent's row leaves the node, but a count can be as small as
+one respondent: a shard sends
+
+  answer counts      per question, counts of each canonical answer code, in order of first appearance
+  column sums        the binary info / product / symptom / topic columns
+  sum and count      Vek, Vek prvej menštruácie, Lack_count per sibling / age group, first period
+                     age per information level
+  histogram bins     age and first period age
+  correlation sums   n, Σx, Σy, Σx², Σy², Σxy of age and of siblings vs lacking amenities
+  matched questions  respondents per harmonized category of every report_data.matched_questions
+                     and sample_questions pair, one flat array per wave (report_compare.matched_counts)
+  raking cells       respondents per (age band, school, grade, harmonized category of every
+                     matched_questions pair), from which the coordinator rakes both waves exactly as
+                     report_weights does per row and weights the matched questions
+  text statistics    the report_text.TextStats counters: term and bigram counts of the open answers
+
+The absence model (report_model.py) cannot be reduced to one such state: its respondents stay on
+the node (model_node, a report_model.ModelData), and the coordinator fits the model by Newton's
+method, asking every node at each iteration for sums over its respondents. What a node answers
+is, per fit of the batch: its respondents and events, and the log-likelihood, gradient (one value
+per term) and Hessian (terms x terms) at the coefficients the coordinator sent; per
+cross-validation fold, its held-out log loss, correct predictions, respondents and events; and
+its respondents and events per school type.
+
+States merge associatively (merge_states), so a coordinator can combine them in any grouping,
+and finalize() turns the merged state into the same aggregates dict compute_aggregates and
+compute_text_aggregates give on all rows together, ready for rendering. Merging shards in the
+order their rows would be concatenated also keeps the tie order of the counts.
+
+    state = partial_state(pre_csv, after_csv)         # on each node
+    blob = dump_state(state)                          # sent to the coordinator
+    agg = finalize(merge_states(map(load_state, blobs)), nodes)   # nodes answer the model's queries
+
+Local processes stand in for nodes, one per shard:
+
+    python report_partial.py --shards 4             # split the exports, reduce in 4 processes, compare
+    python report_partial.py --shards 4 --output merged.docx
+"""
+
+import argparse
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import report_charts
+import report_data
+import report_store
+from report_answers import MISSING, QUESTIONS, SCALES, canonicalize, tally
+from report_backend import to_pandas
+from report_charts import FINAL_OUTPUT
+from report_compare import comparison_tables, flat_counts, matched_codes, matched_counts, sample_tables, weighted_tables
+from report_model import model_aggregates, model_data
+from report_data import (
+    AGE_BINS, FIRST_PERIOD_BINS, COL_PRE_MISSED, COL_PRE_AFFORD, COL_PRE_INFO_PREP, COL_PRE_STRESS, COL_AFTER_MISSED,
+    COL_AFTER_DAYS, COL_AFTER_REASON, COL_AFTER_USED_PADS, COL_AFTER_USAGE, COL_AFTER_ATTENDANCE,
+    COL_AFTER_FEELINGS, COL_AFTER_CONFIDENT, COL_AFTER_CONTINUE, COL_AFTER_FUTURE, COL_AFTER_USEFUL,
+    COL_AFTER_DISCUSSION, COL_AFTER_PSYCH, COL_AFTER_LECTURES, COL_AFTER_HELP, COL_SCHOOL,
+    info_cols, product_cols, symptom_cols, topic_columns, columns_amenities, matched_questions, sample_questions,
+    model_outcome, model_terms, order, order_hw, order_days, order_products, order_att, order_f, order_c, order_d,
+    order_ps, order_l, order_h,
+)
+from report_docx_stream import write_document
+from report_text import compute_text_aggregates, text_stats
+from report_weights import common_targets, margin_codes, rake
+
+PARTIAL_VERSION = 2
+
+
+# ═══════════════════════════════════════════
+# MERGE
+# ═══════════════════════════════════════════
+
+def merge(a, b):
+    """Associative merge of two states: dicts are merged key by key (keeping first-seen order), the rest added."""
+    if isinstance(a, dict):
+        merged = dict(a)
+        for key, value in b.items():
+            merged[key] = merge(merged[key], value) if key in merged else value
+        return merged
+    return a + b
+
+
+def merge_states(states):
+    merged = None
+    for state in states:
+        if state['version'] != PARTIAL_VERSION:
+            raise ValueError(f"Partial state version {state['version']}, expected {PARTIAL_VERSION}")
+        parts = {key: value for key, value in state.items() if key != 'version'}
+        merged = parts if merged is None else merge(merged, parts)
+    if merged is None:
+        raise ValueError('No partial states to merge')
+    return {'version': PARTIAL_VERSION, **merged}
+
+
+def dump_state(state):
+    return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_state(data):
+    return pickle.loads(data)
+
+
+# ═══════════════════════════════════════════
+# PARTIAL STATES
+# ═══════════════════════════════════════════
+
+def answer_counts(answers, mask=None):
+    """{question: {code: n}} of every canonicalized question, codes in order of first appearance."""
+    counts = {}
+    for col in answers.codes.columns:
+        values = answers[col].to_numpy()
+        if mask is not None:
+            values = values[mask]
+        values = values[values != MISSING]
+        n = np.bincount(values, minlength=len(SCALES[QUESTIONS[col]]))
+        counts[col] = {int(c): n[c] for c in pd.unique(values)}
+    return counts
+
+
+def mean_state(values):
+    values = np.asarray(values, dtype=float)
+    known = values[~np.isnan(values)]
+    return {'sum': known.sum(), 'count': len(known)}
+
+
+def group_state(keys, values):
+    """{group: {'sum', 'count'}} behind a groupby(keys)[values].mean() / .count()."""
+    frame = pd.DataFrame({'key': keys, 'value': np.asarray(values, dtype=float)})
+    frame = frame[frame['key'].notna()]
+    groups = frame.groupby('key', sort=False)['value']
+    return {key: {'sum': total, 'count': np.int64(count)}
+            for key, total, count in zip(groups.sum().index, groups.sum(), groups.count())}
+
+
+def corr_state(x, y):
+    """n, Σx, Σy, Σx², Σy², Σxy of the pairs where both are known."""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    pair = ~np.isnan(x) & ~np.isnan(y)
+    x, y = x[pair], y[pair]
+    return {'n': len(x), 'x': x.sum(), 'y': y.sum(), 'xx': (x * x).sum(), 'yy': (y * y).sum(), 'xy': (x * y).sum()}
+
+
+def column_sums(df, cols):
+    return {col: df[col].sum() for col in cols if col in df.columns}
+
+
+def cell_counts(df, wave):
+    """{(age band, school, grade, *matched codes): respondents} for raking on the coordinator."""
+    cells = np.column_stack([margin_codes(df), matched_codes(df, matched_questions, wave)]).astype(np.int64)
+    keys, first, counts = np.unique(cells, axis=0, return_index=True, return_counts=True)
+    return {tuple(int(v) for v in keys[i]): np.int64(counts[i]) for i in np.argsort(first, kind='stable')}
+
+
+def pre_state(pre_data):
+    answers = canonicalize(pre_data)
+    high_school = report_data.is_high_school(canonicalize(pre_data, [report_data.COL_SCHOOL]))
+    df = to_pandas(pre_data, report_data.PRE_AGGREGATE_COLUMNS)
+    tampon_users = (df['Používané porteby: Tampóny'] == 1).to_numpy()
+    return {
+        'rows': len(df),
+        'age': mean_state(df['Vek']),
+        'first_period': mean_state(df['Vek prvej menštruácie']),
+        'age_hist': np.histogram(df['Vek'].dropna(), bins=AGE_BINS)[0],
+        'first_period_hist': np.histogram(df['Vek prvej menštruácie'].dropna(), bins=FIRST_PERIOD_BINS)[0],
+        'answers': answer_counts(answers),
+        'sums': column_sums(df, {**info_cols, **product_cols, **symptom_cols}),
+        'info_prep_first_period': group_state(answers.labels(COL_PRE_INFO_PREP).to_numpy(), df['Vek prvej menštruácie']),
+        'full_access': (df['Lack_count'] == 0).sum(),
+        'lacking_any': (df['Lack_count'] > 0).sum(),
+        'sibling_lack': group_state(df['Sibling_group'].to_numpy(dtype=object), df['Lack_count']),
+        'age_lack': group_state(df['Age_group'].to_numpy(dtype=object), df['Lack_count']),
+        'age_lack_corr': corr_state(df['Vek'], df['Lack_count']),
+        'siblings_lack_corr': corr_state(df['Počet súrodencov'], df['Lack_count']),
+        'tampon_answers': answer_counts(answers, tampon_users),
+        'tampon_users': int(tampon_users.sum()),
+        'high_school_answers': answer_counts(answers, high_school),
+        'matched': matched_counts(pre_data, matched_questions, 0, high_school),
+        'sample': matched_counts(pre_data, sample_questions, 0),
+        'cells': cell_counts(pre_data, 0),
+    }
+
+
+def after_state(after_data):
+    answers = canonicalize(after_data)
+    df = to_pandas(after_data, ['Vek'] + [col for col in topic_columns if col in after_data.columns])
+    ages = df['Vek'].dropna()
+    return {
+        'rows': len(df),
+        'age_counts': {value: np.int64(n) for value, n in ages.value_counts(sort=False).items()},
+        'answers': answer_counts(answers),
+        'topic_sums': column_sums(df, topic_columns),
+        'matched': matched_counts(after_data, matched_questions, 1),
+        'sample': matched_counts(after_data, sample_questions, 1),
+        'cells': cell_counts(after_data, 1),
+    }
+
+
+def partial_state(pre_path=None, after_path=None, backend=None):
+    """Partial state of one shard's exports (either may be missing)."""
+    state = {'version': PARTIAL_VERSION}
+    if pre_path is not None:
+        state['pre'] = pre_state(report_data.derive_pre(report_data.load_pre(pre_path, backend)))
+        state['text'] = text_stats(pre_path)
+    if after_path is not None:
+        state['after'] = after_state(report_data.derive_after(report_data.load_after(after_path, backend)))
+    return state
+
+
+def model_node(pre_path, backend=None):
+    """The model's respondents of one shard's pre export, kept on the node to answer the coordinator."""
+    pre_data = report_data.derive_pre(report_data.load_pre(pre_path, backend))
+    df = to_pandas(pre_data, report_data.PRE_AGGREGATE_COLUMNS)
+    return model_data(df, canonicalize(pre_data), model_outcome, model_terms, report_data.COL_SCHOOL)
+
+
+# ═══════════════════════════════════════════
+# FINALIZE
+# ═══════════════════════════════════════════
+
+def _tally(answers, col, order=None, normalize=False):
+    seen = answers.get(col, {})
+    n = np.zeros(len(SCALES[QUESTIONS[col]]), dtype=np.int64)
+    for c, count in seen.items():
+        n[c] = count
+    return tally(col, n, list(seen), order, normalize)
+
+
+def _mean(state):
+    return state['sum'] / state['count'] if state['count'] else np.float64(np.nan)
+
+
+def _group_means(groups, index_name, name):
+    keys = sorted(groups)
+    index = pd.Index(keys, name=index_name)
+    means = pd.Series([_mean(groups[k]) for k in keys], index=index, name=name, dtype=float)
+    counts = pd.Series([groups[k]['count'] for k in keys], index=index, name=name, dtype='int64')
+    return means, counts
+
+
+def _corr(c):
+    # NaN, as Series.corr gives, without two pairs or when either side is constant
+    n = c['n']
+    if n < 2:
+        return np.nan
+    var_x, var_y = c['xx'] - c['x'] ** 2 / n, c['yy'] - c['y'] ** 2 / n
+    if var_x <= 0 or var_y <= 0:
+        return np.nan
+    return (c['xy'] - c['x'] * c['y'] / n) / np.sqrt(var_x * var_y)
+
+
+def _sorted_sums(sums, cols, ascending=True):
+    return report_data.labelled_sums(pd.DataFrame({col: [sums[col]] for col in cols}), cols, ascending)
+
+
+def finalize_pre(s, nodes):
+    answers = s['answers']
+    a = {}
+    a['num_pre'] = s['rows']
+    a['schools_pre'] = _tally(answers, COL_SCHOOL)
+    a['avg_age'] = _mean(s['age']).__round__(2)
+    a['avg_first_period_age'] = _mean(s['first_period']).__round__(2)
+    a['age_hist'] = s['age_hist']
+    a['first_period_hist'] = s['first_period_hist']
+
+    a['missed_counts'] = _tally(answers, COL_PRE_MISSED, order)
+    a['afford_counts'] = _tally(answers, COL_PRE_AFFORD)
+    a['info_prep_counts'] = _tally(answers, COL_PRE_INFO_PREP)
+    a['stress_counts'] = _tally(answers, COL_PRE_STRESS)
+    a['info_sums'] = _sorted_sums(s['sums'], info_cols)
+    a['mean_ages'] = _group_means(s['info_prep_first_period'], 'Úroveň informovanosti', 'Vek prvej menštruácie')[0]
+    a['product_sums'] = _sorted_sums(s['sums'], product_cols)
+
+    df_plot = pd.DataFrame({
+        label: _tally(answers, sk_col, ['Áno', 'Nie', 'Nechcem odpovedať']) for sk_col, label in columns_amenities.items()
+    }).T
+    a['df_plot'] = df_plot.reindex(columns=['Áno', 'Nie', 'Nechcem odpovedať']).fillna(0).astype(float)
+    a['full_access'] = s['full_access']
+    a['lacking_any'] = s['lacking_any']
+
+    a['group_means'], a['group_counts'] = _group_means(s['sibling_lack'], 'Sibling_group', 'Lack_count')
+    a['group_means_age'], a['group_counts_age'] = _group_means(s['age_lack'], 'Age_group', 'Lack_count')
+    a['corr_age_lack'] = _corr(s['age_lack_corr'])
+    a['corr_siblings_lack'] = _corr(s['siblings_lack_corr'])
+
+    a['symptom_sums'] = _sorted_sums(s['sums'], symptom_cols)
+    a['hot_water_counts'] = _tally(s['tampon_answers'], 'Prístup k teplej vode', order_hw)
+    a['total_tampon'] = s['tampon_users']
+    a.update(model_aggregates(nodes, model_terms, 'school'))
+    return a
+
+
+def finalize_after(s):
+    answers = s['answers']
+    a = {}
+    a['num_after'] = s['rows']
+    a['schools_after'] = _tally(answers, COL_SCHOOL)
+    ages = s['age_counts']
+    a['age_counts'] = pd.Series(list(ages.values()), index=pd.Index(list(ages), name='Vek'), name='count',
+                                dtype='int64').sort_values(ascending=False)
+    a['missed_after'] = _tally(answers, COL_AFTER_MISSED, ['Áno', 'Nie', 'Nechcem odpovedať'])
+    a['days_missed'] = _tally(answers, COL_AFTER_DAYS, order_days)
+    a['reasons'] = _tally(answers, COL_AFTER_REASON)
+    a['used_pads'] = _tally(answers, COL_AFTER_USED_PADS, ['Áno', 'Nie', 'Nechcem odpovedať'])
+    a['products'] = _tally(answers, COL_AFTER_USAGE, order_products)
+    a['attendance'] = _tally(answers, COL_AFTER_ATTENDANCE, order_att)
+    a['feelings'] = _tally(answers, COL_AFTER_FEELINGS, order_f)
+    a['confident'] = _tally(answers, COL_AFTER_CONFIDENT, order_c)
+    a['continue_proj'] = _tally(answers, COL_AFTER_CONTINUE, ['Áno', 'Je mi to jedno'])
+    a['future_proj'] = _tally(answers, COL_AFTER_FUTURE, ['Áno, určite', 'Možno'])
+    a['discussion'] = _tally(answers, COL_AFTER_DISCUSSION, order_d)
+    a['psych'] = _tally(answers, COL_AFTER_PSYCH, order_ps)
+    a['lectures'] = _tally(answers, COL_AFTER_LECTURES, order_l)
+    a['help_issue'] = _tally(answers, COL_AFTER_HELP, order_h)
+
+    topic_counts = {label: s['topic_sums'][col] for col, label in topic_columns.items() if col in s['topic_sums']}
+    a['topics'] = pd.Series(topic_counts).sort_values(ascending=False)
+    return a
+
+
+def _cells(cells):
+    keys = np.array(list(cells), dtype=np.int64).reshape(-1, 3 + len(matched_questions))
+    return keys[:, :3], keys[:, 3:], np.array(list(cells.values()), dtype=float)
+
+
+def finalize_cross(pre, after):
+    a = {}
+    a['pre_afford_hs'] = _tally(pre['high_school_answers'], COL_PRE_AFFORD, normalize=True) * 100
+    a['pre_stress_hs'] = _tally(pre['high_school_answers'], COL_PRE_STRESS, normalize=True) * 100
+    a['pre_info_prep_hs'] = _tally(pre['high_school_answers'], COL_PRE_INFO_PREP, normalize=True) * 100
+    a['matched'] = comparison_tables(matched_questions, pre['matched'], after['matched'])
+    a['sample'] = sample_tables(sample_questions, pre['sample'], after['sample'])
+
+    # Every respondent of a raking cell gets the same weight, so the cells are raked with their sizes as base weights
+    # A cell of n respondents raked to weight w sums to w, its squared weights to w² / n
+    pre_codes, pre_matched, pre_n = _cells(pre['cells'])
+    after_codes, after_matched, after_n = _cells(after['cells'])
+    targets = common_targets(pre_codes, after_codes, counts=[pre_n, after_n])
+    pre_w = rake(pre_codes, targets, base=pre_n)
+    after_w = rake(after_codes, targets, base=after_n)
+    a['matched_weighted'] = weighted_tables(
+        matched_questions,
+        flat_counts(pre_matched, matched_questions, pre_w), flat_counts(pre_matched, matched_questions, pre_w ** 2 / pre_n),
+        flat_counts(after_matched, matched_questions, after_w),
+        flat_counts(after_matched, matched_questions, after_w ** 2 / after_n))
+
+    def count(col, label):
+        return int(after['answers'].get(col, {}).get(SCALES[QUESTIONS[col]].index(label), 0))
+
+    a['used_multiple'] = count(COL_AFTER_USAGE, 'Áno, viackrát')
+    a['used_once'] = count(COL_AFTER_USAGE, 'Áno, raz')
+    a['total_used'] = a['used_multiple'] + a['used_once']
+    a['useful_yes'] = count(COL_AFTER_USEFUL, 'Áno')
+    a['continue_yes_raw'] = count(COL_AFTER_CONTINUE, 'Áno')
+    a['future_yes_raw'] = count(COL_AFTER_FUTURE, 'Áno, určite')
+    a['future_maybe_raw'] = count(COL_AFTER_FUTURE, 'Možno')
+    return a
+
+
+def finalize(state, nodes):
+    """
+    The aggregates dict of compute_aggregates + compute_text_aggregates, from a (merged) state and
+    the model nodes of the shards it merges.
+    """
+    agg = {}
+    agg.update(finalize_pre(state['pre'], nodes))
+    agg.update(finalize_after(state['after']))
+    agg.update(finalize_cross(state['pre'], state['after']))
+    agg['text'] = {key: stats.summary() for key, stats in state['text'].items()}
+    return agg
+
+
+# ═══════════════════════════════════════════
+# LOCAL SHARDS
+# ═══════════════════════════════════════════
+
+def split_csv(path, shards, directory, prefix):
+    """Splits an export into `shards` consecutive parts with the same header; returns their paths."""
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    paths = []
+    for i, part in enumerate(np.array_split(np.arange(len(df)), shards)):
+        shard_path = os.path.join(directory, f'{prefix}_{i:03d}.csv')
+        df.iloc[part].to_csv(shard_path, index=False)
+        paths.append(shard_path)
+    return paths
+
+
+def serve_node(conn, pre_path, after_path):
+    """One node: sends its serialized state, then answers model queries until the coordinator sends None."""
+    conn.send_bytes(dump_state(partial_state(pre_path, after_path)))
+    node = model_node(pre_path)
+    while (request := conn.recv()) is not None:
+        method, args = request
+        conn.send_bytes(pickle.dumps(getattr(node, method)(*args), protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class RemoteNode:
+    """The coordinator's handle on a node process: a report_model.ModelData whose answers arrive over a pipe."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.received = 0
+
+    def ask(self, method, *args):
+        self.conn.send((method, args))
+        data = self.conn.recv_bytes()
+        self.received += len(data)
+        return pickle.loads(data)
+
+    def summary(self, groups):
+        return self.ask('summary', groups)
+
+    def totals(self, batch):
+        return self.ask('totals', batch)
+
+    def moments(self, batch, beta):
+        return self.ask('moments', batch, beta)
+
+    def cv(self, fold_beta):
+        return self.ask('cv', fold_beta)
+
+
+def differences(agg, reference, rtol=1e-9):
+    """Names of the aggregates that differ from `reference` (labels exactly, numbers to `rtol`)."""
+    def same(a, b):
+        if isinstance(a, dict):
+            return isinstance(b, dict) and list(a) == list(b) and all(same(a[k], b[k]) for k in a)
+        if isinstance(a, (pd.Series, pd.DataFrame)):
+            if type(a) is not type(b) or list(a.index) != list(b.index) or a.index.name != b.index.name:
+                return False
+            if isinstance(a, pd.DataFrame) and list(a.columns) != list(b.columns):
+                return False
+            return a.to_numpy().dtype == b.to_numpy().dtype and np.allclose(a.to_numpy(float), b.to_numpy(float), rtol=rtol, equal_nan=True)
+        return np.allclose(np.asarray(a, dtype=float), np.asarray(b, dtype=float), rtol=rtol, equal_nan=True)
+
+    return [name for name in reference if name not in agg or not same(agg[name], reference[name])]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compute the report aggregates from shards in separate processes and merge them.')
+    parser.add_argument('--shards', type=int, default=4, help='number of shards the exports are split into (default 4)')
+    parser.add_argument('--output', default=None, help='also render the report from the merged aggregates to this DOCX')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        pre_paths = split_csv(report_data.PRE_CSV, args.shards, directory, 'pre')
+        after_paths = split_csv(report_data.AFTER_CSV, args.shards, directory, 'after')
+
+        start = time.perf_counter()
+        pipes, processes = [], []
+        for pre_path, after_path in zip(pre_paths, after_paths):
+            conn, node_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=serve_node, args=(node_conn, pre_path, after_path))
+            process.start()
+            pipes.append(conn)
+            processes.append(process)
+        try:
+            blobs = [conn.recv_bytes() for conn in pipes]
+            nodes = [RemoteNode(conn) for conn in pipes]
+            agg = finalize(merge_states(load_state(blob) for blob in blobs), nodes)
+        finally:
+            for conn in pipes:
+                conn.send(None)
+            for process in processes:
+                process.join()
+        print(f'{args.shards} shards in {time.perf_counter() - start:.2f}s: {sum(map(len, blobs)) / 1024:.0f} KB of '
+              f'states and {sum(node.received for node in nodes) / 1024:.0f} KB of model sums sent to the coordinator')
+
+        pre_data, after_data = report_store.load_data()
+        reference = report_data.compute_aggregates(pre_data, after_data)
+        reference.update(compute_text_aggregates(pre_data))
+        differ = differences(agg, reference)
+        print(f'{len(reference) - len(differ)} of {len(reference)} aggregates match the single-machine build'
+              + (': differ ' + ', '.join(differ) if differ else ''))
+
+        if args.output:
+            report_charts.set_output({**FINAL_OUTPUT, 'dir': os.path.join(directory, 'images')})
+            try:
+                img = report_charts.render_all(agg)
+            finally:
+                report_charts.set_output(FINAL_OUTPUT)
+            write_document(agg, img, args.output)
+            print(f'Report from the merged aggregates: {os.path.abspath(args.output)}')
+    return 1 if differ else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Pipelined report build.
+
+The sequential build in generate_report.py runs load -> aggregate -> every chart -> DOCX -> save.
+Here the stages overlap instead:
+  - the survey store is synced with the CSV exports, then both waves are read from it and
+    cleaned concurrently (thread pool),
+  - each group of aggregates (pre / after / cross / text) is computed as soon as its inputs exist,
+  - every chart is submitted to a process pool the moment its aggregates are ready,
+  - DOCX sections are streamed into the file in document order as soon as their images have arrived.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import report_charts
+import report_data
+import report_docx
+import report_docx_stream
+import report_store
+from report_text import compute_text_aggregates
+from report_snapshot import write_snapshot
+from report_export import write_export
+
+# Aggregate groups each chart section / DOCX section reads from
+CHART_AGGREGATES = {'pre': ['pre'], 'text': ['text'], 'after': ['after'], 'cross': ['after', 'cross']}
+SECTION_AGGREGATES = {
+    'title': [],
+    'collected': ['pre', 'after'],
+    'pre': ['pre'],
+    'text': ['text'],
+    'pre_summary': ['pre'],
+    'after': ['after'],
+    'cross': ['pre', 'after', 'cross'],
+    'summary': ['after', 'cross'],
+}
+
+
+def _warm_worker():
+    # Forces the pool to start its processes while the CSVs are still being read,
+    # and lets each of them create its reusable figures in the meantime
+    report_charts.POOL.warm()
+    return os.getpid()
+
+
+def _process_pool(workers):
+    # forkserver workers fork from a clean process that already imported matplotlib;
+    # plain fork is unsafe here because the loader threads may be running
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    if ctx.get_start_method() == 'forkserver':
+        ctx.set_forkserver_preload(['report_charts'])
+    return ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+
+
+async def build_report_async(output_path, workers=None):
+    loop = asyncio.get_running_loop()
+    workers = workers or os.cpu_count() or 1
+
+    with ThreadPoolExecutor(max_workers=2) as io_pool, _process_pool(workers) as cpu_pool:
+        for _ in range(workers):
+            cpu_pool.submit(_warm_worker)
+
+        def in_thread(fn, *args):
+            return loop.run_in_executor(io_pool, fn, *args)
+
+        # ─── Sync the store, then load + derive both waves at once ───
+        synced = in_thread(report_store.sync)
+
+        async def load(form, derive):
+            await synced
+            return await in_thread(lambda: derive(report_store.load_wave(form)))
+
+        pre_data = asyncio.ensure_future(load('pre', report_data.derive_pre))
+        after_data = asyncio.ensure_future(load('after', report_data.derive_after))
+
+        # ─── Aggregates, each group as soon as its frames are loaded ───
+        async def pre_agg():
+            return await in_thread(report_data.compute_pre_aggregates, await pre_data)
+
+        async def after_agg():
+            return await in_thread(report_data.compute_after_aggregates, await after_data)
+
+        async def text_agg():
+            return await in_thread(compute_text_aggregates, await pre_data)
+
+        async def cross_agg():
+            pre, after = await asyncio.gather(pre_data, after_data)
+            return await in_thread(report_data.compute_cross_aggregates, pre, after)
+
+        groups = {
+            'pre': asyncio.ensure_future(pre_agg()),
+            'after': asyncio.ensure_future(after_agg()),
+            'cross': asyncio.ensure_future(cross_agg()),
+            'text': asyncio.ensure_future(text_agg()),
+        }
+
+        async def aggregates(names):
+            agg = {}
+            for part in await asyncio.gather(*(groups[n] for n in names)):
+                agg.update(part)
+            return agg
+
+        # ─── Charts, submitted per section as soon as its aggregates exist ───
+        async def render_section(section):
+            agg = await aggregates(CHART_AGGREGATES[section])
+            names = report_charts.charts_for(section)
+            paths = await asyncio.gather(*(
+                loop.run_in_executor(cpu_pool, report_charts.render_chart, name, agg) for name in names
+            ))
+            return dict(zip(names, paths))
+
+        images = {section: asyncio.ensure_future(render_section(section)) for section in CHART_AGGREGATES}
+
+        # ─── Snapshot and dashboard export, written alongside the DOCX assembly ───
+        async def snapshot():
+            pre, after = await asyncio.gather(pre_data, after_data)
+            agg = await aggregates(list(groups))
+            await in_thread(write_export, agg)
+            return await in_thread(write_snapshot, pre, after, agg)
+
+        snapshot_task = asyncio.ensure_future(snapshot())
+
+        # ─── DOCX, in document order, each section once its inputs arrive ───
+        with report_docx_stream.new_document(output_path) as doc:
+            for name, (build, chart_section) in report_docx.SECTIONS.items():
+                agg = await aggregates(SECTION_AGGREGATES[name])
+                img = await images[chart_section] if chart_section else {}
+                await in_thread(build, doc, agg, img)
+
+        await snapshot_task
+    return output_path
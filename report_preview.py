@@ -0,0 +1,86 @@
+"""
+Draft preview of selected parts of the report.
+
+Renders only the chosen DOCX sections and/or charts, at low resolution and without the tight
+bounding box, from the aggregates cached in the snapshot (report_snapshot.py), into a separate
+preview document. The report itself and its images are left untouched.
+
+    python generate_report.py --sections pre_amenities
+    python generate_report.py --sections cross,summary
+
+A section name (pre, text, pre_summary, after, cross, summary, ...) previews the whole section
+with all of its charts. A chart name previews the section the chart belongs to, with only the
+selected charts drawn, so a caption and its chart can be iterated on in well under a second.
+"""
+
+import os
+import time
+
+import report_charts
+from report_charts import CHARTS, DRAFT_OUTPUT, FINAL_OUTPUT, PREVIEW_IMG_DIR
+from report_docx import SECTIONS
+from report_docx_stream import StreamDocument
+from report_snapshot import load_snapshot
+
+PREVIEW_PATH = os.path.join(PREVIEW_IMG_DIR, 'preview.docx')
+
+# Chart section -> the DOCX section that shows its charts
+CHART_SECTIONS = {chart_section: name for name, (_, chart_section) in SECTIONS.items() if chart_section}
+
+
+class PreviewDocument(StreamDocument):
+    """A streaming document that leaves out the charts which were not rendered for the preview."""
+
+    def add_chart(self, img_path, *args, **kwargs):
+        if img_path is not None:
+            super().add_chart(img_path, *args, **kwargs)
+
+
+def parse_selection(selection):
+    """'pre,after_help' or ['pre', 'after_help'] -> list of section / chart names."""
+    if isinstance(selection, str):
+        selection = [selection]
+    return [name.strip() for part in selection for name in part.split(',') if name.strip()]
+
+
+def resolve(selection):
+    """The DOCX sections (in document order) and the charts a selection covers."""
+    names = parse_selection(selection)
+    unknown = [name for name in names if name not in SECTIONS and name not in CHARTS]
+    if unknown:
+        raise ValueError(f"Unknown section or chart: {', '.join(unknown)}. "
+                         f"Sections: {', '.join(SECTIONS)}. Charts: {', '.join(CHARTS)}")
+    charts = set()
+    sections = set()
+    for name in names:
+        if name in SECTIONS:
+            sections.add(name)
+            chart_section = SECTIONS[name][1]
+            charts.update(report_charts.charts_for(chart_section) if chart_section else [])
+        else:
+            sections.add(CHART_SECTIONS[CHARTS[name][0]])
+            charts.add(name)
+    return [name for name in SECTIONS if name in sections], [name for name in CHARTS if name in charts]
+
+
+def preview(selection, output_path=PREVIEW_PATH, log=print):
+    start = time.perf_counter()
+    sections, charts = resolve(selection)
+    # Cached, and rebuilt only when the CSVs or the data code changed since the last build
+    agg = load_snapshot().agg
+
+    report_charts.set_output(DRAFT_OUTPUT)
+    try:
+        img = {name: report_charts.render_chart(name, agg) for name in charts}
+    finally:
+        report_charts.set_output(FINAL_OUTPUT)
+
+    img = {name: img.get(name) for name in CHARTS}
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with PreviewDocument(output_path) as doc:
+        for name in sections:
+            SECTIONS[name][0](doc, agg, img)
+
+    if log:
+        log(f"Preview of {', '.join(sections)} ({len(charts)} charts) in {time.perf_counter() - start:.2f}s")
+    return output_path
@@ -0,0 +1,170 @@
+"""
+Versioned snapshot of the cleaned frames, derived features and aggregates behind the report.
+
+generate_report.py writes it on every build; the analysis notebooks load it with one call:
+
+    from report_snapshot import load_snapshot
+    snap = load_snapshot()
+    snap.pre_data, snap.after_data, snap.pre_hs, snap['missed_counts']
+
+Numeric columns are stored as .npy files and memory-mapped on read, everything else
+is pickled. Nothing is read from disk until it is first accessed.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from datetime import datetime
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+import report_answers
+import report_backend
+import report_compare
+import report_data
+import report_model
+import report_store
+import report_text
+import report_weights
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_DIR = os.path.join(report_data.BASE, '_report_snapshot')
+FRAMES = ['pre_data', 'after_data']
+
+
+def source_fingerprint(paths=None):
+    # The exports of every wave and the canonicalization/cleaning/aggregation/text code decide what the snapshot contains
+    h = hashlib.sha256()
+    for path in [*(paths or report_store.source_files()), report_answers.__file__, report_backend.__file__,
+                 report_data.__file__, report_store.__file__, report_weights.__file__, report_compare.__file__,
+                 report_model.__file__, report_text.__file__]:
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def _write_frame(df, frame_dir):
+    os.makedirs(frame_dir)
+    columns = []
+    objects = {}
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biuf':
+            file = f'{i:03d}.npy'
+            np.save(os.path.join(frame_dir, file), values.to_numpy())
+        else:
+            file = None
+            objects[col] = values
+        columns.append({'name': col, 'file': file})
+    with open(os.path.join(frame_dir, 'objects.pkl'), 'wb') as f:
+        pickle.dump({'index': df.index, 'columns': objects}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return {'rows': len(df), 'columns': columns}
+
+
+def write_snapshot(pre_data, after_data, agg, path=SNAPSHOT_DIR, fingerprint=None):
+    """Write frames and aggregates to path/v<SNAPSHOT_VERSION>, replacing an older snapshot."""
+    target = os.path.join(path, f'v{SNAPSHOT_VERSION}')
+    tmp = target + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    manifest = {
+        'version': SNAPSHOT_VERSION,
+        'fingerprint': fingerprint or source_fingerprint(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'frames': {},
+    }
+    for name, df in zip(FRAMES, [pre_data, after_data]):
+        # Stored as pandas whichever backend loaded them, so the notebooks read the same frames
+        manifest['frames'][name] = _write_frame(report_backend.to_pandas(df), os.path.join(tmp, name))
+    with open(os.path.join(tmp, 'aggregates.pkl'), 'wb') as f:
+        pickle.dump(agg, f, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(tmp, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    return target
+
+
+class Snapshot:
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+
+    @property
+    def version(self):
+        return self.manifest['version']
+
+    @property
+    def fingerprint(self):
+        return self.manifest['fingerprint']
+
+    def _read_frame(self, name):
+        frame_dir = os.path.join(self.path, name)
+        with open(os.path.join(frame_dir, 'objects.pkl'), 'rb') as f:
+            stored = pickle.load(f)
+        data = {}
+        for col in self.manifest['frames'][name]['columns']:
+            if col['file'] is None:
+                data[col['name']] = stored['columns'][col['name']]
+            else:
+                data[col['name']] = np.load(os.path.join(frame_dir, col['file']), mmap_mode='r')
+        return pd.DataFrame(data, index=stored['index'], copy=False)
+
+    @cached_property
+    def pre_data(self):
+        return self._read_frame('pre_data')
+
+    @cached_property
+    def after_data(self):
+        return self._read_frame('after_data')
+
+    @cached_property
+    def pre_hs(self):
+        return report_data.high_school_only(self.pre_data)
+
+    @cached_property
+    def agg(self):
+        with open(os.path.join(self.path, 'aggregates.pkl'), 'rb') as f:
+            return pickle.load(f)
+
+    def __getitem__(self, key):
+        return self.agg[key]
+
+    def keys(self):
+        return self.agg.keys()
+
+
+def _read_manifest(target):
+    try:
+        with open(os.path.join(target, 'manifest.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def build_snapshot(path=SNAPSHOT_DIR):
+    pre_data, after_data = report_store.load_data()
+    agg = report_data.compute_aggregates(pre_data, after_data)
+    agg.update(report_text.compute_text_aggregates(pre_data))
+    return write_snapshot(pre_data, after_data, agg, path)
+
+
+def load_snapshot(path=SNAPSHOT_DIR, rebuild=True):
+    """
+    Open the current snapshot. When it is missing or older than the CSVs / report_data.py / report_text.py
+    it is rebuilt first (or FileNotFoundError is raised with rebuild=False).
+    """
+    target = os.path.join(path, f'v{SNAPSHOT_VERSION}')
+    manifest = _read_manifest(target)
+    if manifest is None or manifest['fingerprint'] != source_fingerprint():
+        if not rebuild:
+            raise FileNotFoundError(f'No up-to-date snapshot in {target}, run generate_report.py')
+        build_snapshot(path)
+        manifest = _read_manifest(target)
+    return Snapshot(target, manifest)
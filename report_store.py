@@ -0,0 +1,486 @@
+"""
+Append-only survey store: the responses of every wave, tagged with their school, wave and form
+timestamp, read back by any (wave range, school, date range) slice.
+
+    python report_store.py                                  # sync the store and list its segments
+    python report_store.py --waves 1-2 --school 'Základná škola' --since 2025-04-01
+
+The waves and the CSV exports of each are declared in report_data.waves. Every build syncs the
+store first: an export whose size and modification time are unchanged is not read at all, a
+changed one is parsed once and only its new and edited responses are appended. The report frames
+(report_data.report_waves) are then read from the store instead of the CSVs. The open answers of
+the pre-installation form (report_text.TEXT_QUESTIONS) are stored with the rest of each response,
+so the text aggregates are read from the store as well.
+
+STORE_DIR/v<STORE_VERSION>/
+  segments/<n>.arrow   rows appended for one (wave, school), Arrow IPC; never rewritten
+  index-<n>.arrow      one row per live response: key, wave, school, time, seq, segment, hash, source
+  manifest.json        sources, schema versions, segments and the current index
+  sync.lock            held exclusively for the whole of a sync
+
+A response is identified within its export by its 'Timestamp' (a repeated timestamp is numbered).
+When a later export changes its answers, it is appended again and the index points to the new
+copy; when a later export of the same source no longer has it, it is dropped from the index. The
+segments keep every version. A sync writes new segments and a new index first and commits them by
+replacing manifest.json, so a reader never sees half a sync. Two syncs never run at once: the
+second waits for the lock and then starts from the manifest the first committed. The index a
+commit replaces is kept, so a reader that opened the previous manifest can still read it; older
+ones are deleted by later commits, and a reader that lost that race opens the manifest again.
+
+Each questionnaire form has schema versions: an export with a new column list (a question added,
+dropped or reworded) gets the next version of its form. A read across versions has the columns
+of the newest one followed by those only older ones had; answers a version did not ask are empty.
+
+A read filters the memory-mapped index by wave, school and time and opens only the segments that
+hold the selected responses. Rows come back in the order they were appended, so the first export
+of a wave reads back in its CSV order.
+"""
+
+import argparse
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import report_data
+from report_answers import canonicalize
+from report_backend import get_backend
+from report_text import TEXT_QUESTIONS
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+STORE_VERSION = 2
+STORE_DIR = os.path.join(report_data.BASE, '_report_store')
+KEY = 'Timestamp'
+TIME_FORMAT = '%d.%m.%Y %H:%M:%S'
+# Append position of each stored row
+SEQ = '_seq'
+# Open answers each form keeps next to its cleaned columns (the after form's open question is one of them already)
+TEXT_COLUMNS = {'pre': list(TEXT_QUESTIONS.values()), 'after': []}
+LOCK_NAME = 'sync.lock'
+# How often a reader opens the manifest again when a newer commit deleted the index it named
+READ_RETRIES = 5
+
+INDEX_SCHEMA = pa.schema([
+    ('key', pa.string()),
+    ('wave', pa.int32()),
+    ('school', pa.string()),
+    ('time', pa.timestamp('s')),
+    ('seq', pa.int64()),
+    ('segment', pa.int32()),
+    ('hash', pa.uint64()),
+    ('source', pa.int32()),
+])
+
+
+def source_files():
+    """Every CSV export of report_data.waves."""
+    return [path for _, paths in report_data.waves.values() for path in paths]
+
+
+def loader(form):
+    return {'pre': report_data.load_pre, 'after': report_data.load_after}[form]
+
+
+def read_export(path, form):
+    """The cleaned responses of one export, followed by the open answers of its form as stripped text."""
+    df = loader(form)(path, backend='pandas')
+    if not TEXT_COLUMNS[form]:
+        return df
+    text = pd.read_csv(path, usecols=TEXT_COLUMNS[form], dtype=str)
+    return pd.concat([df, text[TEXT_COLUMNS[form]].apply(lambda s: s.str.strip())], axis=1)
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _write_arrow(table, path):
+    # Uncompressed, so reads can use the buffers straight from the memory map
+    tmp = path + '.tmp'
+    with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _read_arrow(path):
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+
+@contextmanager
+def sync_lock(path):
+    """Holds the store's lock file exclusively, waiting while another process has it."""
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, LOCK_NAME), 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            while True:
+                f.seek(0)
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ten seconds
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# ═══════════════════════════════════════════
+# RESPONSES
+# ═══════════════════════════════════════════
+
+def response_keys(df):
+    """KEY of every row, a timestamp repeated within the export numbered '#2', '#3', ..."""
+    if KEY not in df.columns:
+        raise ValueError(f'The export has no {KEY!r} column to identify its responses')
+    stamps = df[KEY].astype(str)
+    repeat = stamps.groupby(stamps, sort=False).cumcount().to_numpy()
+    return np.where(repeat == 0, stamps, stamps + '#' + (repeat + 1).astype(str)).astype(object)
+
+
+def response_hashes(df):
+    """
+    Hash of every row's answered questions, each answer hashed with its column name and the
+    hashes added up: a question added to the form later and left unanswered does not change it.
+    """
+    total = np.zeros(len(df), dtype=np.uint64)
+    for col in df.columns:
+        values = df[col]
+        name = pd.util.hash_array(np.array([col], dtype=object))[0]
+        h = pd.util.hash_pandas_object(values, index=False).to_numpy() ^ name
+        total += np.where(values.isna().to_numpy(), np.uint64(0), h)
+    return total
+
+
+def response_times(df):
+    return pd.to_datetime(df[KEY], format=TIME_FORMAT, errors='coerce')
+
+
+def response_schools(df):
+    """Canonical school answer of every row (None where missing)."""
+    if report_data.COL_SCHOOL not in df.columns:
+        return np.full(len(df), None, dtype=object)
+    labels = canonicalize(df, [report_data.COL_SCHOOL], warn=False).labels(report_data.COL_SCHOOL)
+    return labels.where(labels.notna(), None).to_numpy()
+
+
+def wave_range(waves):
+    """(first, last) of a wave number, a (first, last) pair or None for every wave."""
+    if waves is None:
+        return None
+    if isinstance(waves, (int, np.integer)):
+        return int(waves), int(waves)
+    first, last = waves
+    return int(first), int(last)
+
+
+def unify_types(tables):
+    """
+    Segments read together, with every column cast to one type. An export types each column on its
+    own, so an answer column nobody filled in reads as numbers in one and as text in another: empty
+    columns take the type the others have, and text wins over numbers.
+    """
+    types = {}
+    for table in tables:
+        for field in table.schema:
+            if table[field.name].null_count < len(table):
+                types.setdefault(field.name, set()).add(field.type)
+    targets = {}
+    for name, found in types.items():
+        if len(found) == 1:
+            targets[name] = found.pop()
+        elif any(pa.types.is_large_string(t) or pa.types.is_string(t) for t in found):
+            targets[name] = pa.large_string()
+    unified = []
+    for table in tables:
+        for i, field in enumerate(table.schema):
+            target = targets.get(field.name)
+            if target is not None and field.type != target:
+                table = table.set_column(i, field.name, table[field.name].cast(target))
+        unified.append(table)
+    return unified
+
+
+def parse_waves(text):
+    """'2' or '1-3' from the command line."""
+    first, _, last = text.partition('-')
+    return int(first), int(last or first)
+
+
+# ═══════════════════════════════════════════
+# STORE
+# ═══════════════════════════════════════════
+
+class Store:
+    def __init__(self, path=STORE_DIR, retries=READ_RETRIES):
+        self.path = os.path.join(path, f'v{STORE_VERSION}')
+        for attempt in range(retries + 1):
+            try:
+                self.manifest, self.index = self.open()
+                break
+            except FileNotFoundError:
+                # Two commits since the manifest was read: the index it names is gone
+                if attempt == retries:
+                    raise
+                time.sleep(0.05 * (attempt + 1))
+        self.changed = False
+
+    def open(self):
+        """(manifest, index) of the last commit."""
+        try:
+            with open(os.path.join(self.path, 'manifest.json'), encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            manifest = {'version': STORE_VERSION, 'created': _now(), 'commit': 0, 'index': None,
+                        'next_seq': 0, 'schemas': [], 'sources': [], 'segments': []}
+        if manifest['index'] is None:
+            return manifest, INDEX_SCHEMA.empty_table()
+        return manifest, _read_arrow(os.path.join(self.path, manifest['index']))
+
+    # ─── Write ───
+
+    def schema_id(self, form, columns):
+        """Position of the schema version of `form` with exactly `columns`, added if new."""
+        schemas = self.manifest['schemas']
+        for i, schema in enumerate(schemas):
+            if schema['form'] == form and schema['columns'] == columns:
+                return i
+        version = 1 + sum(schema['form'] == form for schema in schemas)
+        schemas.append({'form': form, 'version': version, 'columns': columns, 'created': _now()})
+        return len(schemas) - 1
+
+    def source_id(self, path, wave, form):
+        name = os.path.relpath(path, report_data.BASE)
+        sources = self.manifest['sources']
+        for i, source in enumerate(sources):
+            if source['path'] == name and source['wave'] == wave:
+                return i
+        sources.append({'path': name, 'wave': wave, 'form': form, 'stamp': None, 'rows': 0, 'ingested': None})
+        return len(sources) - 1
+
+    def append(self, rows, wave, form, source, keys, hashes):
+        """Write `rows` as one new segment per school and return their index rows."""
+        seq = self.manifest['next_seq'] + np.arange(len(rows), dtype=np.int64)
+        self.manifest['next_seq'] += len(rows)
+        schema = self.schema_id(form, list(rows.columns))
+        schools = response_schools(rows)
+        times = response_times(rows)
+        segment = np.empty(len(rows), dtype=np.int32)
+        os.makedirs(os.path.join(self.path, 'segments'), exist_ok=True)
+        for school in pd.unique(schools):
+            mask = schools == school
+            segment[mask] = len(self.manifest['segments'])
+            file = os.path.join('segments', f'{segment[mask][0]:06d}.arrow')
+            table = pa.Table.from_pandas(rows[mask], preserve_index=False).append_column(SEQ, pa.array(seq[mask]))
+            _write_arrow(table, os.path.join(self.path, file))
+            known = times[mask].dropna()
+            self.manifest['segments'].append({
+                'file': file, 'wave': wave, 'school': school, 'form': form, 'schema': schema,
+                'source': source, 'rows': int(mask.sum()),
+                'first': known.min().isoformat() if len(known) else None,
+                'last': known.max().isoformat() if len(known) else None,
+                'created': _now(),
+            })
+        return pa.table({
+            'key': pa.array(keys, pa.string()),
+            'wave': pa.array(np.full(len(rows), wave, dtype=np.int32)),
+            'school': pa.array(schools, pa.string()),
+            'time': pa.array(times.to_numpy(dtype='datetime64[s]'), pa.timestamp('s'), mask=times.isna().to_numpy()),
+            'seq': pa.array(seq),
+            'segment': pa.array(segment),
+            'hash': pa.array(hashes, pa.uint64()),
+            'source': pa.array(np.full(len(rows), source, dtype=np.int32)),
+        }, schema=INDEX_SCHEMA)
+
+    def ingest(self, path, wave, form):
+        """
+        Append the new and edited responses of one export and drop the ones it no longer has.
+        Returns {'added', 'edited', 'removed'} or None if the export is unchanged since the last sync.
+        """
+        source = self.source_id(path, wave, form)
+        entry = self.manifest['sources'][source]
+        # Stamped before reading, so an export rewritten meanwhile is read again next time
+        stamp = _stamp(path)
+        if entry['stamp'] == stamp:
+            return None
+        df = read_export(path, form)
+        keys = response_keys(df)
+        hashes = response_hashes(df)
+
+        mine = pc.equal(self.index['source'], source)
+        stored = self.index.filter(mine)
+        known = dict(zip(stored['key'].to_pylist(), stored['hash'].to_pylist()))
+        new = np.array([known.get(key) != int(h) for key, h in zip(keys, hashes)], dtype=bool)
+        exported = set(keys)
+        removed = [key for key in known if key not in exported]
+        replaced = pc.and_(mine, pc.is_in(self.index['key'], value_set=pa.array([*keys[new], *removed], pa.string())))
+
+        parts = [self.index.filter(pc.invert(replaced))]
+        if new.any():
+            parts.append(self.append(df[new], wave, form, source, keys[new], hashes[new]))
+        self.index = pa.concat_tables(parts)
+
+        entry.update(stamp=stamp, rows=len(df), ingested=_now())
+        self.changed = True
+        added = sum(key not in known for key in keys[new])
+        return {'added': added, 'edited': int(new.sum()) - added, 'removed': len(removed)}
+
+    def commit(self):
+        """
+        Make the synced segments and index visible by replacing manifest.json. The index it replaces
+        stays for readers of the previous manifest; the ones before it are deleted.
+        """
+        if not self.changed:
+            return
+        previous = self.manifest['index']
+        self.manifest['commit'] += 1
+        self.manifest['index'] = f"index-{self.manifest['commit']:06d}.arrow"
+        os.makedirs(self.path, exist_ok=True)
+        _write_arrow(self.index, os.path.join(self.path, self.manifest['index']))
+        tmp = os.path.join(self.path, 'manifest.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, os.path.join(self.path, 'manifest.json'))
+        for name in os.listdir(self.path):
+            if name.startswith('index-') and name not in (self.manifest['index'], previous):
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    # Still mapped by a reader (Windows); the next commit tries again
+                    pass
+        self.changed = False
+
+    # ─── Read ───
+
+    def select(self, waves=None, schools=None, since=None, until=None):
+        """Index rows of the live responses in the slice; `until` is inclusive, like `waves`."""
+        conditions = []
+        waves = wave_range(waves)
+        if waves is not None:
+            conditions += [pc.field('wave') >= waves[0], pc.field('wave') <= waves[1]]
+        if schools is not None:
+            schools = [schools] if isinstance(schools, str) else list(schools)
+            conditions.append(pc.field('school').isin(schools))
+        if since is not None:
+            conditions.append(pc.field('time') >= pa.scalar(pd.Timestamp(since).to_pydatetime(), pa.timestamp('s')))
+        if until is not None:
+            conditions.append(pc.field('time') <= pa.scalar(pd.Timestamp(until).to_pydatetime(), pa.timestamp('s')))
+        if not conditions:
+            return self.index
+        condition = conditions[0]
+        for other in conditions[1:]:
+            condition = condition & other
+        return self.index.filter(condition)
+
+    def columns(self, schemas):
+        """Columns of the newest of `schemas`, then those only older ones had."""
+        columns = {}
+        for i in sorted(schemas, reverse=True):
+            columns.update(dict.fromkeys(self.manifest['schemas'][i]['columns']))
+        return list(columns)
+
+    def read(self, waves=None, schools=None, since=None, until=None, backend=None):
+        """The responses of the slice as a frame of `backend`, in the order they were appended."""
+        selected = self.select(waves, schools, since, until)
+        segments = np.unique(selected['segment'].to_numpy()).tolist()
+        entries = [self.manifest['segments'][i] for i in segments]
+        forms = {entry['form'] for entry in entries}
+        if not entries:
+            waves = wave_range(waves)
+            forms = {form for wave, (form, _) in report_data.waves.items()
+                     if waves is None or waves[0] <= wave <= waves[1]}
+        if len(forms) > 1:
+            raise ValueError(f"Waves {waves} span different questionnaires ({', '.join(sorted(forms))}); "
+                             'read them separately')
+        if entries:
+            seqs = selected['seq']
+            tables = []
+            for entry in entries:
+                table = _read_arrow(os.path.join(self.path, entry['file']))
+                tables.append(table.filter(pc.is_in(table[SEQ], value_set=seqs)))
+            table = pa.concat_tables(unify_types(tables), promote_options='permissive').sort_by(SEQ)
+            table = table.select(self.columns({entry['schema'] for entry in entries}))
+        else:
+            schemas = [i for i, schema in enumerate(self.manifest['schemas']) if schema['form'] in forms]
+            table = pa.table({col: pa.nulls(0) for col in self.columns(schemas[-1:])})
+        return get_backend(backend).from_arrow(table)
+
+    def summary(self):
+        """Live responses per wave, school and schema version, with their first and last timestamps."""
+        segments = pd.DataFrame(self.manifest['segments'])
+        if not len(segments):
+            return pd.DataFrame(columns=['wave', 'school', 'schema', 'responses', 'first', 'last'])
+        index = self.index.select(['wave', 'school', 'segment', 'time']).to_pandas()
+        index['schema'] = [f"{s['form']} v{s['version']}" for s in
+                           (self.manifest['schemas'][i] for i in segments['schema'].to_numpy()[index['segment']])]
+        return (index.groupby(['wave', 'school', 'schema'], dropna=False, sort=True)['time']
+                .agg(responses='size', first='min', last='max').reset_index())
+
+
+def sync(path=STORE_DIR, log=None):
+    """
+    Ingest every changed export of report_data.waves under the store's lock; returns the path of
+    the manifest.
+    """
+    with sync_lock(os.path.join(path, f'v{STORE_VERSION}')):
+        store = Store(path)
+        for wave, (form, paths) in report_data.waves.items():
+            for source in paths:
+                result = store.ingest(source, wave, form)
+                if result is not None and log is not None:
+                    log(f"Wave {wave}, {os.path.basename(source)}: {result['added']} new, "
+                        f"{result['edited']} edited, {result['removed']} removed responses")
+        store.commit()
+    return os.path.join(store.path, 'manifest.json')
+
+
+def load_wave(form, backend=None, schools=None, path=STORE_DIR):
+    """The report's wave of questionnaire `form` (report_data.report_waves), from the synced store."""
+    return Store(path).read(report_data.report_waves[form], schools=schools, backend=backend)
+
+
+def load_data(backend=None, path=STORE_DIR):
+    """Like report_data.load_csv_data, but syncs the store and reads both waves, open answers included, from it."""
+    sync(path)
+    return (report_data.derive_pre(load_wave('pre', backend, path=path)),
+            report_data.derive_after(load_wave('after', backend, path=path)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sync the survey store and show a slice of it.')
+    parser.add_argument('--waves', type=parse_waves, default=None, help="a wave or a range, e.g. '2' or '1-3'")
+    parser.add_argument('--school', action='append', default=None, help='canonical school answer; repeatable')
+    parser.add_argument('--since', default=None, help='first form timestamp, e.g. 2025-04-01')
+    parser.add_argument('--until', default=None, help='last form timestamp')
+    args = parser.parse_args()
+
+    sync(log=print)
+    store = Store()
+    with pd.option_context('display.width', 160, 'display.max_columns', None):
+        print(store.summary().to_string(index=False))
+    if any(v is not None for v in [args.waves, args.school, args.since, args.until]):
+        frame = store.read(args.waves, args.school, args.since, args.until)
+        print(f'\nSlice: {len(frame)} responses, {len(frame.columns)} columns')
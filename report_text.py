@@ -0,0 +1,192 @@
+"""
+Analytics for the open-ended (free-text) questions of the pre-installation survey.
+
+Responses are streamed in chunks, from the CSV or from a frame that holds the free-text columns
+(the pre-installation wave read from report_store.py keeps them). Each chunk is lower-cased, split into phrases
+and tokens, folded to ASCII through the precompiled translation table shared with
+report_answers.py and lemmatized through a lookup dict, all with vectorized pandas string
+operations. Term and bigram counts are accumulated across chunks, so memory depends on the
+vocabulary size, not on the number of responses.
+
+The text aggregates describe the three open questions of the pre-installation questionnaire.
+The after-installation one has a single open question, 'Navrhuješ niečo zlepšiť v tomto
+projekte?', answered by a handful of respondents; it is not analysed here. It stays one of the
+after frame's columns, so the survey store keeps it and watch mode diffs it like any answer.
+"""
+
+from collections import Counter
+
+import pandas as pd
+
+from report_answers import FOLD_TABLE
+from report_backend import to_pandas
+from report_data import PRE_CSV, COL_PRE_FEELINGS_TEXT, COL_PRE_GYN_TEXT, COL_PRE_COMMENTS_TEXT
+
+TEXT_QUESTIONS = {
+    'feelings': COL_PRE_FEELINGS_TEXT,
+    'gyn_sources': COL_PRE_GYN_TEXT,
+    'comments': COL_PRE_COMMENTS_TEXT,
+}
+
+CHUNKSIZE = 10_000
+TOP_TERMS = 15
+TOP_BIGRAMS = 10
+
+# ─── Precompiled tables ───
+PHRASE_SPLIT = r'[,.;:!?()\n/]+'
+TOKEN_PATTERN = r'[^\W\d_]+'
+
+# Spacing accents that exports sometimes leave in front of a letter ('ˇŽe')
+SURFACE_TABLE = str.maketrans('', '', 'ˇ´`˘˙¨')
+
+# Function words, already folded
+STOPWORDS = frozenset('''
+a aj ak ako ale alebo ani atd az by bo co do ho i ich ja je jej ju k kde ked ktore ktory
+len ma mam me mi mna na nas ne nej nich nim no o od po pre pri s sa si sme som su ta tak
+tam to tom tu uz v vo vsak z za ze zo my mali byt bola bolo
+nie nic mame nemam nemame ziadne ziadny ziadna ziadnu preco krat iba este tiez velmi moc
+'''.split())
+
+# Inflected form -> lemma, both folded
+LEMMAS = {
+    'bolesti': 'bolest', 'bolestou': 'bolest', 'bolestami': 'bolest',
+    'brucha': 'brucho', 'bruchu': 'brucho', 'chrbta': 'chrbat', 'chrbte': 'chrbat',
+    'hlavy': 'hlava', 'hlave': 'hlava', 'hlavu': 'hlava',
+    'nervozna': 'nervozita', 'nervozny': 'nervozita', 'nervozitu': 'nervozita',
+    'nalady': 'nalada', 'nalad': 'nalada', 'naladu': 'nalada',
+    'smutna': 'smutny', 'smutne': 'smutny', 'nahnevana': 'nahnevany', 'nahnevane': 'nahnevany',
+    'spinava': 'spinavy', 'spinave': 'spinavy', 'zla': 'zly', 'zle': 'zly', 'zli': 'zly',
+    'sladke': 'sladky', 'sladka': 'sladky', 'nafuknute': 'nafuknuty', 'nafuknuta': 'nafuknuty',
+    'chute': 'chut', 'chuti': 'chut',
+    'emocie': 'emocia', 'emocii': 'emocia', 'pocity': 'pocit', 'pocitov': 'pocit', 'pocitmi': 'pocit',
+    'frustraciu': 'frustracia', 'agresiu': 'agresia', 'depresiu': 'depresia', 'depresie': 'depresia',
+    'uzkosti': 'uzkost', 'podrazenost': 'podrazdenost', 'podrazdenosti': 'podrazdenost',
+    'vykyvy': 'vykyv', 'krce': 'krc',
+    'mamy': 'mama', 'mame': 'mama', 'mamou': 'mama', 'mamu': 'mama',
+    'lekara': 'lekar', 'lekarovi': 'lekar', 'lekarom': 'lekar', 'lekarku': 'lekarka', 'lekarky': 'lekarka',
+    'internetu': 'internet', 'internete': 'internet',
+    'kamaratky': 'kamaratka', 'kamaratke': 'kamaratka', 'kamaratkou': 'kamaratka', 'kamaratov': 'kamarat',
+    'pomocky': 'pomocka', 'pomocok': 'pomocka', 'pomockami': 'pomocka', 'potreby': 'potreba',
+    'skole': 'skola', 'skoly': 'skola', 'skolu': 'skola', 'skolach': 'skola',
+    'menstruacie': 'menstruacia', 'menstruacii': 'menstruacia', 'menstruaciu': 'menstruacia',
+    'pripomienky': 'pripomienka', 'komentare': 'komentar', 'dostupne': 'dostupny', 'dostupna': 'dostupny',
+    'roka': 'rok', 'roku': 'rok',
+}
+
+# How a lemma is shown when respondents never wrote it in its base form
+LEMMA_LABELS = {
+    'bolest': 'bolesť', 'chrbat': 'chrbát', 'nalada': 'nálada', 'smutny': 'smutný', 'nahnevany': 'nahnevaný',
+    'spinavy': 'špinavý', 'zly': 'zlý', 'sladky': 'sladký', 'nafuknuty': 'nafuknutý', 'chut': 'chuť',
+    'emocia': 'emócia', 'frustracia': 'frustrácia', 'uzkost': 'úzkosť', 'podrazdenost': 'podráždenosť',
+    'vykyv': 'výkyv', 'krc': 'kŕč', 'lekar': 'lekár', 'lekarka': 'lekárka', 'kamaratka': 'kamarátka',
+    'kamarat': 'kamarát', 'pomocka': 'pomôcka', 'skola': 'škola', 'menstruacia': 'menštruácia',
+    'komentar': 'komentár', 'dostupny': 'dostupný',
+}
+
+
+def tokenize(series):
+    """
+    One row per kept token, indexed like `series`, with the folded lemma, the original
+    (lower-cased) surface form and a phrase id used to keep bigrams inside one phrase.
+    """
+    text = series.dropna().astype(str).str.lower().str.translate(SURFACE_TABLE)
+    phrases = text.str.split(PHRASE_SPLIT).explode()
+    phrases = phrases.reset_index().rename(columns={'index': 'response', phrases.name: 'phrase'})
+    phrases.index.name = 'phrase_id'
+    tokens = phrases['phrase'].str.findall(TOKEN_PATTERN).explode().dropna()
+    surface = tokens.astype(str)
+    folded = surface.str.translate(FOLD_TABLE)
+    keep = ~folded.isin(STOPWORDS) & (folded.str.len() > 1)
+    lemma = folded.map(LEMMAS).fillna(folded)
+    return pd.DataFrame({
+        'response': phrases['response'].reindex(tokens.index).to_numpy(),
+        'phrase_id': tokens.index.to_numpy(),
+        'lemma': lemma,
+        'surface': surface,
+    })[keep.to_numpy()].reset_index(drop=True)
+
+
+class TextStats:
+    """Streaming accumulator of term, document and bigram frequencies for one question."""
+
+    def __init__(self):
+        self.responses = 0
+        self.terms = Counter()
+        self.documents = Counter()
+        self.bigrams = Counter()
+        self.surfaces = Counter()
+
+    def update(self, series):
+        self.responses += int(series.notna().sum())
+        tok = tokenize(series)
+        if tok.empty:
+            return self
+        # Counted in order of first appearance, so ties rank the same however the stream is chunked or sharded
+        self.terms.update(tok['lemma'].value_counts(sort=False).to_dict())
+        self.documents.update(tok.drop_duplicates(['response', 'lemma'])['lemma'].value_counts(sort=False).to_dict())
+
+        nxt = tok.groupby('phrase_id')['lemma'].shift(-1)
+        pairs = (tok['lemma'] + ' ' + nxt).dropna()
+        self.bigrams.update(pairs.value_counts(sort=False).to_dict())
+
+        # A lemma is displayed the way respondents most often wrote it when it was already in base form
+        base = tok[tok['lemma'] == tok['surface'].str.translate(FOLD_TABLE)]
+        self.surfaces.update(Counter(zip(base['lemma'], base['surface'])))
+        return self
+
+    def __add__(self, other):
+        """Statistics of both streams together, as if `other` had been read after this one."""
+        merged = TextStats()
+        merged.responses = self.responses + other.responses
+        for name in ['terms', 'documents', 'bigrams', 'surfaces']:
+            counter = Counter(getattr(self, name))
+            counter.update(getattr(other, name))
+            setattr(merged, name, counter)
+        return merged
+
+    def summary(self, top_terms=TOP_TERMS, top_bigrams=TOP_BIGRAMS):
+        labels = {}
+        for (lemma, surface), n in self.surfaces.most_common():
+            labels.setdefault(lemma, surface)
+
+        def label(lemma):
+            return labels.get(lemma) or LEMMA_LABELS.get(lemma, lemma)
+
+        terms = pd.DataFrame(
+            [(label(l), self.documents[l], n) for l, n in self.terms.most_common()],
+            columns=['term', 'responses', 'count'],
+        ).sort_values(['responses', 'count'], ascending=False, kind='stable').head(top_terms)
+        bigrams = pd.Series({
+            ' '.join(label(w) for w in pair.split(' ')): n for pair, n in self.bigrams.most_common(top_bigrams)
+        }, dtype='int64')
+        return {
+            'responses': self.responses,
+            'terms': terms.set_index('term'),
+            'bigrams': bigrams,
+        }
+
+
+def iter_text_chunks(source=PRE_CSV, chunksize=CHUNKSIZE):
+    """The free-text columns in chunks, from a CSV path or from a frame of any backend."""
+    columns = list(TEXT_QUESTIONS.values())
+    if isinstance(source, str):
+        yield from pd.read_csv(source, usecols=columns, chunksize=chunksize, dtype=str)
+        return
+    frame = to_pandas(source, columns)
+    for start in range(0, len(frame), chunksize):
+        yield frame.iloc[start:start + chunksize]
+
+
+def text_stats(source=PRE_CSV, chunksize=CHUNKSIZE):
+    """Streams the free-text columns of the CSV or frame: {question: TextStats}."""
+    stats = {key: TextStats() for key in TEXT_QUESTIONS}
+    for chunk in iter_text_chunks(source, chunksize):
+        for key, col in TEXT_QUESTIONS.items():
+            # A column nobody answered reads back from the store without a text type
+            stats[key].update(chunk[col].astype(object).str.strip())
+    return stats
+
+
+def compute_text_aggregates(source=PRE_CSV, chunksize=CHUNKSIZE):
+    """{'text': {question: summary}} of the free-text columns of the CSV or frame."""
+    return {'text': {key: s.summary() for key, s in text_stats(source, chunksize).items()}}
@@ -0,0 +1,187 @@
+"""
+Watch mode: rebuild the report whenever the CSV exports or the report code change.
+
+    python generate_report.py --watch
+
+Both CSVs and the report modules (answer scales, column lists, captions, charts, ...) are
+polled. A burst of changes, such as a re-export written in several chunks, is debounced into a
+single rebuild. A changed CSV is diffed row by row against the previous export, open answers
+included, keyed on the form timestamp the way the survey store keys it (report_store.py), to
+list the new, removed and edited responses and the questions they touch. An export that changes
+no answer triggers no rebuild at all.
+
+The rebuild itself is the incremental build (report_build.py): aggregates are recomputed, but
+only the charts whose aggregates changed are re-rendered, and the DOCX is rewritten in place.
+The process stays warm in between: pandas and matplotlib stay imported, the build outputs stay
+in memory, and edited report modules are reloaded rather than the process restarted.
+"""
+
+import importlib
+import os
+import sys
+import time
+import traceback
+
+import pandas as pd
+
+import report_build
+import report_data
+import report_store
+
+# Report modules in dependency order, so a reload sees the already reloaded modules it imports
+CONFIG_MODULES = [
+    'report_backend', 'report_answers', 'report_weights', 'report_compare', 'report_model', 'report_data',
+    'report_store', 'report_text', 'report_snapshot', 'report_export', 'report_charts', 'report_captions',
+    'report_docx', 'report_docx_stream', 'report_pipeline', 'report_build',
+]
+
+POLL_INTERVAL = 0.5
+# Seconds the watched files must stay unchanged before a rebuild starts
+DEBOUNCE = 1.0
+
+
+def watched_files():
+    csvs = {'pre': report_data.PRE_CSV, 'after': report_data.AFTER_CSV}
+    modules = {name: sys.modules[name].__file__ for name in CONFIG_MODULES if name in sys.modules}
+    return csvs, modules
+
+
+def file_stamps(paths):
+    stamps = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamps[path] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamps[path] = None
+    return stamps
+
+
+def wait_for_changes(stamps, interval=POLL_INTERVAL, debounce=DEBOUNCE):
+    """Blocks until some file changed and then stayed unchanged for `debounce` seconds."""
+    while True:
+        time.sleep(interval)
+        current = file_stamps(stamps)
+        if current != stamps:
+            break
+    settled = time.monotonic()
+    while time.monotonic() - settled < debounce:
+        time.sleep(interval)
+        latest = file_stamps(stamps)
+        if latest != current:
+            current, settled = latest, time.monotonic()
+    return current, [path for path in stamps if current[path] != stamps[path]]
+
+
+# ═══════════════════════════════════════════
+# ROW DIFF
+# ═══════════════════════════════════════════
+
+def _keyed(old, new):
+    """
+    Both exports indexed the same way: by report_store.response_keys (the form timestamp, a
+    repeated one numbered), or by position if either export has no timestamps.
+    """
+    key = report_store.KEY
+    if key in old.columns and key in new.columns:
+        return tuple(df.drop(columns=key).set_index(pd.Index(report_store.response_keys(df), name=key))
+                     for df in (old, new))
+    return old.reset_index(drop=True), new.reset_index(drop=True)
+
+
+def diff_rows(old, new):
+    """
+    New, removed and edited responses between two exports of one form, and the questions
+    (columns) whose answers differ: {'added': n, 'removed': n, 'changed': n, 'questions': [...]}.
+    """
+    old, new = _keyed(old, new)
+    added = new.index.difference(old.index)
+    removed = old.index.difference(new.index)
+    common = new.index.intersection(old.index)
+    columns = new.columns.intersection(old.columns, sort=False)
+
+    a = old.loc[common, columns]
+    b = new.loc[common, columns]
+    differs = ~((a == b) | (a.isna() & b.isna()))
+
+    questions = set(new.columns.symmetric_difference(old.columns))
+    questions.update(columns[differs.any().to_numpy()])
+    questions.update(new.columns[new.loc[added].notna().any().to_numpy()])
+    questions.update(old.columns[old.loc[removed].notna().any().to_numpy()])
+    return {
+        'added': len(added),
+        'removed': len(removed),
+        'changed': int(differs.any(axis=1).sum()),
+        'questions': [col for col in dict.fromkeys([*new.columns, *old.columns]) if col in questions],
+    }
+
+
+def describe(wave, diff):
+    text = f"{wave}: {diff['added']} new, {diff['removed']} removed, {diff['changed']} edited responses"
+    if diff['questions']:
+        shown = diff['questions'][:8]
+        more = len(diff['questions']) - len(shown)
+        text += '; changed questions: ' + ', '.join(shown) + (f' (+{more} more)' if more > 0 else '')
+    return text
+
+
+# ═══════════════════════════════════════════
+# WATCH LOOP
+# ═══════════════════════════════════════════
+
+def load_frames():
+    # As the store ingests them: the cleaned answers and the open ones
+    return {form: report_store.read_export(path, form)
+            for form, path in [('pre', report_data.PRE_CSV), ('after', report_data.AFTER_CSV)]}
+
+
+def reload_modules():
+    # Reloading report_backend resets the backend to its default; the one chosen with --backend is kept
+    backend = sys.modules['report_backend'].CURRENT['backend']
+    for name in CONFIG_MODULES:
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+    sys.modules['report_backend'].set_backend(backend)
+
+
+def rebuild(output_path, memo, log=print):
+    start = time.perf_counter()
+    report_build.build(output_path, memo=memo, log=log)
+    log(f'Report updated in {time.perf_counter() - start:.2f}s: {os.path.abspath(output_path)}')
+
+
+def watch(output_path, interval=POLL_INTERVAL, debounce=DEBOUNCE, log=print):
+    memo = {}
+    frames = load_frames()
+    rebuild(output_path, memo, log)
+
+    csvs, modules = watched_files()
+    stamps = file_stamps([*csvs.values(), *modules.values()])
+    log(f'Watching {len(csvs)} CSV exports and {len(modules)} report modules, Ctrl+C to stop')
+
+    while True:
+        stamps, changed = wait_for_changes(stamps, interval, debounce)
+        try:
+            code_changed = [name for name, path in modules.items() if path in changed]
+            if code_changed:
+                log('Code changed: ' + ', '.join(code_changed))
+                reload_modules()
+
+            answers_changed = False
+            if any(path in changed for path in csvs.values()):
+                new_frames = load_frames()
+                for wave in frames:
+                    if csvs[wave] in changed:
+                        diff = diff_rows(frames[wave], new_frames[wave])
+                        log(describe(wave, diff))
+                        answers_changed |= bool(diff['questions'])
+                frames = new_frames
+
+            if code_changed or answers_changed:
+                rebuild(output_path, memo, log)
+            else:
+                log('No answers changed, report left as it is')
+        except Exception:
+            # A half-written export or a typo in a module must not end the session
+            traceback.print_exc()
+            log('Build failed, waiting for the next change')
@@ -0,0 +1,160 @@
+"""
+Survey weights for comparing the pre- and after-installation waves.
+
+The pre wave covers a primary and a secondary school, the after wave only the secondary school,
+and the two also differ in age and grade mix. Each wave is raked (iterative proportional fitting)
+to common margins: age band, school type and grade. The targets are the pooled shares over the
+categories both waves contain. Respondents outside that common support get weight 0, and the
+rest are reweighted so that both waves have the same structure.
+
+The report weights the outcomes it compares across the waves (report_data.matched_questions, via
+report_compare.compare_waves) and draws a weighted chart of each. Answers.counts, labelled_sums
+and group_means of report_data take the same weights; the per-wave tables and charts stay
+unweighted descriptions of who answered.
+
+Raking is plain NumPy: one weighted bincount and one gather per margin and sweep. Many groups
+(e.g. one per school) are raked at once by offsetting their category codes.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from report_answers import MISSING, canonicalize, encode, SCALES
+from report_backend import to_pandas
+
+COL_SCHOOL = 'Škola'
+COL_AGE = 'Vek'
+COL_GRADE = 'Ročník'
+
+MARGINS = ['age_band', 'school', 'grade']
+GRADES = list(range(1, 10))
+# Upper ages of the bands in SCALES['age_band'], for the exact ages of the pre form
+AGE_BAND_EDGES = [-np.inf, 15, 18, np.inf]
+
+TOLERANCE = 1e-6
+MAX_ITER = 200
+
+
+# ═══════════════════════════════════════════
+# MARGINS
+# ═══════════════════════════════════════════
+
+def age_band_codes(age):
+    if pd.api.types.is_numeric_dtype(age):
+        bands = pd.cut(age, AGE_BAND_EDGES, labels=False)
+        return np.where(bands.isna(), MISSING, bands.fillna(0)).astype(np.int8)
+    return encode(age, 'age_band')
+
+
+def grade_codes(grade):
+    grade = pd.to_numeric(grade, errors='coerce')
+    known = grade.isin(GRADES).to_numpy()
+    return np.where(known, grade.fillna(1).to_numpy() - 1, MISSING).astype(np.int8)
+
+
+def margin_codes(df):
+    """(rows, margins) codes of age band, school type and grade; -1 where unknown."""
+    num = to_pandas(df, [COL_AGE, COL_GRADE])
+    return np.column_stack([
+        age_band_codes(num[COL_AGE]),
+        canonicalize(df, [COL_SCHOOL]).codes[COL_SCHOOL].to_numpy(),
+        grade_codes(num[COL_GRADE]),
+    ])
+
+
+def margin_sizes():
+    return [len(SCALES['age_band']), len(SCALES['school']), len(GRADES)]
+
+
+def common_targets(*waves, sizes=None, counts=None):
+    """
+    Pooled shares of each margin over the categories present in every wave. With `counts` (one
+    array per wave), each row of codes stands for that many respondents.
+    """
+    sizes = sizes or margin_sizes()
+    counts = counts or [None] * len(waves)
+    targets = []
+    for j, k in enumerate(sizes):
+        totals = []
+        for c, n in zip(waves, counts):
+            known = c[:, j] >= 0
+            totals.append(np.bincount(c[known, j], weights=None if n is None else n[known], minlength=k))
+        totals = np.array(totals, dtype=float)
+        pooled = np.where((totals > 0).all(axis=0), totals.sum(axis=0), 0)
+        targets.append(pooled / pooled.sum())
+    return targets
+
+
+# ═══════════════════════════════════════════
+# RAKING
+# ═══════════════════════════════════════════
+
+def rake(codes, targets, groups=None, base=None, tol=TOLERANCE, max_iter=MAX_ITER):
+    """
+    Weights whose margins match `targets`, one weight per row of `codes`.
+
+    codes    (rows, margins) int array, -1 where a row's category is unknown
+    targets  one array of shares per margin, (categories,) or (groups, categories)
+    groups   optional (rows,) group ids 0..G-1; each group is raked to its own targets
+    base     optional design weights to start from
+
+    Rows with an unknown category keep their weight on that margin. Target categories a group has
+    no respondents in are dropped and the remaining shares rescaled, so every group can converge.
+    Weights are scaled to sum to the number of rows with a non-zero weight in each group.
+    """
+    codes = np.asarray(codes)
+    n = len(codes)
+    groups = np.zeros(n, dtype=np.intp) if groups is None else np.asarray(groups, dtype=np.intp)
+    n_groups = int(groups.max()) + 1 if n else 0
+    w = np.ones(n) if base is None else np.asarray(base, dtype=float).copy()
+
+    margins = []
+    for j, target in enumerate(targets):
+        target = np.asarray(target, dtype=float)
+        k = target.shape[-1]
+        known = codes[:, j] >= 0
+        cell = groups[known] * k + codes[known, j]
+        present = np.bincount(cell, weights=w[known], minlength=n_groups * k).reshape(n_groups, k) > 0
+        target = np.where(present, np.broadcast_to(target, (n_groups, k)), 0.0)
+        total = target.sum(axis=1, keepdims=True)
+        target = np.divide(target, total, out=np.zeros_like(target), where=total > 0)
+        margins.append((known, cell, target, k))
+
+    for _ in range(max_iter):
+        worst = 0.0
+        for known, cell, target, k in margins:
+            totals = np.bincount(cell, weights=w[known], minlength=n_groups * k).reshape(n_groups, k)
+            mass = totals.sum(axis=1, keepdims=True)
+            shares = np.divide(totals, mass, out=np.zeros_like(totals), where=mass > 0)
+            worst = max(worst, np.abs(shares - target).max(initial=0.0))
+            factor = np.divide(target * mass, totals, out=np.ones_like(totals), where=totals > 0)
+            w[known] *= factor.ravel()[cell]
+        if worst < tol:
+            break
+    else:
+        warnings.warn(f'Raking did not converge in {max_iter} sweeps (largest margin error {worst:.2g})', stacklevel=2)
+
+    kept = np.bincount(groups, weights=(w > 0), minlength=n_groups)
+    mass = np.bincount(groups, weights=w, minlength=n_groups)
+    scale = np.divide(kept, mass, out=np.zeros_like(mass), where=mass > 0)
+    return w * scale[groups]
+
+
+def wave_weights(pre_data, after_data):
+    """Raking weights of both waves to their common age band / school type / grade margins."""
+    pre, after = margin_codes(pre_data), margin_codes(after_data)
+    targets = common_targets(pre, after)
+    return rake(pre, targets), rake(after, targets)
+
+
+# ═══════════════════════════════════════════
+# EFFECTIVE SAMPLE SIZE
+# ═══════════════════════════════════════════
+
+def effective_size(weights):
+    """Kish effective sample size."""
+    weights = np.asarray(weights, dtype=float)
+    return weights.sum() ** 2 / (weights ** 2).sum()
+
@@ -0,0 +1,61 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from report_answers import MISSING, canonicalize, encode
+
+COL_SCHOOL = 'Škola'
+COL_MISSED = 'Vynechali ste niekedy školu kvôli menštruácii?'
+
+
+def frame():
+    return pd.DataFrame({
+        COL_SCHOOL: ['Strednú odbornú školu s maturitou', 'základná  ŠKOLA', None, 'Stredná odborná škola bez maturity'],
+        COL_MISSED: ['Ano', 'nie', 'Nie', None],
+        'Vek': [16, 14, 17, 18],
+    })
+
+
+def test_spellings_and_aliases_map_to_one_code():
+    answers = canonicalize(frame())
+    assert list(answers.codes.columns) == [COL_SCHOOL, COL_MISSED]
+    assert list(answers[COL_SCHOOL]) == [1, 0, MISSING, 2]
+    assert list(answers.labels(COL_MISSED)[:3]) == ['Áno', 'Nie', 'Nie']
+    assert pd.isna(answers.labels(COL_MISSED).iloc[3])
+    assert answers.unmapped.empty
+
+
+def test_unmapped_answers_are_listed_and_warned_about():
+    df = frame()
+    df.loc[0, COL_MISSED] = 'možno'
+    with pytest.warns(UserWarning, match='možno'):
+        answers = canonicalize(df)
+    assert answers[COL_MISSED].iloc[0] == MISSING
+    assert answers.unmapped.loc[(COL_MISSED, 'možno')] == 1
+
+
+def test_counts_follow_value_counts():
+    answers = canonicalize(frame())
+    expected = answers.labels(COL_MISSED).value_counts()
+    pd.testing.assert_series_equal(answers.counts(COL_MISSED), expected, check_index_type=False, check_dtype=False)
+    shares = answers.counts(COL_MISSED, order=['Áno', 'Nie'], normalize=True)
+    assert list(shares.index) == ['Áno', 'Nie']
+    np.testing.assert_allclose(shares, [1 / 3, 2 / 3])
+    weighted = answers.counts(COL_MISSED, weights=[3, 1, 1, 5])
+    assert weighted['Áno'] == 3 and weighted['Nie'] == 2
+
+
+def test_encode_one_column():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        codes = encode(pd.Series(['Do 15 rokov', None, 'viac ako 18 rokov', '??']), 'age_band')
+    assert list(codes) == [0, MISSING, 2, MISSING]
+
+
+def test_polars_frame_gives_the_same_codes():
+    pl = pytest.importorskip('polars')
+    expected = canonicalize(frame()).codes
+    answers = canonicalize(pl.from_pandas(frame()))
+    np.testing.assert_array_equal(answers.codes.to_numpy(), expected.to_numpy())
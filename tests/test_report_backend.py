@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import report_data
+from report_backend import TEXT_DTYPE, get_backend, to_pandas
+from report_data import age_groups, sibling_groups
+
+
+def test_polars_text_columns_keep_missing_answers():
+    pl = pytest.importorskip('polars')
+    df = to_pandas(pl.DataFrame({'answer': ['Áno', None], 'n': [1, None]}))
+    assert df['answer'].dtype == TEXT_DTYPE
+    assert df['answer'].iloc[0] == 'Áno'
+    assert pd.isna(df['answer'].iloc[1])
+    assert 'None' not in set(df['answer'].dropna())
+
+
+def test_both_backends_load_the_same_frame():
+    pytest.importorskip('polars')
+    expected = report_data.load_after(backend='pandas')
+    loaded = to_pandas(report_data.load_after(backend='polars'))
+    pd.testing.assert_frame_equal(loaded, expected, check_dtype=False)
+    assert get_backend('polars').name == 'polars'
+
+
+def test_group_boundaries():
+    assert list(sibling_groups([0, 1, 2, 3, 5, np.nan])) == ['0', '1-2', '1-2', '3-4', '5+', None]
+    assert list(age_groups([12, 14, 15, 16, 17, 19, np.nan])) == ['12-13', '14-15', '14-15', '16-17', '16-17', '18-19', None]
@@ -0,0 +1,21 @@
+from report_bench import compare, format_report
+
+
+def baseline(**stages):
+    return {'stages': {name: {'seconds': s, 'peak_mb': 10.0} for name, s in stages.items()}}
+
+
+def current(**stages):
+    return {name: {'seconds': s, 'peak_mb': 10.0} for name, s in stages.items()}
+
+
+def test_slowdown_over_threshold_and_floor_fails():
+    rows = compare(baseline(load=1.0, derive=0.01), current(load=1.6, derive=0.04), threshold=0.5)
+    regressed = {(name, metric) for name, metric, *_, bad in rows if bad}
+    assert regressed == {('load', 'seconds')}
+
+
+def test_stage_missing_from_the_baseline_fails():
+    rows = compare(baseline(load=1.0), current(load=1.0, chart_new=0.2))
+    assert [row[5] for row in rows if row[0] == 'chart_new'] == [True, True]
+    assert 'not in the baseline' in format_report(rows, 0.5, 0.25)
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+import report_data
+from report_captions import NBSP, caption, group_extremes, lack_claim, plural, preposition_z, render, sk
+
+INFO = ['Nemala som žiadne informácie', 'Mala som len čiastočné informácie', 'Áno, mala som všetky potrebné informácie']
+
+
+def test_slovak_numbers():
+    assert sk(16.2437, '.2f') == '16,24'
+    assert sk(12345, ',d') == f'12{NBSP}345'
+    assert [plural(n, 'a', 'b', 'c') for n in [0, 1, 2, 4, 5, 21]] == ['c', 'a', 'b', 'b', 'c', 'c']
+    assert [preposition_z(n) for n in [4, 5, 17, 40, 79, 100, 263]] == ['zo', 'z', 'zo', 'zo', 'zo', 'zo', 'z']
+    assert render('{n:Z} {n:~respondentky|respondentiek|respondentiek}, {n:|žena|ženy|žien}', {'n': 3}) == \
+        'Z 3 respondentiek, 3 ženy'
+
+
+def test_info_age_leaves_out_groups_without_a_mean():
+    agg = {'mean_ages': pd.Series([11.7, np.nan, 12.5], index=INFO)}
+    text = caption(agg, 'pre_info_age')
+    assert 'nan' not in text
+    assert text.endswith('Priemerný vek prvej menštruácie bol 11,7 roka u tých bez informácií a 12,5 roka u plne '
+                         'informovaných.')
+    assert text.startswith('Respondentky, ktoré dostali menštruáciu skôr, mali k dispozícii menej informácií.')
+
+    # Without the fully informed group there is nothing to compare the claim against
+    agg = {'mean_ages': pd.Series([11.7, 12.0], index=INFO[:2])}
+    assert caption(agg, 'pre_info_age').startswith('Priemerný vek')
+    assert caption(agg, 'pre_summary_info_age') == ''
+
+
+def test_correlation_claims_need_a_clear_relationship():
+    empty = pd.Series(dtype=float)
+    agg = {'corr_age_lack': 0.03, 'corr_siblings_lack': -0.05, 'group_means_age': empty}
+    assert lack_claim(agg).startswith('Medzi nedostatkom vybaveností a vekom či počtom súrodencov sa nepotvrdil')
+    assert 'jasný vzťah sa teda nepotvrdil' in caption(agg, 'pre_age_amenities')
+
+    agg = {'corr_age_lack': -0.39, 'corr_siblings_lack': 0.05}
+    assert lack_claim(agg) == 'Mladšie respondentky majú väčší nedostatok vybaveností'
+
+    agg = {'corr_age_lack': np.nan, 'corr_siblings_lack': np.nan, 'group_means_age': empty}
+    assert lack_claim(agg) == ''
+    assert caption(agg, 'pre_age_amenities') == ''
+
+
+def test_group_notes_with_empty_groups():
+    assert group_extremes(pd.Series(dtype=float), ['0', '1-2']) is None
+    assert group_extremes(pd.Series([np.nan, 0.5], index=['0', '1-2']), ['0', '1-2']) is None
+
+    means = pd.Series([0.0, np.nan, 1.25], index=['0', '1-2', '5+'])
+    agg = {'corr_siblings_lack': 0.4, 'group_means': means}
+    assert caption(agg, 'pre_siblings_amenities') == (
+        'Bola zistená pozitívna korelácia 0,40 medzi počtom súrodencov a nedostatkom vybaveností. Respondentky s 5+ '
+        'súrodencami nemali v priemere 1,25 vybavenosti, zatiaľ čo respondentky bez súrodencov nemali žiadny nedostatok.')
+    agg = {'corr_siblings_lack': np.nan, 'group_means': pd.Series(dtype=float)}
+    assert caption(agg, 'pre_siblings_amenities') == ''
+
+
+def test_continue_caption_reports_the_counts():
+    counts = pd.Series([68, 11], index=['Áno', 'Je mi to jedno'])
+    agg = {'continue_proj': counts, 'future_proj': pd.Series([69], index=['Áno, určite']), 'num_after': 79}
+    text = caption(agg, 'after_continue')
+    assert text.endswith('13,9% odpovedalo, že je im to jedno.')
+    assert 'proti' not in text
+
+
+def test_model_caption_agrees_with_the_number_of_events():
+    pre_data, _ = report_data.load_csv_data()
+    agg = report_data.compute_pre_aggregates(pre_data)
+    for events, verb in [(1, 'vynechala'), (3, 'vynechali'), (80, 'vynechalo')]:
+        agg['model_fit'] = {**agg['model_fit'], 'events': events}
+        assert f'{events} z nich {verb} školu' in caption(agg, 'pre_model')
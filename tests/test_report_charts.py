@@ -0,0 +1,47 @@
+from collections import Counter
+
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+
+import report_charts
+import report_data
+from report_charts import CHARTS, DRAFT_OUTPUT, POOL, POOL_LIMIT, hbar_counts, render_chart, set_output
+from report_text import compute_text_aggregates
+
+
+@pytest.fixture(scope='module')
+def agg():
+    pre_data, after_data = report_data.load_csv_data()
+    agg = report_data.compute_aggregates(pre_data, after_data)
+    agg.update(compute_text_aggregates())
+    return agg
+
+
+@pytest.fixture
+def draft_output(tmp_path):
+    set_output({**DRAFT_OUTPUT, 'dir': str(tmp_path)})
+    yield
+    set_output(report_charts.FINAL_OUTPUT)
+
+
+def open_per_size():
+    return Counter(POOL.sizes[number] for number in plt.get_fignums())
+
+
+@pytest.mark.filterwarnings('ignore')
+def test_rendering_keeps_the_pool_bounded(agg, draft_output):
+    for _ in range(2):
+        for name in CHARTS:
+            render_chart(name, agg)
+            assert max(open_per_size().values()) <= POOL_LIMIT
+    assert set(plt.get_fignums()) <= set(POOL.sizes)
+
+
+def test_a_failing_chart_releases_its_figure(draft_output):
+    # A total that is not a number fails while the bars are labelled, after the figure was taken from the pool
+    for _ in range(POOL_LIMIT + 2):
+        with pytest.raises(TypeError):
+            hbar_counts('failing', pd.Series([3, 1], index=['Áno', 'Nie']), 'Chyba', total='79')
+    assert open_per_size()[(8, 5)] <= POOL_LIMIT
+    assert plt.get_fignums() == sorted(POOL.sizes)
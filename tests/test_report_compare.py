@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from report_compare import COLUMNS, SAMPLE_COLUMNS, compare_waves, comparison_tables, newcombe, sample_tables, wilson
+
+COL_MISSED_PRE = 'Vynechali ste niekedy školu kvôli menštruácii?'
+COL_MISSED_AFTER = 'Chýbala si niekedy v škole kvôli menštruácii?'
+OUTCOMES = {'absence': (COL_MISSED_PRE, COL_MISSED_AFTER, 'Áno', 'Chýbanie')}
+SAMPLE = {'school': ('Škola', 'Škola', 'Typ školy')}
+
+
+def test_wilson_known_values():
+    # Newcombe (1998), Statistics in Medicine 17, table I: 81/263 and the boundary cases
+    p, low, high = wilson([81, 0, 10], [263, 10, 10])
+    np.testing.assert_allclose(p, [81 / 263, 0, 1])
+    np.testing.assert_allclose(low, [0.2553, 0.0, 0.7225], atol=1e-4)
+    np.testing.assert_allclose(high, [0.3662, 0.2775, 1.0], atol=1e-4)
+    assert all(np.isnan(wilson(0, 0)))
+
+
+def test_newcombe_known_values():
+    # Newcombe (1998), Statistics in Medicine 17, method 10: 56/70 - 48/80 = 0.2 (0.0524, 0.3339)
+    change, low, high = newcombe(*wilson(48, 80), *wilson(56, 70))
+    assert np.isclose(change, 0.2)
+    assert np.isclose(low, 0.0524, atol=1e-4)
+    assert np.isclose(high, 0.3339, atol=1e-4)
+
+
+def test_comparison_tables_from_flat_counts():
+    # Scale yes_no: Áno, Nie, Niekedy, Nechcem odpovedať
+    (table,) = comparison_tables(OUTCOMES, [48, 32, 0, 0], [56, 14, 0, 0]).values()
+    assert list(table.columns) == COLUMNS
+    assert list(table.index) == ['Áno', 'Nie']
+    row = table.loc['Áno']
+    assert (row['pre_n'], row['post_n']) == (48, 56)
+    assert np.isclose(row['change'], 20.0)
+    assert np.isclose(row['change_low'], 5.24, atol=1e-2)
+    assert np.isclose(row['change_high'], 33.39, atol=1e-2)
+
+
+def test_unknown_focus_is_refused():
+    with pytest.raises(ValueError, match='not one of its answers'):
+        comparison_tables({'absence': (COL_MISSED_PRE, COL_MISSED_AFTER, 'Možno', 'Chýbanie')}, [1, 1, 0, 0], [1, 1, 0, 0])
+
+
+def test_sample_tables_describe_each_wave_without_change():
+    table = sample_tables(SAMPLE, [38, 78, 17], [0, 68, 9])['school']
+    assert list(table.columns) == SAMPLE_COLUMNS
+    assert list(table['pre_n']) == [38, 78, 17] and list(table['post_n']) == [0, 68, 9]
+    np.testing.assert_allclose(table['pre'], [100 * 38 / 133, 100 * 78 / 133, 100 * 17 / 133])
+    np.testing.assert_allclose(table['post'], [0, 100 * 68 / 77, 100 * 9 / 77])
+    assert table.index.name == 'school'
+
+
+def test_weighted_tables_use_the_effective_sample_size():
+    pre = pd.DataFrame({COL_MISSED_PRE: ['Áno', 'Áno', 'Nie', 'Nie']})
+    after = pd.DataFrame({COL_MISSED_AFTER: ['Áno', 'Nie', 'Nie', 'Áno']})
+    plain = compare_waves(OUTCOMES, pre, after)['absence']
+    # Equal weights of any size leave the table as it was
+    pd.testing.assert_frame_equal(compare_waves(OUTCOMES, pre, after, weights=(np.full(4, 2.5), np.ones(4)))['absence'],
+                                  plain.astype({'pre_n': float, 'post_n': float}))
+
+    table = compare_waves(OUTCOMES, pre, after, weights=([3, 1, 1, 1], [1, 1, 1, 1]))['absence']
+    assert np.isclose(table.loc['Áno', 'pre'], 100 * 4 / 6)
+    # Kish: 6² / 12 = 3 effective respondents
+    assert np.isclose(table['pre_n'].sum(), 3)
+    assert np.allclose(table.loc['Áno', ['pre_low', 'pre_high']], 100 * np.array(wilson(2, 3)[1:]))
@@ -0,0 +1,26 @@
+import docx
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from report_docx_stream import new_document
+
+
+def test_streamed_document_opens_with_escaped_names(tmp_path):
+    img = tmp_path / 'Q&A <"škola">.png'
+    fig = plt.figure(figsize=(2, 1))
+    fig.savefig(img)
+    plt.close(fig)
+
+    path = tmp_path / 'report.docx'
+    with new_document(str(path)) as doc:
+        doc.add_heading('Výsledky & <závery>', level=1)
+        doc.add_paragraph('riadok\nďalší')
+        doc.add_chart(str(img))
+        doc.add_table(['Otázka', 'Podiel'], [('A & B', '12,0%')])
+
+    opened = docx.Document(str(path))
+    texts = [p.text for p in opened.paragraphs]
+    assert 'Výsledky & <závery>' in texts
+    assert len(opened.inline_shapes) == 1
+    assert opened.tables[0].cell(1, 0).text == 'A & B'
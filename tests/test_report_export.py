@@ -0,0 +1,62 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from report_export import load_export, write_export
+
+AGGREGATES = {
+    'n': 12,
+    'ratio': float('nan'),
+    'hist': np.array([1, 0, 3]),
+    'counts': pd.Series([5.0, 2.0], index=pd.Index(['Áno', 'Nie'], name='Vynechala'), name='count'),
+    'by_grade': pd.Series([0.5, 0.25], index=pd.Index([1, 3], name='grade')),
+    'flags': pd.Series([1.0, 2.0], index=pd.Index([True, False])),
+    'cross': {
+        'table': pd.DataFrame([[1.0, 2.0], [3.0, 4.0]], index=pd.Index(['a', 'b'], name='school'),
+                              columns=pd.Index([2024, 2025], name='year')),
+        'empty': pd.DataFrame(index=pd.Index(['x', 'y'], name='term')),
+    },
+}
+
+
+@pytest.fixture
+def export(tmp_path):
+    write_export(AGGREGATES, str(tmp_path), fingerprint='test')
+    with load_export(str(tmp_path)) as export:
+        yield export
+
+
+def test_round_trip_keeps_labels_dtypes_and_names(export):
+    assert export['n'] == 12 and np.isnan(export['ratio'])
+    np.testing.assert_array_equal(export['hist'], [1, 0, 3])
+    for name in ['counts', 'by_grade', 'flags']:
+        pd.testing.assert_series_equal(export[name], AGGREGATES[name].astype(float))
+    pd.testing.assert_frame_equal(export['cross.table'], AGGREGATES['cross']['table'])
+
+
+def test_table_without_columns(export):
+    empty = export['cross.empty']
+    assert empty.shape == (2, 0)
+    pd.testing.assert_index_equal(empty.index, AGGREGATES['cross']['empty'].index)
+
+
+def test_both_files_come_from_one_build(tmp_path):
+    write_export(AGGREGATES, str(tmp_path), fingerprint='test')
+    with open(tmp_path / 'aggregates.json', encoding='utf-8') as f:
+        payload = json.load(f)
+    assert payload['aggregates']['counts']['name'] == 'count'
+    with load_export(str(tmp_path)) as export:
+        assert export.build == payload['build']
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_mismatched_files_are_refused(tmp_path):
+    write_export(AGGREGATES, str(tmp_path), fingerprint='test')
+    arrow = (tmp_path / 'aggregates.arrow').read_bytes()
+    write_export(AGGREGATES, str(tmp_path), fingerprint='test')
+    (tmp_path / 'aggregates.arrow').write_bytes(arrow)
+    with pytest.raises(ValueError, match='different builds'):
+        load_export(str(tmp_path), retries=0)
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from report_model import MIN_GROUP, ModelData, fit_logistic, model_aggregates
+
+# 2 x 2 table of a binary predictor: (x, y) -> respondents
+TABLE = {(0, 0): 30, (0, 1): 10, (1, 0): 15, (1, 1): 25}
+
+
+def table_arrays(table=TABLE):
+    keys = sorted(table)
+    x = np.array([[1.0, k[0]] for k in keys])
+    y = np.array([float(k[1]) for k in keys])
+    return x, y, np.array([table[k] for k in keys], dtype=float)
+
+
+def cell_data(cells):
+    """ModelData of (group, y, x) -> respondents, one predictor, each respondent with its own timestamp."""
+    rows = np.array([key for key, n in cells.items() for _ in range(n)])
+    stamps = np.arange(len(rows)).astype(str)
+    return [ModelData(rows[:, 0], rows[:, 1], rows[:, 2:], stamps)]
+
+
+def test_unpenalized_fit_is_the_log_odds_ratio():
+    x, y, counts = table_arrays()
+    beta, cov, _ = fit_logistic(x, y, counts, ridge=0)
+    a, b, c, d = TABLE[(1, 1)], TABLE[(1, 0)], TABLE[(0, 1)], TABLE[(0, 0)]
+    assert np.isclose(beta[0, 1], np.log(a * d / (b * c)))
+    assert np.isclose(beta[0, 0], np.log(c / d))
+    # Woolf's standard error of a log odds ratio
+    assert np.isclose(np.sqrt(cov[0, 1, 1]), np.sqrt(1 / a + 1 / b + 1 / c + 1 / d))
+
+
+def test_batch_equals_separate_fits():
+    x, y, counts = table_arrays()
+    weights = np.array([counts, counts[::-1], np.zeros_like(counts)])
+    beta, cov, _ = fit_logistic(x, y, weights)
+    for k in range(2):
+        alone, alone_cov, _ = fit_logistic(x, y, weights[k])
+        np.testing.assert_allclose(beta[k], alone[0], atol=1e-10)
+        np.testing.assert_allclose(cov[k], alone_cov[0], atol=1e-10)
+    # A fit without respondents stays at zero
+    np.testing.assert_array_equal(beta[2], 0)
+
+
+def test_penalized_covariance_is_the_sandwich():
+    x, y, counts = table_arrays()
+    beta, cov, _ = fit_logistic(x, y, counts, ridge=5.0)
+    mu = 1 / (1 + np.exp(-x @ beta[0]))
+    h = (x * (counts * mu * (1 - mu))[:, None]).T @ x
+    bread = np.linalg.inv(h + np.diag([0.0, 5.0]))
+    np.testing.assert_allclose(cov[0], bread @ h @ bread)
+    # Shrunk towards 0 compared with the unpenalized fit
+    assert abs(beta[0, 1]) < abs(fit_logistic(x, y, counts, ridge=0)[0][0, 1])
+
+
+def test_separated_data_warns_without_a_penalty():
+    x, y, counts = table_arrays({(0, 0): 20, (1, 1): 20})
+    with pytest.warns(UserWarning, match='did not converge'):
+        fit_logistic(x, y, counts, ridge=0, max_iter=5)
+
+
+def test_penalized_fit_is_finite_on_separated_data():
+    x, y, counts = table_arrays({(0, 0): 20, (1, 1): 20})
+    beta, cov, _ = fit_logistic(x, y, counts)
+    assert np.isfinite(beta).all() and np.isfinite(cov).all()
+
+
+@pytest.mark.filterwarnings('ignore')
+def test_small_groups_get_no_fit_and_the_baseline_stays_finite():
+    # Group 1 is too small for its own fit; no respondent has the outcome
+    cells = {(0.0, 0.0, 0.0): 25, (0.0, 0.0, 1.0): MIN_GROUP, (1.0, 0.0, 1.0): 5}
+    agg = model_aggregates(cell_data(cells), {'x': None}, 'school', reps=20)
+    groups = agg['model_groups']
+    assert list(groups['n']) == [25 + MIN_GROUP, 5]
+    # Large enough, but without the outcome its intercept has no finite value
+    assert np.isnan(groups.loc['Základná škola', 'x'])
+    assert np.isnan(groups.iloc[1]['x']) and np.isnan(agg['model_groups_low'].iloc[1]['x'])
+    assert np.isfinite(agg['model_fit']['cv_baseline_log_loss'])
+
+
+def test_convergence_mask_flags_fits_without_both_outcomes():
+    x, y, counts = table_arrays()
+    # The second fit has no respondent without the outcome: its intercept has no finite value
+    weights = np.array([counts, counts * y])
+    _, _, converged = fit_logistic(x, y, weights, warn=False)
+    assert list(converged) == [True, False]
+
+
+def test_bootstrap_leaves_out_resamples_with_one_outcome():
+    # One respondent without the outcome: about a third of the resamples have none
+    cells = {(0.0, 1.0, 0.0): MIN_GROUP, (0.0, 0.0, 1.0): 1}
+    with pytest.warns(UserWarning):
+        agg = model_aggregates(cell_data(cells), {'x': None}, 'school', reps=200)
+    fit = agg['model_fit']
+    assert fit['boot_used'] + fit['boot_dropped'] == 200
+    assert 0 < fit['boot_dropped'] < 200
+    assert np.isfinite(agg['model_terms'][['boot_low', 'boot_high']].to_numpy()).all()
+
+
+@pytest.mark.filterwarnings('ignore')
+def test_small_sample_gets_no_bootstrap():
+    cells = {(0.0, 0.0, 0.0): 8, (0.0, 1.0, 1.0): 6, (0.0, 1.0, 0.0): 3}
+    agg = model_aggregates(cell_data(cells), {'x': None}, 'school', reps=50)
+    assert agg['model_fit']['boot_used'] == 0 and agg['model_fit']['fits'] == 1 + 5 + 0
+    assert agg['model_terms'][['boot_low', 'boot_high']].isna().all().all()
+    assert np.isfinite(agg['model_terms']['or_low']).all()
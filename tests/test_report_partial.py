@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import report_data
+import report_store
+from report_partial import (
+    _corr, corr_state, differences, dump_state, finalize, load_state, merge_states, model_node, partial_state,
+    split_csv,
+)
+from report_text import compute_text_aggregates
+
+
+@pytest.fixture(scope='module')
+def reference(tmp_path_factory):
+    pre_data, after_data = report_store.load_data(path=str(tmp_path_factory.mktemp('store')))
+    agg = report_data.compute_aggregates(pre_data, after_data)
+    agg.update(compute_text_aggregates(pre_data))
+    return agg
+
+
+@pytest.mark.filterwarnings('ignore')
+def test_merged_shard_states_equal_the_full_aggregates(tmp_path, reference):
+    pre = split_csv(report_data.PRE_CSV, 3, str(tmp_path), 'pre')
+    after = split_csv(report_data.AFTER_CSV, 3, str(tmp_path), 'after')
+    states = [load_state(dump_state(partial_state(p, a))) for p, a in zip(pre, after)]
+    nodes = [model_node(p) for p in pre]
+    assert differences(finalize(merge_states(states), nodes), reference) == []
+
+
+@pytest.mark.filterwarnings('ignore')
+def test_merge_grouping_does_not_matter(tmp_path):
+    pre = split_csv(report_data.PRE_CSV, 3, str(tmp_path), 'pre')
+    after = split_csv(report_data.AFTER_CSV, 3, str(tmp_path), 'after')
+    a, b, c = (partial_state(p, q) for p, q in zip(pre, after))
+    nodes = [model_node(p) for p in pre]
+    left = finalize(merge_states([merge_states([a, b]), c]), nodes)
+    right = finalize(merge_states([a, merge_states([b, c])]), nodes)
+    assert differences(left, right) == []
+
+
+def test_corr_matches_pandas_and_is_nan_when_undefined():
+    x = np.array([1.0, 2.0, np.nan, 4.0, 7.0])
+    y = np.array([2.0, 1.0, 5.0, 6.0, np.nan])
+    assert np.isclose(_corr(corr_state(x, y)), pd.Series(x).corr(pd.Series(y)))
+    assert np.isnan(_corr(corr_state([], [])))
+    assert np.isnan(_corr(corr_state([1.0], [2.0])))
+    assert np.isnan(_corr(corr_state([3.0, 3.0, 3.0], [1.0, 2.0, 3.0])))
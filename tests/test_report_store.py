@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import report_data
+import report_store
+from report_store import Store, sync, sync_lock
+from report_text import TEXT_QUESTIONS, compute_text_aggregates
+
+FEELINGS = TEXT_QUESTIONS['feelings']
+
+
+@pytest.fixture
+def export(tmp_path):
+    """The pre-installation export rewritten by pandas, so edited copies differ only where edited."""
+    df = pd.read_csv(report_data.PRE_CSV, dtype=str, keep_default_na=False)
+    path = str(tmp_path / 'pre.csv')
+    df.to_csv(path, index=False)
+    return df, path
+
+
+def rewrite(df, path):
+    df.to_csv(path, index=False)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def ingest(store_dir, path):
+    store = Store(store_dir)
+    result = store.ingest(path, 1, 'pre')
+    store.commit()
+    return result
+
+
+def test_ingest_stores_every_response_with_its_open_answers(tmp_path, export):
+    df, path = export
+    store_dir = str(tmp_path / 'store')
+    assert ingest(store_dir, path) == {'added': len(df), 'edited': 0, 'removed': 0}
+
+    frame = Store(store_dir).read(1)
+    assert len(frame) == len(df)
+    expected = pd.read_csv(path, dtype=str)[FEELINGS].str.strip()
+    assert frame[FEELINGS].tolist() == expected.where(expected.notna(), None).tolist()
+    assert compute_text_aggregates(frame)['text']['feelings']['terms'].equals(
+        compute_text_aggregates(path)['text']['feelings']['terms'])
+
+
+def test_unchanged_export_is_skipped(tmp_path, export):
+    _, path = export
+    store_dir = str(tmp_path / 'store')
+    ingest(store_dir, path)
+    assert Store(store_dir).ingest(path, 1, 'pre') is None
+
+
+def test_edited_and_removed_responses(tmp_path, export):
+    df, path = export
+    store_dir = str(tmp_path / 'store')
+    ingest(store_dir, path)
+
+    df = df.copy()
+    df.loc[0, FEELINGS] = 'úplne nová odpoveď'
+    rewrite(df.iloc[:-1], path)
+    assert ingest(store_dir, path) == {'added': 0, 'edited': 1, 'removed': 1}
+
+    frame = Store(store_dir).read(1)
+    assert len(frame) == len(df) - 1
+    # The edited copy is appended, so it reads back last
+    assert frame[report_store.KEY].iloc[-1] == df.iloc[0, 0]
+    assert frame[FEELINGS].iloc[-1] == 'úplne nová odpoveď'
+
+
+def test_commit_keeps_the_previous_index(tmp_path, export):
+    df, path = export
+    store_dir = str(tmp_path / 'store')
+    ingest(store_dir, path)
+    reader = Store(store_dir)
+
+    for i in range(2):
+        df = df.copy()
+        df.loc[i, FEELINGS] = f'odpoveď {i}'
+        rewrite(df, path)
+        ingest(store_dir, path)
+        if i == 0:
+            # A reader of the manifest before this commit still finds its index
+            assert len(reader.read(1)) == len(df)
+
+    version_dir = os.path.join(store_dir, f'v{report_store.STORE_VERSION}')
+    with open(os.path.join(version_dir, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    indexes = sorted(name for name in os.listdir(version_dir) if name.startswith('index-'))
+    assert manifest['commit'] == 3
+    assert indexes == ['index-000002.arrow', manifest['index']]
+
+
+def test_sync_writes_the_manifest_under_the_lock(tmp_path, export, monkeypatch):
+    df, path = export
+    monkeypatch.setattr(report_data, 'waves', {1: ('pre', [path])})
+    store_dir = str(tmp_path / 'store')
+    manifest = sync(store_dir)
+    with open(manifest, encoding='utf-8') as f:
+        assert json.load(f)['sources'][0]['rows'] == len(df)
+    assert os.path.exists(os.path.join(os.path.dirname(manifest), report_store.LOCK_NAME))
+
+
+def test_sync_lock_is_exclusive(tmp_path):
+    order = []
+    held = threading.Event()
+
+    def first():
+        with sync_lock(str(tmp_path)):
+            held.set()
+            time.sleep(0.2)
+            order.append('first')
+
+    thread = threading.Thread(target=first)
+    thread.start()
+    held.wait()
+    with sync_lock(str(tmp_path)):
+        order.append('second')
+    thread.join()
+    assert order == ['first', 'second']
+
+
+def test_store_frames_have_what_the_text_aggregates_read(tmp_path):
+    pre_data, _ = report_store.load_data(path=str(tmp_path / 'store'))
+    csv_pre, _ = report_data.load_csv_data()
+    assert set(TEXT_QUESTIONS.values()) <= set(pre_data.columns) - set(csv_pre.columns)
+    assert compute_text_aggregates(pre_data)['text']['feelings']['terms'].equals(
+        compute_text_aggregates()['text']['feelings']['terms'])
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from report_text import TextStats, tokenize
+
+
+def test_function_words_are_dropped():
+    tok = tokenize(pd.Series(['Nemám žiadne pripomienky, prečo nie', 'Dva krát do roka nemáme'], name='answer'))
+    assert set(tok['lemma']) == {'pripomienka', 'dva', 'rok'}
+
+
+def test_past_tense_of_byt_is_not_pain():
+    tok = tokenize(pd.Series(['Bol to zlý deň, boli ma kŕče'], name='answer'))
+    assert 'bolest' not in set(tok['lemma'])
+    assert {'zly', 'krc'} <= set(tok['lemma'])
+
+
+def test_chunked_stats_add_up():
+    answers = pd.Series(['bolesť brucha', 'bolesti hlavy', None, 'nervozita a bolesť'], name='answer')
+    whole = TextStats().update(answers).summary()
+    parts = (TextStats().update(answers[:2]) + TextStats().update(answers[2:])).summary()
+    assert whole['responses'] == parts['responses'] == 3
+    pd.testing.assert_frame_equal(whole['terms'], parts['terms'])
+    pd.testing.assert_series_equal(whole['bigrams'], parts['bigrams'])
+    assert whole['terms'].loc['bolesť', 'responses'] == 3
@@ -0,0 +1,39 @@
+import sys
+
+import pandas as pd
+import pytest
+
+import report_data
+import report_watch
+from report_store import read_export
+from report_text import TEXT_QUESTIONS
+
+
+def test_reload_keeps_the_chosen_backend(monkeypatch):
+    pytest.importorskip('polars')
+    monkeypatch.setattr(report_watch, 'CONFIG_MODULES', ['report_backend'])
+    backend = sys.modules['report_backend']
+    previous = backend.set_backend('polars')
+    try:
+        report_watch.reload_modules()
+        assert sys.modules['report_backend'].CURRENT['backend'] == 'polars'
+    finally:
+        sys.modules['report_backend'].set_backend(previous)
+
+
+def test_an_edited_open_answer_is_a_change(tmp_path):
+    df = pd.read_csv(report_data.PRE_CSV, dtype=str, keep_default_na=False)
+    old_path, new_path = str(tmp_path / 'old.csv'), str(tmp_path / 'new.csv')
+    df.to_csv(old_path, index=False)
+    df.loc[3, TEXT_QUESTIONS['comments']] = 'Pridať tampóny'
+    df.to_csv(new_path, index=False)
+
+    diff = report_watch.diff_rows(read_export(old_path, 'pre'), read_export(new_path, 'pre'))
+    assert diff == {'added': 0, 'removed': 0, 'changed': 1, 'questions': [TEXT_QUESTIONS['comments']]}
+
+
+def test_repeated_timestamps_are_keyed_alike_in_both_exports():
+    old = pd.DataFrame({'Timestamp': ['1', '2', '3'], 'answer': ['a', 'b', 'c']})
+    # The new export repeats a timestamp: its first copy still matches the old response
+    new = pd.DataFrame({'Timestamp': ['1', '2', '3', '3'], 'answer': ['a', 'b', 'c', 'd']})
+    assert report_watch.diff_rows(old, new) == {'added': 1, 'removed': 0, 'changed': 0, 'questions': ['answer']}
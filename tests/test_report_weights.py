@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from report_data import group_means
+from report_weights import common_targets, effective_size, rake
+
+
+def margin_shares(codes, weights, j, k):
+    known = codes[:, j] >= 0
+    totals = np.bincount(codes[known, j], weights=weights[known], minlength=k)
+    return totals / totals.sum()
+
+
+def test_raked_margins_match_targets():
+    rng = np.random.default_rng(0)
+    codes = np.column_stack([rng.integers(0, 3, 500), rng.integers(0, 2, 500), rng.integers(0, 4, 500)])
+    targets = [np.array([0.2, 0.5, 0.3]), np.array([0.6, 0.4]), np.array([0.1, 0.2, 0.3, 0.4])]
+    w = rake(codes, targets)
+    for j, target in enumerate(targets):
+        np.testing.assert_allclose(margin_shares(codes, w, j, len(target)), target, atol=1e-5)
+    assert np.isclose(w.sum(), len(codes))
+
+
+def test_unknown_categories_keep_their_weight_on_that_margin():
+    codes = np.array([[0, 0], [1, 0], [1, 1], [-1, 1]])
+    w = rake(codes, [np.array([0.5, 0.5]), np.array([0.5, 0.5])])
+    np.testing.assert_allclose(margin_shares(codes, w, 0, 2), [0.5, 0.5], atol=1e-5)
+    np.testing.assert_allclose(margin_shares(codes, w, 1, 2), [0.5, 0.5], atol=1e-5)
+
+
+def test_groups_are_raked_to_their_own_targets():
+    codes = np.array([[0], [0], [1], [0], [1], [1]])
+    groups = np.array([0, 0, 0, 1, 1, 1])
+    w = rake(codes, [np.array([[0.5, 0.5], [0.25, 0.75]])], groups=groups)
+    for g, target in enumerate([[0.5, 0.5], [0.25, 0.75]]):
+        mine = groups == g
+        np.testing.assert_allclose(margin_shares(codes[mine], w[mine], 0, 2), target, atol=1e-5)
+        assert np.isclose(w[mine].sum(), mine.sum())
+
+
+def test_common_targets_drop_categories_missing_from_a_wave():
+    pre = np.array([[0], [0], [1], [2]])
+    after = np.array([[1], [2], [2]])
+    (target,) = common_targets(pre, after, sizes=[3])
+    np.testing.assert_allclose(target, [0, 2 / 5, 3 / 5])
+    w = rake(pre, [target])
+    assert (w[:2] == 0).all()
+
+
+def test_effective_size():
+    assert effective_size(np.ones(10)) == 10
+    assert np.isclose(effective_size([1, 1, 2]), 16 / 6)
+
+
+def test_weighted_group_means_leave_out_missing_values():
+    values = pd.Series([1.0, 3.0, np.nan, 4.0], name='Lack_count')
+    groups = pd.Series(['a', 'a', 'a', 'b'])
+    means = group_means(values, groups, weights=[1, 3, 100, 2])
+    assert means.name == 'Lack_count'
+    np.testing.assert_allclose(means, [2.5, 4.0])
+    pd.testing.assert_series_equal(group_means(values, groups, weights=np.ones(4)), group_means(values, groups))